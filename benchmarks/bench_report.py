@@ -0,0 +1,178 @@
+"""Benchmark of Report aggregation: per test boolean masks vs. groupby
+
+Builds a synthetic Detailed report (500 tests, 1M rows by default) and times
+Report.process_results against the previous implementation.
+
+Run from the project root:
+    python benchmarks/bench_report.py [tests] [rows_per_test]
+"""
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_dir = pathlib.Path(__file__).absolute().parent.parent
+sys.path.append(str(project_dir))
+
+from cf_common.CfRunTest import DetailedCsvReport, Report
+
+
+class LegacyReport(Report):
+    """Previous Report.process_results: one boolean mask per test and column"""
+
+    def process_results(self):
+        for name in self.unique_tests:
+            d = {}
+            d["test_name"] = name
+
+            # get mean values from steady state
+            mean_cols = [
+                "cps",
+                "tps",
+                "total_bandwidth",
+                "open_conns",
+                "tcp_avg_tt_synack",
+                "tcp_avg_ttfb",
+                "url_response_time",
+                "client_cpu",
+                "client_pkt_mem",
+                "client_rcv_queue",
+                "server_cpu",
+                "server_pkt_mem",
+                "server_rcv_queue",
+            ]
+            for col in mean_cols:
+                d[col] = self.df_steady.loc[
+                    self.df_steady["test_name"] == name, col
+                ].mean()
+
+            # get maximum values for all states
+            max_cols = [
+                "successful_txn",
+                "unsuccessful_txn",
+                "aborted_txn",
+                "total_tcp_established",
+                "total_tcp_attempted",
+                "seconds",
+                "current_load",
+                "t_run",
+                "t_start",
+                "t_tx",
+                "t_stop",
+            ]
+            for col in max_cols:
+                d[col] = self.df_base.loc[self.df_base["test_name"] == name, col].max()
+
+            max_steady_cols = ["seconds"]
+            for col in max_steady_cols:
+                d[col] = self.df_steady.loc[
+                    self.df_steady["test_name"] == name, col
+                ].max()
+
+            # checks steady vs. all state max, add _max to column name
+            max_compare_cols = ["cps", "tps", "total_bandwidth"]
+            for col in max_compare_cols:
+                col_name = col + "_max"
+                d[col_name] = self.df_base.loc[
+                    self.df_base["test_name"] == name, col
+                ].max()
+            # find current_load and seconds for max tps
+            d["max_tps_load"] = self.df_base.loc[
+                self.df_base["tps"] == d["tps_max"], "current_load"
+            ].iloc[0]
+            d["max_tps_seconds"] = self.df_base.loc[
+                self.df_base["tps"] == d["tps_max"], "seconds"
+            ].iloc[0]
+            total_pkt_count_sum = self.df_base.loc[self.df_base["test_name"] == name, "total_packet_count"].sum()
+            total_byte_rate_sum = self.df_base.loc[self.df_base["test_name"] == name, "total_byte_rate"].sum()
+            if total_pkt_count_sum > 0:
+                d["avg_pkt_size"] = int(total_byte_rate_sum / total_pkt_count_sum)
+            else:
+                d["avg_pkt_size"] = 0
+            # get script version from test
+            d["version"] = self.df_base.loc[self.df_base["test_name"] == name, "version"].iloc[0]
+
+            # get report link for current test - changed to take from last row in test
+            # d["report"] = self.df_base.loc[self.df_base["tps"] == d["tps_max"], "report"].iloc[0]
+            d["report"] = self.df_base.loc[self.df_base["test_name"] == name, "report"].iloc[-1]
+
+            # find min and max tps from steady phase
+            max_steady_compare = ["tps"]
+            for col in max_steady_compare:
+                col_name_min = col + "_stdy_min"
+                col_name_max = col + "_stdy_max"
+                col_name_delta = col + "_stdy_delta"
+                d[col_name_min] = self.df_steady.loc[
+                    self.df_steady["test_name"] == name, col
+                ].min()
+                d[col_name_max] = self.df_steady.loc[
+                    self.df_steady["test_name"] == name, col
+                ].max()
+
+                if d[col_name_min] != 0:
+                    d[col_name_delta] = (
+                        (d[col_name_max] - d[col_name_min]) / d[col_name_min]
+                    ) * 100
+
+                    d[col_name_delta] = round(d[col_name_delta], 3)
+                else:
+                    d[col_name_delta] = 0
+
+            self.results.append(d)
+
+
+def make_detailed(tests, rows_per_test, seed=1):
+    rng = np.random.default_rng(seed)
+    rows = tests * rows_per_test
+    columns = DetailedCsvReport(".").columns
+    df = pd.DataFrame(
+        rng.integers(0, 100000, size=(rows, len(columns))).astype(np.float64),
+        columns=columns,
+    )
+    df["test_name"] = np.repeat([f"test_{i:04d}" for i in range(tests)], rows_per_test)
+    df["seconds"] = np.tile(np.arange(rows_per_test) * 4, tests)
+    phase = np.array(["rampup", "steady", "rampdown"])
+    df["state"] = phase[np.tile(np.arange(rows_per_test) * 3 // rows_per_test, tests)]
+    for col in ["test_type_v1", "test_type_v2", "load_type", "test_id", "run_id"]:
+        df[col] = "x"
+    df["version"] = 1.8
+    df["report"] = "https://cf/report"
+    return df
+
+
+class FrameReport:
+    """Runs process_results of a Report class on an in memory Detailed frame"""
+
+    def __init__(self, report_class, df):
+        self.report = report_class.__new__(report_class)
+        self.report.df_base = df
+        self.report.df_steady = df[df.state == "steady"].copy()
+        self.report.unique_tests = df["test_name"].unique().tolist()
+        self.report.results = []
+
+    def run(self):
+        start = time.perf_counter()
+        self.report.process_results()
+        return time.perf_counter() - start, pd.DataFrame(self.report.results)
+
+
+def main():
+    tests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rows_per_test = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    df = make_detailed(tests, rows_per_test)
+    print(f"{tests} tests, {len(df)} rows")
+    new_time, new = FrameReport(Report, df).run()
+    print(f"groupby: {new_time:8.2f} s")
+    old_time, old = FrameReport(LegacyReport, df).run()
+    print(f"masks:   {old_time:8.2f} s  ({old_time / new_time:.0f}x)")
+    # legacy max_tps_load/seconds look up the max tps row across all tests
+    same = old.drop(columns=["max_tps_load", "max_tps_seconds"]).equals(
+        new.drop(columns=["max_tps_load", "max_tps_seconds"])
+    )
+    print(f"same results (excluding max_tps_load/seconds): {same}")
+
+
+if __name__ == "__main__":
+    main()
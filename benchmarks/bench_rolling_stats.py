@@ -0,0 +1,65 @@
+"""Micro-benchmark of RollingStats.update: list window vs. ring buffer window
+
+Run from the project root:
+    python benchmarks/bench_rolling_stats.py
+"""
+import pathlib
+import random
+import sys
+import timeit
+
+project_dir = pathlib.Path(__file__).absolute().parent.parent
+sys.path.append(str(project_dir))
+
+from cf_common.CfRunTest import RollingStats
+
+
+class ListRollingStats(RollingStats):
+    """Previous RollingStats window: list.pop(0) with full sum, max and min per update"""
+
+    def update(self, new_value):
+        self.current_value = new_value
+        if len(self.list) == self.sample_size:
+            self.list.pop(0)
+        self.list.append(self.current_value)
+        self.avg_val = sum(self.list) / len(self.list)
+        self.avg_val = round(self.avg_val, self.round_digits)
+        if self.round_digits == 0:
+            self.avg_val = int(self.avg_val)
+        max_var = max(self.list) - min(self.list)
+        self.variance = (max_var / self.avg_val) if self.avg_val != 0 else 0
+        self.variance = round(self.variance, 3)
+        self.check_if_highest()
+        return self.variance
+
+    def reset(self):
+        self.list = [0] * self.sample_size
+
+    # plain attribute instead of the ring buffer's read only property
+    list = None
+
+
+def bench(stats_class, window_size, values, repeat):
+    def run():
+        stats = stats_class(window_size, 0)
+        for value in values:
+            stats.update(value)
+            stats.check_if_stable(0.03)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / len(values)
+
+
+def main():
+    random.seed(1)
+    values = [random.randint(9000, 11000) for _ in range(20000)]
+    print(f"{'window':>8} {'list us/update':>16} {'ring us/update':>16} {'speedup':>8}")
+    for window_size in (3, 100, 10000):
+        old = bench(ListRollingStats, window_size, values, 3)
+        new = bench(RollingStats, window_size, values, 3)
+        print(
+            f"{window_size:>8} {old * 1e6:>16.3f} {new * 1e6:>16.3f} {old / new:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import asyncio
+import contextvars
+import json
+import logging
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for AsyncCfClient
+    aiohttp = None
+
+from cf_common.CfLogging import LazyJson
+from cf_common.CfClient import (
+    CfClientBase,
+    retry_total,
+    retry_backoff_factor,
+    retry_status_forcelist,
+)
+
+log = logging.getLogger(__name__)
+
+# methods retried on retry_status_forcelist responses, same as the urllib3 Retry default
+idempotent_methods = {"GET", "PUT", "DELETE", "HEAD", "OPTIONS", "TRACE"}
+# urllib3 Retry.DEFAULT_BACKOFF_MAX
+backoff_max = 120
+
+
+class RetryError(Exception):
+    """Raised when a request still fails after all retries"""
+
+
+class AsyncCfClient(CfClientBase):
+    """asyncio CyberFlood client with the CfClient API
+
+    Methods are awaitable versions of the CfClient methods with the same arguments and
+    return values. Retries, bearer token authentication, response.log logging and
+    error handling (exception_continue_check) follow CfClient. Many test runs can be
+    driven concurrently from one event loop, each task has its own exception state.
+
+    Requires the aiohttp package.
+    """
+
+    def __init__(self, controller_ip, username, password, verify_ssl, response_log=None):
+        if aiohttp is None:
+            raise ImportError("AsyncCfClient requires aiohttp: pip install aiohttp")
+        log.debug("Initializing a new object of the AsyncCfClient class.")
+        self.response_log = response_log
+        self.username = username
+        self.password = password
+        self.controller_ip = controller_ip
+        self.api = "https://" + self.controller_ip + "/api/v2"
+        self.verify_ssl = verify_ssl
+        self.retry_total = retry_total
+        self.retry_backoff_factor = retry_backoff_factor
+        self.retry_status_forcelist = retry_status_forcelist
+        self.headers = {}
+        self.__session = None
+        self.__exception_state = contextvars.ContextVar(
+            f"cf_exception_state_{id(self)}", default=True
+        )
+
+    @property
+    def exception_state(self):
+        return self.__exception_state.get()
+
+    @exception_state.setter
+    def exception_state(self, state):
+        self.__exception_state.set(state)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    def session(self):
+        if self.__session is None:
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=bool(self.verify_ssl))
+            )
+        return self.__session
+
+    def backoff(self, consecutive_errors):
+        """Backoff in seconds before the next retry, same progression as urllib3"""
+        if consecutive_errors <= 1:
+            return 0
+        return min(backoff_max, self.retry_backoff_factor * 2 ** (consecutive_errors - 1))
+
+    async def request(self, method, url, raise_for_status=True, **kwargs):
+        """Sends a request with retries and error handling
+
+        Errors are reported with requests_error_handler and set exception_state to
+        False, like CfClient.
+
+        :return: (status code, decoded json body) or (None, None) on error
+        """
+        method = method.upper()
+        errors = 0
+        while True:
+            try:
+                async with self.session().request(
+                    method, url, headers=self.headers, **kwargs
+                ) as response:
+                    status = response.status
+                    body = await response.json(content_type=None)
+                if status in self.retry_status_forcelist and method in idempotent_methods:
+                    errors += 1
+                    if errors > self.retry_total:
+                        raise RetryError(
+                            f"Max retries exceeded with url: {url} "
+                            f"(too many {status} error responses)"
+                        )
+                    await asyncio.sleep(self.backoff(errors))
+                    continue
+                if raise_for_status and status >= 400:
+                    self.requests_error_handler(
+                        "http", f"{status} Error for url: {url}", body
+                    )
+                    return None, None
+                return status, body
+            except aiohttp.ClientConnectionError as errc:
+                errors += 1
+                if errors <= self.retry_total:
+                    await asyncio.sleep(self.backoff(errors))
+                    continue
+                self.requests_error_handler("connection", errc, None)
+            except asyncio.TimeoutError as errt:
+                self.requests_error_handler("timeout", errt, None)
+            except (aiohttp.ClientError, RetryError, ValueError) as err:
+                self.requests_error_handler("other", err, None)
+            return None, None
+
+    async def connect(self):
+        self.exception_state = True
+        log.debug("Inside the AsyncCfClient/connect method.")
+        credentials = {"email": self.username, "password": self.password}
+        status, dict_response = await self.request(
+            "post",
+            self.api + "/token",
+            data=credentials,
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+        self.exception_continue_check()
+        print(dict_response)
+        self.create_log_response(dict_response)
+        if "token" in dict_response:
+            self.headers["Authorization"] = "Bearer " + dict_response["token"]
+
+    async def get_test(self, test_type, test_id, outfile):
+        self.exception_state = True
+        url = self.api + "/tests/" + test_type + "/" + test_id
+        status, dict_response = await self.request("get", url)
+        self.append_log_response('get', status, url, dict_response)
+        with open(outfile, "w") as f:
+            json.dump(dict_response, f, indent=4)
+        return dict_response
+
+    async def post_test(self, test_type, infile):
+        self.exception_state = True
+        with open(infile, "r") as f:
+            intest = json.load(f)
+        url = self.api + "/tests/" + test_type + "/"
+        status, dict_response = await self.request("post", url, json=intest)
+        self.exception_continue_check()
+        self.append_log_response('post', status, url, dict_response)
+        return dict_response
+
+    async def update_test(self, test_type, test_id, infile):
+        self.exception_state = True
+        with open(infile, "r") as f:
+            intest = json.load(f)
+        url = self.api + "/tests/" + test_type + "/" + test_id
+        status, dict_response = await self.request("put", url, json=intest)
+        self.exception_continue_check()
+        self.append_log_response('put', status, url, dict_response)
+        return dict_response
+
+    async def get_queue(self, queue_id):
+        self.exception_state = True
+        url = self.api + "/queues/" + queue_id
+        status, dict_response = await self.request("get", url, raise_for_status=False)
+        self.exception_continue_check()
+        self.append_log_response('get', status, url, dict_response)
+        return dict_response
+
+    async def start_test(self, test_id):
+        self.exception_state = True
+        url = self.api + "/tests/" + test_id + "/start"
+        status, dict_response = await self.request("put", url)
+        self.exception_continue_check()
+        self.append_log_response('put', status, url, dict_response)
+        return dict_response
+
+    async def get_test_run(self, test_run_id):
+        self.exception_state = True
+        url = self.api + "/test_runs/" + test_run_id
+        status, dict_response = await self.request("get", url, raise_for_status=False)
+        self.exception_continue_check()
+        self.append_log_response('get', status, url, dict_response)
+        return dict_response
+
+    async def fetch_test_run_statistics(self, test_run_id):
+        self.exception_state = True
+        url = self.api + "/test_runs/" + test_run_id + "/statistics"
+        status, dict_response = await self.request("get", url, raise_for_status=False)
+        self.exception_continue_check()
+        self.append_log_response('get', status, url, dict_response)
+        return dict_response
+
+    async def fetch_event_logs(self, test_run_id):
+        self.exception_state = True
+        url = self.api + "/test_runs/" + test_run_id + "/eventlogs"
+        status, dict_response = await self.request("get", url, raise_for_status=False)
+        self.exception_continue_check()
+        self.append_log_response('get', status, url, dict_response)
+        return dict_response
+
+    async def stop_test(self, test_run_id):
+        self.exception_state = True
+        url = self.api + "/test_runs/" + test_run_id + "/stop"
+        status, dict_response = await self.request("put", url, raise_for_status=False)
+        self.exception_continue_check()
+        self.append_log_response('put', status, url, dict_response)
+        return dict_response
+
+    async def change_load(self, test_run_id, new_load):
+        self.exception_state = True
+        load = {"load": new_load}
+        url = self.api + "/test_runs/" + test_run_id + "/changeload"
+        status, dict_response = await self.request("put", url, data=load)
+        self.exception_continue_check()
+        self.append_log_response('put', status, url, dict_response)
+        log.debug("change load: %s > %sstatus: %s", load, LazyJson(dict_response), status)
+        return dict_response
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import pathlib
+import time
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# RunData fields rebuilt by init_rolling_stats and the check_*kpi methods, together
+# with the rolling_* views
+run_data_rebuilt = {
+    "rolling_bank",
+    "rolling_max_var",
+    "kpi_1",
+    "kpi_2",
+    "ramp_seek_kpi",
+    "latency_kpi",
+}
+# CfRunTest attributes owned by the runner, not by the test
+run_test_skipped = {
+    "cf",
+    "rd",
+    "ocj",
+    "result_file",
+    "temp_dir",
+    "ticker",
+    "clock",
+    "results_index",
+    "iterations",
+    "on_wind_down",
+    "on_checkpoint",
+}
+
+
+def json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, pathlib.PurePath):
+        return str(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def test_key(test):
+    """Identifies a run_tests.csv row, the same test id can run more than once"""
+    return f"{test.get('run_order', '')}|{test['id']}|{test['name']}"
+
+
+class Checkpoint:
+    """Saves suite progress and the state of the running test to a json file
+
+    The file is replaced atomically, a crash while writing leaves the previous
+    checkpoint. The running test is saved at most every interval seconds while it is
+    controlled, and always when it starts. A checkpoint has the RunData fields, the
+    rolling statistics windows, the CfRunTest report details and the CfOpenConns state,
+    enough to reattach to the test run on the controller and continue control.
+
+    :param file_name: checkpoint json file
+    :param interval: min seconds between saves of the running test
+    """
+
+    def __init__(self, file_name, interval=20):
+        self.file_name = pathlib.Path(file_name)
+        self.interval = interval
+        self.last_write = 0
+        self.state = {
+            "completed": [],
+            "running": None,
+            "time_stamp": None,
+            "report_files": [],
+        }
+
+    def load(self):
+        """
+        Reads the checkpoint file.
+        :return: True if a checkpoint was loaded.
+        """
+        if not self.file_name.is_file():
+            log.info(f"no checkpoint file: {self.file_name}")
+            return False
+        with open(self.file_name) as f:
+            self.state = json.load(f)
+        log.info(
+            f"checkpoint loaded, completed tests: {len(self.state['completed'])}, "
+            f"running: {self.running_key()}"
+        )
+        return True
+
+    def write(self):
+        tmp_file = self.file_name.with_name(self.file_name.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.state, f, default=json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.file_name)
+        self.last_write = time.monotonic()
+
+    def running_key(self):
+        running = self.state["running"]
+        return running["key"] if running else None
+
+    def is_completed(self, test):
+        return test_key(test) in self.state["completed"]
+
+    def start(self, result_file):
+        """Records the report time stamp of a new suite run"""
+        self.state["time_stamp"] = result_file.time_stamp
+        self.write()
+
+    def add_report_file(self, report_file):
+        report_file = str(report_file)
+        if report_file not in self.state["report_files"]:
+            self.state["report_files"].append(report_file)
+
+    def test_running(self, test, rt, force=False):
+        """Saves the state of the running test, rate limited to interval"""
+        if not force and time.monotonic() - self.last_write < self.interval:
+            return
+        rd = rt.rd
+        # the checkpoint must not be ahead of the detailed report on disk
+        flush = getattr(rt.result_file, "flush", None)
+        if flush is not None:
+            flush()
+        report_csv_file = getattr(rt.result_file, "report_csv_file", None)
+        if report_csv_file is not None:
+            self.add_report_file(report_csv_file)
+        self.state["running"] = {
+            "key": test_key(test),
+            "report_csv_file": report_csv_file,
+            "run_data": {
+                k: v
+                for k, v in vars(rd).items()
+                if k not in run_data_rebuilt and not k.startswith("rolling_")
+            },
+            "rolling_bank": rd.rolling_bank.state() if rd.rolling_bank else None,
+            "steady_bank": (
+                rd.rolling_steady_bank.state() if rd.rolling_steady_bank else None
+            ),
+            "run_test": {
+                k: v for k, v in vars(rt).items() if k not in run_test_skipped
+            },
+            "iterations": rt.iterations.state(),
+            "open_conns": {
+                k: (v.state() if k == "tracker" else v)
+                for k, v in vars(rt.ocj).items()
+                if k != "rt"
+            },
+        }
+        self.write()
+
+    def test_completed(self, test):
+        key = test_key(test)
+        if key not in self.state["completed"]:
+            self.state["completed"].append(key)
+        if self.running_key() == key:
+            self.state["running"] = None
+        self.write()
+
+    @staticmethod
+    def restore(rt, rd, running):
+        """Restores a saved running test into new CfRunTest and RunData objects"""
+        for k, v in running["run_data"].items():
+            setattr(rd, k, v)
+        # rebuild the rolling statistics views, then restore the saved windows
+        rt.init_rolling_stats(rd)
+        for k, v in running["run_data"].items():
+            setattr(rd, k, v)
+        if running["rolling_bank"] is not None:
+            rd.rolling_bank.load_state(running["rolling_bank"])
+        if running.get("steady_bank") is not None:
+            rd.rolling_steady_bank.load_state(running["steady_bank"])
+        rt.check_kpi(rd)
+        rt.check_ramp_seek_kpi(rd)
+        rt.check_latency_kpi(rd)
+        if running.get("iterations") is not None:
+            rt.iterations.load_state(running["iterations"])
+        for k, v in running["open_conns"].items():
+            if k == "tracker":
+                rt.ocj.tracker.load_state(v)
+            elif k == "tracker_mapper":
+                setattr(rt.ocj, k, tuple(tuple(pair) for pair in v))
+            else:
+                setattr(rt.ocj, k, v)
+        for k, v in running["run_test"].items():
+            setattr(rt, k, v)
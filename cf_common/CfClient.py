@@ -1,24 +1,165 @@
+import bisect
 import requests
 import json
 import logging
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+from cf_common.CfLogging import LazyJson
+from cf_common.CfResponseLog import default_response_log
+
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
-fmt_str = "[%(asctime)s] %(levelname)s %(lineno)d: %(message)s"
-logging.basicConfig(
-    filename="cf.log", filemode="w", level=logging.DEBUG, format=fmt_str
-)
 log = logging.getLogger(__name__)
-log.debug("start logging")
 
 
-class CfClient:
-    def __init__(self, controller_ip, username, password, verify_ssl):
+@dataclass
+class RunSnapshot:
+    """Test run status and statistics fetched in the same control tick"""
+    test_run: dict
+    statistics: dict
+    fetched_at: float
+
+
+# retry settings shared by CfClient and AsyncCfClient
+retry_total = 5
+retry_backoff_factor = 1
+retry_status_forcelist = [422, 500, 502, 503, 504]
+
+
+class CfClientMetrics:
+    """Per endpoint request metrics, safe to update from several threads
+
+    Records request count, latency histogram, retries, status codes and response
+    sizes for each endpoint label.
+    """
+
+    # latency histogram bucket upper bounds in seconds, last bucket is open ended
+    latency_buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, latency, status_code, response_bytes, retries):
+        """Records one request
+
+        :param status_code: http status code, None if the request failed without response
+        """
+        with self.lock:
+            ep = self.endpoints.get(endpoint)
+            if ep is None:
+                ep = {
+                    "count": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "latency_total": 0.0,
+                    "latency_min": None,
+                    "latency_max": 0.0,
+                    "histogram": [0] * (len(self.latency_buckets) + 1),
+                    "status_codes": {},
+                    "response_bytes_total": 0,
+                    "response_bytes_max": 0,
+                }
+                self.endpoints[endpoint] = ep
+            ep["count"] += 1
+            ep["retries"] += retries
+            ep["latency_total"] += latency
+            if ep["latency_min"] is None or latency < ep["latency_min"]:
+                ep["latency_min"] = latency
+            ep["latency_max"] = max(ep["latency_max"], latency)
+            ep["histogram"][bisect.bisect_left(self.latency_buckets, latency)] += 1
+            if status_code is None or status_code >= 400:
+                ep["errors"] += 1
+            status = str(status_code)
+            ep["status_codes"][status] = ep["status_codes"].get(status, 0) + 1
+            ep["response_bytes_total"] += response_bytes
+            ep["response_bytes_max"] = max(ep["response_bytes_max"], response_bytes)
+
+    def snapshot(self):
+        """Copy of the metrics with average latency and labeled histogram buckets"""
+        labels = [f"<={b}s" for b in self.latency_buckets]
+        labels.append(f">{self.latency_buckets[-1]}s")
+        snapshot = {}
+        with self.lock:
+            for endpoint, ep in self.endpoints.items():
+                snapshot[endpoint] = {
+                    "count": ep["count"],
+                    "errors": ep["errors"],
+                    "retries": ep["retries"],
+                    "latency": {
+                        "avg": round(ep["latency_total"] / ep["count"], 4),
+                        "min": round(ep["latency_min"], 4),
+                        "max": round(ep["latency_max"], 4),
+                        "total": round(ep["latency_total"], 4),
+                        "histogram": dict(zip(labels, ep["histogram"])),
+                    },
+                    "status_codes": dict(ep["status_codes"]),
+                    "response_bytes": {
+                        "total": ep["response_bytes_total"],
+                        "avg": int(ep["response_bytes_total"] / ep["count"]),
+                        "max": ep["response_bytes_max"],
+                    },
+                }
+        return snapshot
+
+
+class CfClientBase:
+    """Response logging and error handling shared by CfClient and AsyncCfClient"""
+
+    response_log = None
+
+    def create_log_response(self, resp):
+        if self.response_log is None:
+            self.response_log = default_response_log()
+        self.response_log.create(resp)
+        return True
+
+    def append_log_response(self, method, status, url, resp):
+        if self.response_log is None:
+            self.response_log = default_response_log()
+        self.response_log.append(method, status, url, resp)
+        return True
+
+    def requests_error_handler(self, error_type, error_response, json_response):
+        if error_type == "http":
+            report_error = f"Http Error: {error_response}"
+        elif error_type == "connection":
+            report_error = f"Error Connecting: {error_response}"
+        elif error_type == "timeout":
+            report_error = f"Timeout Error: {error_response}"
+        elif error_type == "other":
+            report_error = (
+                f"Other error, not http, connection or timeout error: {error_response}"
+            )
+        else:
+            report_error = f"unknown"
+
+        log.debug(report_error)
+        print(report_error)
+        if json_response is not None:
+            if hasattr(json_response, "json"):
+                json_response = json_response.json()
+            log.debug(json_response)
+            print(json_response)
+        # sys.exit(1)
+        self.exception_state = False
+
+    def exception_continue_check(self):
+        if not self.exception_state:
+            sys.exit(1)
+
+
+class CfClient(CfClientBase):
+    def __init__(self, controller_ip, username, password, verify_ssl, response_log=None):
         log.debug("Initializing a new object of the CfClient class.")
+        self.response_log = response_log
         self.log = logging.getLogger("requests.packages.urllib3")
         self.username = username
         self.password = password
@@ -26,32 +167,52 @@ class CfClient:
         self.api = "https://" + self.controller_ip + "/api/v2"
         self.__session = requests.session()
         self.__session.verify = verify_ssl
+        # exception state is per thread, requests can run concurrently on the session
+        self.__thread_state = threading.local()
+        self.__fetch_executor = None
+        self.__metrics = CfClientMetrics()
         self.exception_state = True
         retries = Retry(
-            total=5, backoff_factor=1, status_forcelist=[422, 500, 502, 503, 504]
+            total=retry_total,
+            backoff_factor=retry_backoff_factor,
+            status_forcelist=retry_status_forcelist,
         )
         self.__session.mount("https://", HTTPAdapter(max_retries=retries))
 
-    def create_log_response(self, resp):
-        with open(("response.log"), "w") as f:
-            f.write(str(resp))
-        return True
-    
-    def append_log_response(self, method, status, url, resp):
-        s = f'\n{method} {status} {url}\n{resp}'
-        with open(("response.log"), "a") as f:
-            f.write(s)
-        return True
+    @property
+    def exception_state(self):
+        return getattr(self.__thread_state, "exception_state", True)
 
-    def connect(self):
-        self.exception_state = True
-        log.debug("Inside the CfClient/connect method.")
-        credentials = {"email": self.username, "password": self.password}
+    @exception_state.setter
+    def exception_state(self, state):
+        self.__thread_state.exception_state = state
+
+    def metrics(self):
+        """Snapshot of per endpoint request metrics
+
+        :return: dict with latency histogram, retry, status code and response size
+         counters per endpoint
+        """
+        return self.__metrics.snapshot()
+
+    def execute(self, method, url, endpoint, raise_for_status=True, **kwargs):
+        """Sends a request on the session, reports errors and records metrics
+
+        Errors are reported with requests_error_handler, which sets exception_state
+        to False. The caller decides if it runs exception_continue_check.
+
+        :param method: http method, e.g. get
+        :param url: full request url
+        :param endpoint: endpoint label for metrics, e.g. GET /test_runs/{id}
+        :param raise_for_status: treat http error status codes as errors
+        :return: response, or None if no response was received
+        """
+        response = None
+        start = time.perf_counter()
         try:
-            response = self.__session.post(
-                self.api + "/token", data=credentials, timeout=10
-            )
-            response.raise_for_status()
+            response = self.__session.request(method, url, **kwargs)
+            if raise_for_status:
+                response.raise_for_status()
         except requests.exceptions.HTTPError as errh:
             self.requests_error_handler("http", errh, response)
         except requests.exceptions.ConnectionError as errc:
@@ -60,28 +221,38 @@ class CfClient:
             self.requests_error_handler("timeout", errt, None)
         except requests.exceptions.RequestException as err:
             self.requests_error_handler("other", err, None)
+        latency = time.perf_counter() - start
+        if response is None:
+            self.__metrics.record(endpoint, latency, None, 0, 0)
+        else:
+            retries = getattr(getattr(response.raw, "retries", None), "history", ())
+            self.__metrics.record(
+                endpoint,
+                latency,
+                response.status_code,
+                len(response.content),
+                len(retries),
+            )
+        return response
+
+    def connect(self):
+        self.exception_state = True
+        log.debug("Inside the CfClient/connect method.")
+        credentials = {"email": self.username, "password": self.password}
+        response = self.execute(
+            "post", self.api + "/token", "POST /token", data=credentials, timeout=10
+        )
         self.exception_continue_check()
         dict_response = response.json()
         print(dict_response)
         self.create_log_response(dict_response)
         if "token" in dict_response:
             self.__session.headers["Authorization"] = "Bearer " + dict_response["token"]
-        
+
     def get_test(self, test_type, test_id, outfile):
         self.exception_state = True
         url = self.api + "/tests/" + test_type + "/" + test_id
-        try:
-            response = self.__session.get(url)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-
+        response = self.execute("get", url, "GET /tests/{type}/{id}")
         dict_response = response.json()
         self.append_log_response('get', response.status_code, url, dict_response)
         with open(outfile, "w") as f:
@@ -91,18 +262,7 @@ class CfClient:
     def fetch_test_template(self, test_type, outfile):
         self.exception_state = True
         url = self.api + "/tests/" + test_type + "/template"
-        try:
-            response = self.__session.get(url)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-
+        response = self.execute("get", url, "GET /tests/{type}/template")
         dict_response = response.json()
         if test_type == "advanced_mixed_traffic":
             dict_response["config"]["trafficMix"]["mixer"] = self.fetch_amt_predefinedprotocols()
@@ -114,18 +274,9 @@ class CfClient:
     def fetch_amt_predefinedprotocols(self):
         self.exception_state = True
         url = self.api + "/tests/advanced_mixed_traffic/predefined_protocols"
-        try:
-            response = self.__session.get(url)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-
+        response = self.execute(
+            "get", url, "GET /tests/advanced_mixed_traffic/predefined_protocols"
+        )
         dict_response = response.json()
         self.append_log_response('get', response.status_code, url, dict_response)
         return dict_response
@@ -135,17 +286,7 @@ class CfClient:
         with open(infile, "r") as f:
             intest = json.load(f)
         url = self.api + "/tests/" + test_type + "/"
-        try:
-            response = self.__session.post(url, json=intest)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
+        response = self.execute("post", url, "POST /tests/{type}/", json=intest)
         self.exception_continue_check()
         print(response)
         dict_response = response.json()
@@ -158,17 +299,7 @@ class CfClient:
             intest = json.load(f)
             print(intest)
         url = self.api + "/tests/" + test_type + "/" + test_id
-        try:
-            response = self.__session.put(url, json=intest)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
+        response = self.execute("put", url, "PUT /tests/{type}/{id}", json=intest)
         self.exception_continue_check()
         dict_response = response.json()
         self.append_log_response('put', response.status_code, url, dict_response)
@@ -176,143 +307,65 @@ class CfClient:
 
     def delete_test(self, test_type, test_id):
         self.exception_state = True
-        try:
-            response = self.__session.delete(
-                self.api + "/tests/" + test_type + "/" + test_id
-            )
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-
-        return response
+        url = self.api + "/tests/" + test_type + "/" + test_id
+        return self.execute(
+            "delete", url, "DELETE /tests/{type}/{id}", raise_for_status=False
+        )
 
     def get_queue(self, queue_id):
-        self.exception_state = True
-        url = self.api + "/queues/" + queue_id
-        try:
-            response = self.__session.get(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-        self.exception_continue_check()
-        dict_response = response.json()
-        self.append_log_response('get', response.status_code, url, dict_response)
-        return dict_response
+        return self.get_json("/queues/" + queue_id, "GET /queues/{id}")
 
     def start_test(self, test_id):
         self.exception_state = True
         url = self.api + "/tests/" + test_id + "/start"
-        try:
-            response = self.__session.put(url)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
+        response = self.execute("put", url, "PUT /tests/{id}/start")
         self.exception_continue_check()
         dict_response = response.json()
         self.append_log_response('put', response.status_code, url, dict_response)
         return dict_response
 
     def list_test_runs(self):
-        self.exception_state = True
-        url = self.api + "/test_runs"
-        try:
-            response = self.__session.get(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-        self.exception_continue_check()
-        dict_response = response.json()
-        self.append_log_response('get', response.status_code, url, dict_response)
-        return dict_response
+        return self.get_json("/test_runs", "GET /test_runs")
 
     def get_test_run(self, test_run_id):
-        self.exception_state = True
-        url = self.api + "/test_runs/" + test_run_id
-        try:
-            response = self.__session.get(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-        self.exception_continue_check()
-        dict_response = response.json()
-        self.append_log_response('get', response.status_code, url, dict_response)
-        return dict_response
+        return self.get_json("/test_runs/" + test_run_id, "GET /test_runs/{id}")
 
     def fetch_test_run_statistics(self, test_run_id):
-        self.exception_state = True
-        url = self.api + "/test_runs/" + test_run_id + "/statistics"
-        try:
-            response = self.__session.get(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-        self.exception_continue_check()
-        dict_response = response.json()
-        self.append_log_response('get', response.status_code, url, dict_response)
-        return dict_response
+        return self.get_json(
+            "/test_runs/" + test_run_id + "/statistics",
+            "GET /test_runs/{id}/statistics",
+        )
+
+    def fetch_test_run_snapshot(self, test_run_id):
+        """Fetches test run status and statistics concurrently
+
+        The statistics request runs on a worker thread while the status request runs
+        on the calling thread, both on the pooled session.
+
+        :param test_run_id: test run id
+        :return: RunSnapshot
+        """
+        if self.__fetch_executor is None:
+            self.__fetch_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="cf_fetch"
+            )
+        statistics = self.__fetch_executor.submit(
+            self.fetch_test_run_statistics, test_run_id
+        )
+        test_run = self.get_test_run(test_run_id)
+        return RunSnapshot(test_run, statistics.result(), time.time())
 
     def fetch_event_logs(self, test_run_id):
-        self.exception_state = True
-        url = self.api + "/test_runs/" + test_run_id + "/eventlogs"
-        try:
-            response = self.__session.get(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
-        self.exception_continue_check()
-        dict_response = response.json()
-        self.append_log_response('get', response.status_code, url, dict_response)
-        return dict_response
+        return self.get_json(
+            "/test_runs/" + test_run_id + "/eventlogs", "GET /test_runs/{id}/eventlogs"
+        )
 
     def stop_test(self, test_run_id):
         self.exception_state = True
         url = self.api + "/test_runs/" + test_run_id + "/stop"
-        try:
-            response = self.__session.put(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
+        response = self.execute(
+            "put", url, "PUT /test_runs/{id}/stop", raise_for_status=False
+        )
         self.exception_continue_check()
         dict_response = response.json()
         self.append_log_response('put', response.status_code, url, dict_response)
@@ -322,64 +375,27 @@ class CfClient:
         self.exception_state = True
         load = {"load": new_load}
         url = self.api + "/test_runs/" + test_run_id + "/changeload"
-        try:
-            response = self.__session.put(url, data=load)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
+        response = self.execute("put", url, "PUT /test_runs/{id}/changeload", data=load)
         self.exception_continue_check()
         dict_response = response.json()
         self.append_log_response('put', response.status_code, url, dict_response)
-        log.debug(f"change load: {load} > {json.dumps(dict_response, indent=4)}"
-                  f"response: {response}")
+        log.debug("change load: %s > %sresponse: %s", load, LazyJson(dict_response), response)
         return dict_response
 
     def get_system_version(self):
+        return self.get_json("/system/version", "GET /system/version")
+
+    def get_json(self, path, endpoint):
+        """GET request without status check that exits on request errors
+
+        :param path: api path, e.g. /test_runs/<id>
+        :param endpoint: endpoint label for metrics
+        :return: decoded json response
+        """
         self.exception_state = True
-        url = self.api + "/system/version"
-        try:
-            response = self.__session.get(url)
-        except requests.exceptions.HTTPError as errh:
-            self.requests_error_handler("http", errh, response)
-        except requests.exceptions.ConnectionError as errc:
-            self.requests_error_handler("connection", errc, None)
-        except requests.exceptions.Timeout as errt:
-            self.requests_error_handler("timeout", errt, None)
-        except requests.exceptions.RequestException as err:
-            self.requests_error_handler("other", err, None)
+        url = self.api + path
+        response = self.execute("get", url, endpoint, raise_for_status=False)
         self.exception_continue_check()
         dict_response = response.json()
         self.append_log_response('get', response.status_code, url, dict_response)
         return dict_response
-
-    def requests_error_handler(self, error_type, error_response, json_response):
-        if error_type == "http":
-            report_error = f"Http Error: {error_response}"
-        elif error_type == "connection":
-            report_error = f"Error Connecting: {error_response}"
-        elif error_type == "timeout":
-            report_error = f"Timeout Error: {error_response}"
-        elif error_type == "other":
-            report_error = (
-                f"Other error, not http, connection or timeout error: {error_response}"
-            )
-        else:
-            report_error = f"unknown"
-
-        log.debug(report_error)
-        print(report_error)
-        if json_response is not None:
-            log.debug(json_response.json())
-            print(json_response.json())
-        # sys.exit(1)
-        self.exception_state = False
-
-    def exception_continue_check(self):
-        if not self.exception_state:
-            sys.exit(1)
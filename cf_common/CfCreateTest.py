@@ -5,6 +5,8 @@ import csv
 
 from cf_common.CfClient import *
 
+log = logging.getLogger(__name__)
+
 
 class BaseTest:
     def __init__(self, base):
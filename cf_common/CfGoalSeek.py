@@ -0,0 +1,228 @@
+import logging
+import math
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class GoalSeekStrategy:
+    """Picks the next load of a goal seeking test
+
+    Strategies are selected per test with the goal_seek_strategy column of
+    run_tests.csv and are used for the connections/second, bandwidth and connections
+    load types (CfRunTest.check_if_load_type_default). They keep no state, the
+    search state is kept in RunData so it is saved with checkpoints.
+    """
+
+    name = None
+    # used for SimUsers load types too, not only for the default load types
+    all_load_types = False
+
+    def next_load(self, rt, rd):
+        """
+        :param rt: CfRunTest of the test.
+        :param rd: RunData of the test.
+        :return: next load, or False to stop goal seeking.
+        """
+        raise NotImplementedError
+
+
+class StepGoalSeek(GoalSeekStrategy):
+    """Fixed incr_low/med/high steps below low/med/high_threshold loads"""
+
+    name = "step"
+
+    def next_load(self, rt, rd):
+        return rt.goal_seek_set_default(rd)
+
+
+class BisectionGoalSeek(GoalSeekStrategy):
+    """Exponential probing followed by bisection
+
+    The load is doubled while the DUT sustains it, then the range between the last
+    stable and the first unstable load is halved until it is not wider than
+    incr_high * capacity_adjust. A load is stable when the current load reaches the
+    desired load (current/desired variance >= 0.97) and kpi_1 is stable by
+    RollingStats.check_if_stable. high_threshold is the max load. When the search
+    converges the load is set back to the last stable load for the sustain period.
+    """
+
+    name = "bisection"
+    growth = 2
+    sustained_variance = 0.97
+
+    def next_load(self, rt, rd):
+        if rd.goal_seek_converged:
+            return False
+        desired = rd.c_desired_load
+        step = max(rd.in_incr_high * rd.in_capacity_adjust, 2)
+        if self.is_stable(rd):
+            rd.goal_seek_stable_load = max(rd.goal_seek_stable_load, desired)
+        elif rd.goal_seek_unstable_load is None:
+            rd.goal_seek_unstable_load = desired
+        else:
+            rd.goal_seek_unstable_load = min(rd.goal_seek_unstable_load, desired)
+        stable = rd.goal_seek_stable_load
+        unstable = rd.goal_seek_unstable_load
+        log.info(f"bisection goal seek, stable load: {stable} unstable load: {unstable}")
+
+        max_load = self.max_load(rt, rd)
+        if unstable is None:
+            if stable >= max_load:
+                log.info(f"stable load {stable} >= max load {max_load}")
+                return False
+            return min(max(stable * self.growth, stable + step), max_load)
+        if unstable - stable <= step:
+            rd.goal_seek_converged = True
+            if stable > 0 and desired != stable:
+                return stable
+            return False
+        return self.round_up_to_even((stable + unstable) / 2)
+
+    def is_stable(self, rd):
+        return (
+            rd.c_current_desired_load_variance >= self.sustained_variance
+            and rd.kpi_1.stable
+        )
+
+    def max_load(self, rt, rd):
+        return rd.in_threshold_high
+
+    @staticmethod
+    def round_up_to_even(v):
+        return math.ceil(v / 2.0) * 2
+
+
+class LatencyGoalSeek(BisectionGoalSeek):
+    """Max load with the latency KPI under a ceiling
+
+    Bisection where a load is only stable if the rolling average of latency_kpi
+    (ttfb or response_time) is not above latency_ceiling, so the load backs off and
+    bisects when the ceiling is breached. Used for all load types when the test has a
+    latency_ceiling. high_threshold is the max load for the default load types, the
+    SimUsers load types have no max load.
+    """
+
+    name = "latency"
+    all_load_types = True
+
+    def is_stable(self, rd):
+        latency = rd.latency_kpi.avg_val
+        log.info(
+            f"latency {rd.in_latency_kpi}: {latency} ceiling: {rd.in_latency_ceiling}"
+        )
+        return super().is_stable(rd) and latency <= rd.in_latency_ceiling
+
+    def max_load(self, rt, rd):
+        if rt.check_if_load_type_default(rd):
+            return rd.in_threshold_high
+        return math.inf
+
+
+class KneeGoalSeek(GoalSeekStrategy):
+    """Jumps to the knee of a saturation curve fitted to the goal seek iterations
+
+    The (desired load, kpi_1) point of each iteration is fitted to the saturating
+    curve kpi = fit_max * x / (1 + x ** n) ** (1 / n) with x = load / fit_scale and
+    n = fit_sharpness (Michaelis-Menten for n = 1). The knee is the load where the
+    curve reaches knee_fraction of fit_max. Each iteration jumps to the predicted
+    knee, at most growth times the current load while the points are still linear,
+    and the search stops when the knee is within max(incr_high * capacity_adjust,
+    knee_tolerance * knee) of the current load or after max_probes iterations. The
+    fit is saved in RunData and the detailed report. Used for all load types,
+    high_threshold is the max load for the default load types.
+    """
+
+    name = "knee"
+    all_load_types = True
+    growth = 2
+    knee_fraction = 0.9
+    knee_tolerance = 0.05
+    max_probes = 12
+    sharpness_grid = (1, 1.5, 2, 3, 4, 6, 8)
+
+    def next_load(self, rt, rd):
+        if rd.goal_seek_converged:
+            return False
+        desired = rd.c_desired_load
+        if rd.goal_seek_points is None:
+            rd.goal_seek_points = []
+        rd.goal_seek_points.append([desired, rd.kpi_1.avg_val])
+        fit = self.fit(rd.goal_seek_points)
+        if fit is None:
+            return self.round_up_to_even(desired * self.growth)
+        rd.goal_seek_fit_max, rd.goal_seek_fit_scale, rd.goal_seek_fit_sharpness = fit
+        knee = self.round_up_to_even(self.knee_load(*fit))
+        rd.goal_seek_knee_load = knee
+        log.info(
+            f"knee goal seek, fit max: {rd.goal_seek_fit_max} scale: "
+            f"{rd.goal_seek_fit_scale} sharpness: {rd.goal_seek_fit_sharpness} "
+            f"knee load: {knee}"
+        )
+
+        max_load = math.inf
+        if rt.check_if_load_type_default(rd):
+            max_load = rd.in_threshold_high
+        step = max(rd.in_incr_high * rd.in_capacity_adjust, 2)
+        tolerance = max(step, self.knee_tolerance * knee)
+        if abs(knee - desired) <= tolerance or desired >= max_load:
+            rd.goal_seek_converged = True
+            return False
+        if len(rd.goal_seek_points) >= self.max_probes:
+            rd.goal_seek_converged = True
+            return min(knee, max_load)
+        return min(knee, self.round_up_to_even(desired * self.growth), max_load)
+
+    def knee_load(self, fit_max, fit_scale, fit_sharpness):
+        f = self.knee_fraction ** fit_sharpness
+        return fit_scale * (f / (1 - f)) ** (1 / fit_sharpness)
+
+    @classmethod
+    def fit(cls, points):
+        """Least squares fit of the saturation curve
+
+        fit_scale and fit_sharpness are searched on a grid, fit_max is the closed
+        form least squares solution for each of them.
+
+        :param points: [load, kpi] pairs.
+        :return: (fit_max, fit_scale, fit_sharpness), None for less than 2 loads > 0.
+        """
+        points = np.array(points, dtype=np.float64)
+        points = points[points[:, 0] > 0]
+        if len(np.unique(points[:, 0])) < 2:
+            return None
+        load, kpi = points[:, 0], points[:, 1]
+        scales = np.geomspace(load.min() / 100, load.max() * 100, 500)
+        best = None
+        for sharpness in cls.sharpness_grid:
+            x = load / scales[:, None]
+            shape = x / (1 + x ** sharpness) ** (1 / sharpness)
+            fit_max = (shape * kpi).sum(axis=1) / (shape * shape).sum(axis=1)
+            sse = ((fit_max[:, None] * shape - kpi) ** 2).sum(axis=1)
+            i = int(sse.argmin())
+            if best is None or sse[i] < best[0]:
+                best = (sse[i], fit_max[i], scales[i], sharpness)
+        _, fit_max, fit_scale, fit_sharpness = best
+        return round(float(fit_max), 2), round(float(fit_scale), 2), fit_sharpness
+
+    @staticmethod
+    def round_up_to_even(v):
+        return math.ceil(v / 2.0) * 2
+
+
+goal_seek_strategies = {
+    strategy.name: strategy
+    for strategy in (
+        StepGoalSeek(), BisectionGoalSeek(), LatencyGoalSeek(), KneeGoalSeek()
+    )
+}
+
+
+def get_goal_seek_strategy(name):
+    """Strategy registered as name, step for empty or unknown names"""
+    name = (name or "step").strip().lower()
+    if name not in goal_seek_strategies:
+        log.warning(f"unknown goal seek strategy {name}, using step")
+        name = "step"
+    return goal_seek_strategies[name]
@@ -0,0 +1,114 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+
+fmt_str = "[%(asctime)s] %(levelname)s %(name)s %(lineno)d: %(message)s"
+
+listener = None
+
+
+class LazyJson:
+    """Defers json.dumps of a log argument until the record is formatted
+
+    Use as a %s argument: log.debug("test run: %s", LazyJson(rd.test_run)). Nothing is
+    serialized when the level is disabled, and with setup_logging the dump runs on the
+    listener thread.
+    """
+
+    __slots__ = ("obj", "indent")
+
+    def __init__(self, obj, indent=4):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self):
+        return json.dumps(self.obj, indent=self.indent, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread
+
+    The standard QueueHandler formats the message on the calling thread. Here the
+    record is queued as is, so LazyJson and % arguments are rendered off the control
+    thread. Arguments must not be mutated after logging, the objects logged by
+    CfRunTest are replaced, not updated, on each tick.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One compact json object per record"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+def setup_logging(
+    file_name="cf.log",
+    level="DEBUG",
+    module_levels=None,
+    log_format="text",
+    file_mode="w",
+):
+    """Configures root logging to file through a QueueHandler/QueueListener pipeline
+
+    :param file_name: log file
+    :param level: root log level
+    :param module_levels: {logger name: level}, e.g. {"urllib3": "INFO"}
+    :param log_format: "text" or "json" for json-lines
+    :param file_mode: "w" to truncate or "a" to append
+    :return: the running QueueListener, stopped at exit
+    """
+    global listener
+    if log_format not in {"text", "json"}:
+        raise ValueError(f"unknown log format: {log_format}")
+    stop_logging()
+    file_handler = logging.FileHandler(file_name, mode=file_mode)
+    if log_format == "json":
+        file_handler.setFormatter(JsonLinesFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(fmt_str))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(LazyQueueHandler(log_queue))
+    root.setLevel(level)
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+
+def stop_logging():
+    """Stops the listener started by setup_logging after writing queued records"""
+    global listener
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, LazyQueueHandler):
+            root.removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,187 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class ResponseLogWriter:
+    """Writes API responses to response.log from a background thread
+
+    Entries are put on a bounded queue and written by a daemon thread so API calls
+    never wait for disk. When the queue is full entries are dropped and counted.
+
+    :param file_name: log file path
+    :param log_format: "text" for the legacy method/status/url + str(response) lines
+     or "json" for one compact json object per line
+    :param max_bytes: rotate when the file is larger, 0 disables rotation
+    :param backup_count: number of rotated files to keep
+    :param compress: gzip rotated files
+    :param queue_size: max queued entries before dropping
+    :param sample_rates: {url substring: n} only log every n-th response of
+     matching urls, e.g. {"/statistics": 10}, 0 never logs them
+    """
+
+    def __init__(
+        self,
+        file_name="response.log",
+        log_format="text",
+        max_bytes=0,
+        backup_count=5,
+        compress=False,
+        queue_size=10000,
+        sample_rates=None,
+    ):
+        if log_format not in {"text", "json"}:
+            raise ValueError(f"unknown response log format: {log_format}")
+        self.file_name = file_name
+        self.log_format = log_format
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.sample_rates = dict(sample_rates or {})
+        for pattern, rate in self.sample_rates.items():
+            if isinstance(rate, bool) or not isinstance(rate, int) or rate < 0:
+                raise ValueError(
+                    f"response log sample rate of {pattern} must be an int >= 0: {rate}"
+                )
+        self.sample_counts = {k: 0 for k in self.sample_rates}
+        self.dropped = 0
+        self.sampled_out = 0
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.file = None
+        self.thread = threading.Thread(
+            target=self.run, name="cf_response_log", daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.close)
+
+    def create(self, resp):
+        """Truncates the log file and writes resp, like the first response of a session"""
+        self.put(("create", time.time(), None, None, None, resp))
+
+    def append(self, method, status, url, resp):
+        if not self.sample(url):
+            return
+        self.put(("append", time.time(), method, status, url, resp))
+
+    def sample(self, url):
+        for pattern, rate in self.sample_rates.items():
+            if pattern in url:
+                with self.lock:
+                    count = self.sample_counts[pattern]
+                    self.sample_counts[pattern] = count + 1
+                    if rate == 0 or count % rate:
+                        self.sampled_out += 1
+                        return False
+                return True
+        return True
+
+    def put(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def flush(self):
+        """Blocks until all queued entries are written"""
+        if self.thread.is_alive():
+            self.queue.join()
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.dropped:
+            log.warning(f"response log queue full, dropped {self.dropped} entries")
+
+    def run(self):
+        while True:
+            entry = self.queue.get()
+            try:
+                if entry is None:
+                    if self.file is not None:
+                        self.file.close()
+                        self.file = None
+                    return
+                self.write(entry)
+            except Exception as e:
+                log.debug(f"response log write failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def format(self, entry):
+        action, ts, method, status, url, resp = entry
+        if self.log_format == "json":
+            if action == "create":
+                record = {"ts": round(ts, 3), "response": resp}
+            else:
+                record = {
+                    "ts": round(ts, 3),
+                    "method": method,
+                    "status": status,
+                    "url": url,
+                    "response": resp,
+                }
+            return json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        if action == "create":
+            return str(resp)
+        return f"\n{method} {status} {url}\n{resp}"
+
+    def write(self, entry):
+        text = self.format(entry)
+        if entry[0] == "create":
+            if self.file is not None:
+                self.file.close()
+            self.file = open(self.file_name, "w")
+        elif self.file is None:
+            self.file = open(self.file_name, "a")
+        self.file.write(text)
+        if self.queue.empty():
+            self.file.flush()
+        if self.max_bytes and self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotated_name(self, i):
+        name = f"{self.file_name}.{i}"
+        return name + ".gz" if self.compress else name
+
+    def rotate(self):
+        self.file.close()
+        self.file = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = self.rotated_name(i)
+                if os.path.exists(source):
+                    os.replace(source, self.rotated_name(i + 1))
+            if self.compress:
+                with open(self.file_name, "rb") as f_in:
+                    with gzip.open(self.rotated_name(1), "wb") as f_out:
+                        shutil.copyfileobj(f_in, f_out)
+                os.remove(self.file_name)
+            else:
+                os.replace(self.file_name, self.rotated_name(1))
+        self.file = open(self.file_name, "w")
+
+
+default_writer = None
+default_writer_lock = threading.Lock()
+
+
+def default_response_log():
+    """Shared ResponseLogWriter with the default response.log settings"""
+    global default_writer
+    with default_writer_lock:
+        if default_writer is None:
+            default_writer = ResponseLogWriter()
+        return default_writer
@@ -0,0 +1,119 @@
+import json
+import logging
+import math
+import os
+import pathlib
+import threading
+import time
+
+from cf_common.CfCheckpoint import json_default
+
+log = logging.getLogger(__name__)
+
+
+class ResultsIndex:
+    """Final loads of goal seeking tests per test, device and software version
+
+    A record is kept per test name, device model, device profile and software version
+    (CfRunTest.get_report_info) with the max load and the load at the end of goal
+    seek of the last completed run. Tests with the warm_start column set start just
+    below the recorded load, see warm_start. The json file is replaced atomically
+    and the index can be shared by the queues of a ParallelSuiteRunner.
+
+    :param file_name: results index json file, read if it exists
+    """
+
+    # warm start load relative to the recorded load
+    warm_start_fraction = 0.9
+    # goal seek increments to reach the recorded load from the warm start load
+    warm_start_steps = 3
+
+    def __init__(self, file_name):
+        self.file_name = pathlib.Path(file_name)
+        self.lock = threading.Lock()
+        self.records = {}
+        if self.file_name.is_file():
+            with open(self.file_name) as f:
+                self.records = json.load(f)
+            log.info(f"results index loaded, {len(self.records)} records")
+
+    def write(self):
+        tmp_file = self.file_name.with_name(self.file_name.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.records, f, indent=4, default=json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.file_name)
+
+    @staticmethod
+    def key(rt, rd):
+        return "|".join(
+            (rd.in_name, rt.device_model, rt.device_profile, rt.software_version)
+        )
+
+    def lookup(self, rt, rd):
+        """
+        :return: record of the last completed run of the test on the same device
+         model, profile and software version, or None.
+        """
+        with self.lock:
+            return self.records.get(self.key(rt, rd))
+
+    def record(self, rt, rd):
+        """Records the loads of a completed goal seeking test
+
+        Only a finished goal seek sets final_load, a goal seek ended by the test
+        timeout is not recorded.
+        """
+        if not rd.in_goal_seek or not rd.final_load:
+            log.info(f"results index, goal seek of {self.key(rt, rd)} not finished")
+            return
+        with self.lock:
+            self.records[self.key(rt, rd)] = {
+                "test_name": rd.in_name,
+                "device_model": rt.device_model,
+                "device_profile": rt.device_profile,
+                "software_version": rt.software_version,
+                "load_type": rd.in_load_type,
+                "max_load": max(rd.rolling_current_load.highest_value, rd.final_load),
+                "current_load": rd.final_load,
+                "goal_seek_count": rd.goal_seek_count,
+                "max_load_reached": rd.max_load_reached,
+                "time_stamp": time.strftime("%Y%m%d-%H%M"),
+            }
+            self.write()
+        log.info(f"results index record {self.key(rt, rd)}: {rd.final_load}")
+
+    def warm_start(self, rt, rd):
+        """Sets start load and increments of a warm start test from its record
+
+        The start load is warm_start_fraction of the recorded load at the end of goal
+        seek, the low and med increments are lowered so that the recorded load is
+        reached in warm_start_steps goal seek iterations, not below incr_high.
+
+        :return: True if the start load was changed
+        """
+        record = self.lookup(rt, rd)
+        if record is None:
+            log.info(f"warm start, no results index record for {self.key(rt, rd)}")
+            return False
+        if record["load_type"] != rd.in_load_type:
+            log.info(f"warm start, recorded load type {record['load_type']} differs")
+            return False
+        load = record["current_load"]
+        start_load = int(load * self.warm_start_fraction)
+        if start_load <= rd.in_start_load:
+            return False
+        step = math.ceil(
+            (load - start_load) / self.warm_start_steps / rd.in_capacity_adjust
+        )
+        step = max(step, rd.in_incr_high)
+        rd.in_incr_low = min(rd.in_incr_low, step)
+        rd.in_incr_med = min(rd.in_incr_med, step)
+        log.info(
+            f"warm start, start load {rd.in_start_load} -> {start_load}, recorded "
+            f"load {load} ({record['time_stamp']}), incr low/med: "
+            f"{rd.in_incr_low}/{rd.in_incr_med}"
+        )
+        rd.in_start_load = start_load
+        return True
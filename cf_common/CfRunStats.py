@@ -0,0 +1,115 @@
+import logging
+
+log = logging.getLogger(__name__)
+
+# value transforms of the run stats schema
+run_stats_transforms = {
+    None: None,
+    "round1": lambda value: round(value, 1),
+    "round3": lambda value: round(value, 3),
+    "int": int,
+}
+
+# /statistics counters copied to RunData: (side, type, subType, RunData field,
+# transform). subType is None for counters without one, e.g. timeElapsed. A counter
+# missing from a response is set to 0. When a type and subType appear more than once
+# the last value is used.
+run_stats_schema = (
+    ("client", "driver", "rxBandwidth", "c_rx_bandwidth", None),
+    ("client", "driver", "rxPacketCount", "c_rx_packet_count", None),
+    ("client", "driver", "rxPacketRate", "c_rx_packet_rate", None),
+    ("client", "driver", "txBandwidth", "c_tx_bandwidth", None),
+    ("client", "driver", "txPacketCount", "c_tx_packet_count", None),
+    ("client", "driver", "txPacketRate", "c_tx_packet_rate", None),
+    ("client", "sum", "rxByteRate", "c_rx_byte_rate", None),
+    ("client", "sum", "txByteRate", "c_tx_byte_rate", None),
+    ("client", "http", "abortedTxns", "c_http_aborted_txns", None),
+    ("client", "http", "abortedTxnsPerSec", "c_http_aborted_txns_sec", None),
+    ("client", "sum", "attemptedTxns", "c_http_attempted_txns", None),
+    ("client", "sum", "attemptedTxnsPerSec", "c_http_attempted_txns_sec", None),
+    ("client", "sum", "successfulTxns", "c_http_successful_txns", None),
+    ("client", "sum", "successfulTxnsPerSec", "c_http_successful_txns_sec", None),
+    ("client", "sum", "unsuccessfulTxns", "c_http_unsuccessful_txns", None),
+    ("client", "sum", "unsuccessfulTxnsPerSec", "c_http_unsuccessful_txns_sec", None),
+    ("client", "loadspec", "averageIdleTime", "c_loadspec_avg_idle", None),
+    ("client", "loadspec", "cpuUtilized", "c_loadspec_avg_cpu", "round1"),
+    ("client", "memory", "mainPoolSize", "c_memory_main_size", None),
+    ("client", "memory", "mainPoolUsed", "c_memory_main_used", None),
+    ("client", "memory", "packetMemoryUsed", "c_memory_packetmem_used", None),
+    ("client", "memory", "rcvQueueLength", "c_memory_rcv_queue_length", None),
+    ("client", "simusers", "simUsersAlive", "c_simusers_alive", None),
+    ("client", "simusers", "simUsersAnimating", "c_simusers_animating", None),
+    ("client", "simusers", "simUsersBlocking", "c_simusers_blocking", None),
+    ("client", "simusers", "simUsersSleeping", "c_simusers_sleeping", None),
+    ("client", "simusers", "simUsersSuspending", "c_simusers_suspending", None),
+    ("client", "sum", "currentLoadSpecCount", "c_current_load", None),
+    ("client", "sum", "desiredLoadSpecCount", "c_desired_load", None),
+    ("client", "tcp", "averageTimeToFirstByte", "c_tcp_avg_ttfb", "round1"),
+    ("client", "tcp", "averageTimeToSynAck", "c_tcp_avg_tt_synack", "round1"),
+    ("client", "tcp", "cummulativeAttemptedConns", "c_tcp_cumulative_attempted_conns", None),
+    ("client", "tcp", "cummulativeEstablishedConns", "c_tcp_cumulative_established_conns", None),
+    ("client", "url", "averageRespTimePerUrl", "c_url_avg_response_time", "round1"),
+    ("client", "sum", "attemptedConnRate", "c_tcp_attempted_conn_rate", None),
+    ("client", "sum", "establishedConnRate", "c_tcp_established_conn_rate", None),
+    ("client", "sum", "attemptedConns", "c_tcp_attempted_conns", None),
+    ("client", "sum", "currentEstablishedConns", "c_tcp_established_conns", None),
+    ("client", "timeElapsed", None, "time_elapsed", None),
+    ("client", "timeRemaining", None, "time_remaining", None),
+    ("server", "driver", "rxBandwidth", "s_rx_bandwidth", None),
+    ("server", "driver", "rxPacketCount", "s_rx_packet_count", None),
+    ("server", "driver", "rxPacketRate", "s_rx_packet_rate", None),
+    ("server", "driver", "txBandwidth", "s_tx_bandwidth", None),
+    ("server", "driver", "txPacketCount", "s_tx_packet_count", None),
+    ("server", "driver", "txPacketRate", "s_tx_packet_rate", None),
+    ("server", "memory", "mainPoolSize", "s_memory_main_size", None),
+    ("server", "memory", "mainPoolUsed", "s_memory_main_used", None),
+    ("server", "memory", "packetMemoryUsed", "s_memory_packetmem_used", None),
+    ("server", "memory", "rcvQueueLength", "s_memory_rcv_queue_length", None),
+    ("server", "memory", "cpuUtilized", "s_memory_avg_cpu", "round1"),
+    ("server", "sum", "closedWithError", "s_tcp_closed_error", None),
+    ("server", "sum", "closedWithNoError", "s_tcp_closed", None),
+    ("server", "sum", "closedWithReset", "s_tcp_closed_reset", None),
+)
+
+
+class StatsExtractor:
+    """Copies /statistics counters to RunData fields by a run stats schema
+
+    The schema is compiled once to a (type, subType) lookup per side, extract walks
+    each response list once and updates the RunData fields in one step. More counters
+    are captured by adding schema rows, e.g. extra_run_stats of cf_config.py.
+
+    :param schema: (side, type, subType, RunData field, transform) rows, transform
+     is a run_stats_transforms name or a function.
+    """
+
+    def __init__(self, schema=run_stats_schema):
+        self.lookups = {"client": {}, "server": {}}
+        self.defaults = {}
+        for side, stat_type, sub_type, field, transform in schema:
+            if side not in self.lookups:
+                raise ValueError(f"unknown run stats side {side} for {field}")
+            if not callable(transform):
+                if transform not in run_stats_transforms:
+                    raise ValueError(f"unknown run stats transform {transform} for {field}")
+                transform = run_stats_transforms[transform]
+            self.lookups[side][(stat_type, sub_type)] = (field, transform)
+            self.defaults[field] = 0
+
+    def extract(self, rd, run_stats):
+        """
+        Sets the schema fields of rd from a /statistics response.
+        :param run_stats: dict with client and server lists of type, subType, value.
+        :return: dict of the values set.
+        """
+        values = dict(self.defaults)
+        for side, lookup in self.lookups.items():
+            for stat in run_stats.get(side, ()):
+                target = lookup.get((stat.get("type"), stat.get("subType")))
+                if target is None or "value" not in stat:
+                    continue
+                field, transform = target
+                value = stat["value"]
+                values[field] = value if transform is None else transform(value)
+        vars(rd).update(values)
+        return values
@@ -1,5 +1,9 @@
+import io
 import json
 import logging
+import multiprocessing
+import re
+import threading
 import time
 import sys
 import os
@@ -8,15 +12,33 @@ import pandas as pd
 import pathlib
 import sys
 import math
+import operator
+import uuid
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # optional dependency, only needed for DetailedColumnarReport
+    pa = None
+
 script_version = 1.80
 
 project_dir = pathlib.Path().absolute().parent
 sys.path.append(str(project_dir))
 
 from cf_common.CfClient import *
+from cf_common.CfGoalSeek import get_goal_seek_strategy
+from cf_common.CfLogging import LazyJson
+from cf_common.CfRunStats import StatsExtractor
+from cf_common.CfSteadyState import get_steady_state_method, precision_reached
+from cf_common.cf_functions import write_html_report
+
+log = logging.getLogger(__name__)
 
 
 class RollingStats:
@@ -26,13 +48,16 @@ class RollingStats:
     For example:
     - transactions per second window size can be 2 or higher with 0 round digits
     - time to first byte can have 1 round digit, best is to use the same window size
+
+    The window is a fixed size ring buffer with a running sum and monotonic
+    min/max deques, so an update is O(1) amortized regardless of window size.
     """
 
     def __init__(self, sample_window_size, round_digits):
-        # initiate list with sample size count of zeros
+        # initiate ring buffer with sample size count of zeros
         self.sample_size = sample_window_size
         self.round_digits = round_digits
-        self.list = [0] * self.sample_size
+        self.reset()
         self.current_value = 0
         self.avg_val = 0
         self.avg_val_last = 0
@@ -45,6 +70,11 @@ class RollingStats:
         self.stable = False
         self.stable_count = 0
 
+    @property
+    def list(self):
+        """Values in the rolling window, oldest first"""
+        return self._ring[self._head:] + self._ring[: self._head]
+
     def update(self, new_value):
         """Updates Rolling List and returns current variance
 
@@ -52,20 +82,44 @@ class RollingStats:
         :return: variance
         """
         self.current_value = new_value
-        if len(self.list) == self.sample_size:
-            self.list.pop(0)
-        self.list.append(self.current_value)
-        self.avg_val = sum(self.list) / len(self.list)
+        self._push(new_value)
+        self.avg_val = self._sum / self.sample_size
         self.avg_val = round(self.avg_val, self.round_digits)
         if self.round_digits == 0:
             self.avg_val = int(self.avg_val)
-        max_var = max(self.list) - min(self.list)
+        max_var = self._max_deque[0][1] - self._min_deque[0][1]
         self.variance = (max_var / self.avg_val) if self.avg_val != 0 else 0
         self.variance = round(self.variance, 3)
         # check if new value value is the new high for later use
         self.check_if_highest()
         return self.variance
 
+    def _push(self, new_value):
+        """Replaces the oldest window value and maintains sum, min and max
+
+        The running sum is recomputed from the window each time the ring wraps,
+        which keeps float rounding error bounded at O(1) amortized cost.
+        """
+        self._sum += new_value - self._ring[self._head]
+        self._ring[self._head] = new_value
+        self._head += 1
+        if self._head == self.sample_size:
+            self._head = 0
+            self._sum = sum(self._ring)
+        seq = self._seq
+        self._seq += 1
+        while self._max_deque and self._max_deque[-1][1] <= new_value:
+            self._max_deque.pop()
+        self._max_deque.append((seq, new_value))
+        while self._min_deque and self._min_deque[-1][1] >= new_value:
+            self._min_deque.pop()
+        self._min_deque.append((seq, new_value))
+        oldest = seq - self.sample_size
+        if self._max_deque[0][0] <= oldest:
+            self._max_deque.popleft()
+        if self._min_deque[0][0] <= oldest:
+            self._min_deque.popleft()
+
     def reset(self):
         """Resets rolling window back to all 0
 
@@ -74,7 +128,13 @@ class RollingStats:
 
         :return: None
         """
-        self.list = [0] * self.sample_size
+        self._ring = [0] * self.sample_size
+        self._head = 0
+        self._sum = 0
+        # the window is all zeros, the newest zero represents both min and max
+        self._seq = self.sample_size
+        self._max_deque = deque([(self._seq - 1, 0)])
+        self._min_deque = deque([(self._seq - 1, 0)])
 
     def check_if_stable(self, max_var_reference):
         """Checks if load is stable in current list
@@ -144,6 +204,362 @@ class RollingStats:
         if not self.new_high:
             return False 
 
+class RollingStatsBank:
+    """Rolling window statistics for many KPIs, updated together
+
+    All KPI windows live in one 2-D NumPy array (one row per KPI) that is used as a
+    ring buffer, so mean, variance, stability, new high and increase since the last
+    load change are computed for every KPI in one vectorized step per tick.
+    add() returns a RollingStatsView per KPI that reads like a RollingStats object.
+    """
+
+    def __init__(self, sample_window_size):
+        self.sample_size = sample_window_size
+        self.names = []
+        self.views = {}
+        self.head = 0
+        self.round_digits = np.zeros(0, dtype=int)
+        self.window = np.zeros((0, self.sample_size))
+        self.sum = np.zeros(0)
+        self.current_value = np.zeros(0)
+        self.avg_val = np.zeros(0)
+        self.avg_val_last = np.zeros(0)
+        self.increase_avg = np.zeros(0)
+        self.variance = np.zeros(0)
+        self.avg_max_load_variance = np.zeros(0)
+        self.new_high = np.zeros(0, dtype=bool)
+        self.highest_value = np.zeros(0)
+        self.not_high_count = np.zeros(0, dtype=int)
+        self.stable = np.zeros(0, dtype=bool)
+        self.stable_count = np.zeros(0, dtype=int)
+
+    def add(self, name, round_digits):
+        """Adds a KPI row and returns its view
+
+        :param name: KPI name, e.g. tps
+        :param round_digits: number of digits to round the average to
+        :return: RollingStatsView for the new row
+        """
+        row = len(self.names)
+        self.names.append(name)
+        self.round_digits = np.append(self.round_digits, round_digits)
+        self.window = np.vstack((self.window, np.zeros((1, self.sample_size))))
+        for key in (
+            "sum",
+            "current_value",
+            "avg_val",
+            "avg_val_last",
+            "increase_avg",
+            "variance",
+            "avg_max_load_variance",
+            "highest_value",
+        ):
+            setattr(self, key, np.append(getattr(self, key), 0.0))
+        for key in ("new_high", "stable"):
+            setattr(self, key, np.append(getattr(self, key), False))
+        for key in ("not_high_count", "stable_count"):
+            setattr(self, key, np.append(getattr(self, key), 0))
+        self.views[name] = RollingStatsView(self, row)
+        return self.views[name]
+
+    # per KPI arrays saved by state()
+    state_arrays = (
+        "round_digits",
+        "window",
+        "sum",
+        "current_value",
+        "avg_val",
+        "avg_val_last",
+        "increase_avg",
+        "variance",
+        "avg_max_load_variance",
+        "new_high",
+        "highest_value",
+        "not_high_count",
+        "stable",
+        "stable_count",
+    )
+
+    def state(self):
+        """JSON serializable copy of the windows and statistics, see load_state"""
+        state = {"sample_size": self.sample_size, "names": list(self.names), "head": self.head}
+        for key in self.state_arrays:
+            state[key] = getattr(self, key).tolist()
+        return state
+
+    def load_state(self, state):
+        """Restores the output of state() into a bank with the same KPIs"""
+        if state["names"] != self.names or state["sample_size"] != self.sample_size:
+            raise ValueError(
+                f"rolling stats state for {state['names']} (window {state['sample_size']}) "
+                f"does not match {self.names} (window {self.sample_size})"
+            )
+        self.head = state["head"]
+        for key in self.state_arrays:
+            setattr(self, key, np.array(state[key], dtype=getattr(self, key).dtype))
+
+    def update(self, new_values):
+        """Updates all KPI windows and returns the variance array
+
+        :param new_values: one new value per KPI, in the order the KPIs were added
+        :return: variance per KPI
+        """
+        new_values = np.asarray(new_values, dtype=float)
+        self.current_value = new_values
+        self.sum += new_values - self.window[:, self.head]
+        self.window[:, self.head] = new_values
+        self.head += 1
+        if self.head == self.sample_size:
+            self.head = 0
+            self.sum = self.window.sum(axis=1)
+        self.avg_val = self.round_array(self.sum / self.sample_size, self.round_digits)
+        max_var = self.window.max(axis=1) - self.window.min(axis=1)
+        self.variance = self.round_array(
+            self.safe_divide(max_var, self.avg_val), 3
+        )
+        self.check_if_highest()
+        return self.variance
+
+    def reset(self, row):
+        """Resets a single KPI window back to all 0"""
+        self.window[row] = 0
+        self.sum[row] = 0
+
+    def check_if_stable(self, max_var_reference, stable=None):
+        """Checks which KPIs are stable in the current windows
+
+        Stable KPIs also get their increase since the last load change set.
+
+        :param max_var_reference: scalar or one reference value per KPI, e.g. 0.03 for 3%
+        :param stable: optional boolean array of a steady state method, see
+            CfSteadyState, used instead of the variance check
+        :return: boolean stable array
+        """
+        if stable is None:
+            stable = self.variance <= max_var_reference
+        self.stable = np.asarray(stable, dtype=bool)
+        self.stable_count = np.where(self.stable, self.stable_count + 1, 0)
+        self.increase_since_last_load_change(self.stable)
+        return self.stable
+
+    def increase_since_last_load_change(self, rows):
+        """Sets increase_avg for the selected rows, see RollingStats"""
+        has_last = self.avg_val_last != 0
+        increase = self.round_array(
+            self.safe_divide(self.avg_val - self.avg_val_last, self.avg_val_last) * 100,
+            2,
+        )
+        self.increase_avg = np.where(rows & has_last, increase, self.increase_avg)
+        self.avg_val_last = np.where(rows & ~has_last, 1, self.avg_val_last)
+
+    def load_increase_complete(self, row=None):
+        """Sets last load change value for a single row or all rows"""
+        if row is None:
+            self.avg_val_last = self.avg_val.copy()
+        else:
+            self.avg_val_last[row] = self.avg_val[row]
+
+    def check_if_highest(self):
+        """Checks and sets highest value reference for all rows, see RollingStats"""
+        self.new_high = self.highest_value < self.avg_val
+        self.highest_value = np.where(self.new_high, self.avg_val, self.highest_value)
+        self.not_high_count = np.where(self.new_high, 0, self.not_high_count + 1)
+        self.avg_max_load_variance = self.round_array(
+            self.safe_divide(self.avg_val, self.highest_value), 2
+        )
+        return self.new_high
+
+    def ordered_window(self, row):
+        """Window values of one row, oldest first"""
+        return np.roll(self.window[row], -self.head)
+
+    def ordered_windows(self):
+        """Window values of all rows, oldest first"""
+        return np.roll(self.window, -self.head, axis=1)
+
+    @staticmethod
+    def round_array(values, digits):
+        """Vectorized equivalent of python round(value, digits)
+
+        Python rounds the exact binary value, so a scaled value that lands on .5 only
+        because of the multiplication is resolved with the exact product error.
+        """
+        values = np.asarray(values, dtype=float)
+        scale = 10.0 ** np.asarray(digits)
+        scaled = values * scale
+        rounded = np.round(scaled)
+        tie = np.abs(scaled - np.trunc(scaled)) == 0.5
+        if tie.any():
+            error = RollingStatsBank.product_error(values, scale, scaled)
+            rounded = np.where(tie & (error > 0), np.ceil(scaled), rounded)
+            rounded = np.where(tie & (error < 0), np.floor(scaled), rounded)
+        return rounded / scale
+
+    @staticmethod
+    def product_error(a, b, product):
+        """Exact error of the float product a * b (Dekker two-product)"""
+        def split(x):
+            t = 134217729.0 * x  # 2**27 + 1
+            high = t - (t - x)
+            return high, x - high
+
+        a_high, a_low = split(a)
+        b_high, b_low = split(np.broadcast_to(b, np.shape(a)))
+        return (
+            ((a_high * b_high - product) + a_high * b_low + a_low * b_high)
+            + a_low * b_low
+        )
+
+    @staticmethod
+    def safe_divide(numerator, denominator):
+        """Element wise division returning 0 where the denominator is 0"""
+        out = np.zeros_like(numerator, dtype=float)
+        return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+class RollingStatsView:
+    """Per KPI view into a RollingStatsBank row
+
+    Exposes the same attributes as RollingStats so callers can use either.
+    """
+
+    def __init__(self, bank, row):
+        self.bank = bank
+        self.row = row
+        self.name = bank.names[row]
+        self.round_digits = int(bank.round_digits[row])
+        self.sample_size = bank.sample_size
+
+    def value(self, raw):
+        if self.round_digits == 0:
+            return int(raw)
+        return float(raw)
+
+    @property
+    def list(self):
+        return [self.value(v) for v in self.bank.ordered_window(self.row)]
+
+    @property
+    def current_value(self):
+        return self.value(self.bank.current_value[self.row])
+
+    @property
+    def avg_val(self):
+        return self.value(self.bank.avg_val[self.row])
+
+    @property
+    def avg_val_last(self):
+        return self.value(self.bank.avg_val_last[self.row])
+
+    @property
+    def highest_value(self):
+        return self.value(self.bank.highest_value[self.row])
+
+    @property
+    def increase_avg(self):
+        return float(self.bank.increase_avg[self.row])
+
+    @property
+    def variance(self):
+        return float(self.bank.variance[self.row])
+
+    @property
+    def avg_max_load_variance(self):
+        return float(self.bank.avg_max_load_variance[self.row])
+
+    @property
+    def new_high(self):
+        return bool(self.bank.new_high[self.row])
+
+    @property
+    def not_high_count(self):
+        return int(self.bank.not_high_count[self.row])
+
+    @property
+    def stable(self):
+        return bool(self.bank.stable[self.row])
+
+    @property
+    def stable_count(self):
+        return int(self.bank.stable_count[self.row])
+
+    def reset(self):
+        self.bank.reset(self.row)
+
+    def load_increase_complete(self):
+        self.bank.load_increase_complete(self.row)
+
+
+class TickScheduler:
+    """Runs control loop ticks on absolute deadlines
+
+    Tick deadlines are start + n * period, so the time spent in API calls inside a
+    tick does not stretch the period. The period can be set per phase, with
+    "default" used for phases that are not listed. When a tick overruns its
+    deadline the policy decides how to continue:
+    - skip: missed deadlines are dropped, the next tick waits for the next deadline
+    - catch_up: missed ticks run back to back until the schedule is caught up
+
+    jitter is the lateness of the last tick in seconds, overruns counts ticks that
+    started after their deadline.
+    """
+
+    def __init__(self, periods=None, policy="skip", clock=time.monotonic, sleep=time.sleep):
+        self.periods = {"default": 4}
+        if periods:
+            self.periods.update(periods)
+        if policy not in {"skip", "catch_up"}:
+            log.warning(f"unknown tick policy {policy}, using skip")
+            policy = "skip"
+        self.policy = policy
+        self.clock = clock
+        self.sleep = sleep
+        self.phase = None
+        self.period = self.periods["default"]
+        self.started_at = self.clock()
+        self.next_deadline = self.started_at + self.period
+        self.ticks = 0
+        self.jitter = 0.0
+        self.overruns = 0
+
+    def start(self, phase):
+        """Starts the schedule for phase, the first deadline is one period from now
+
+        :param phase: phase name used to look up the period
+        :return: None
+        """
+        self.phase = phase
+        self.period = self.periods.get(phase, self.periods["default"])
+        self.started_at = self.clock()
+        self.next_deadline = self.started_at + self.period
+
+    def elapsed(self):
+        """Seconds since the current phase schedule started"""
+        return self.clock() - self.started_at
+
+    def wait(self):
+        """Waits for the next tick deadline
+
+        :return: jitter, lateness of the tick vs. its deadline in seconds
+        """
+        now = self.clock()
+        if now > self.next_deadline:
+            self.overruns += 1
+            if self.policy == "skip":
+                missed = math.ceil((now - self.next_deadline) / self.period)
+                self.next_deadline += missed * self.period
+                log.debug(
+                    f"tick overrun in {self.phase}, skipping {missed} tick(s)"
+                )
+        while now < self.next_deadline:
+            self.sleep(self.next_deadline - now)
+            now = self.clock()
+        self.jitter = round(now - self.next_deadline, 3)
+        self.next_deadline += self.period
+        self.ticks += 1
+        return self.jitter
+
+
 @dataclass
 class RunData:
     """Data class with default values used by RunTest"""
@@ -170,6 +586,11 @@ class RunData:
     in_threshold_high: float = 1.0
     variance_sample_size: int = 3
     in_max_variance: float = 0.03
+    in_stability_method: str = 'variance'
+    in_stability_window: int = 10
+    # max relative half width of the kpi_1 95% confidence interval, 0 runs the full time
+    in_precision: float = 0.0
+    in_warm_start: bool = False
     in_ramp_low: int = 60
     in_ramp_med: int = 40
     in_ramp_high: int = 20
@@ -187,6 +608,9 @@ class RunData:
     simuser_birth_rate_max_capacity: float = 1
 
     in_goal_seek: bool = False
+    in_goal_seek_strategy: str = 'step'
+    in_latency_kpi: str = 'ttfb'
+    in_latency_ceiling: float = 0.0
     first_steady_interval: bool = True
 
     test_config: dict = None
@@ -290,21 +714,44 @@ class RunData:
     first_goal_load_increase: bool = True
     minimum_goal_seek_count: int = 1
     goal_seek_count: int = 0
+    # search state of goal seek strategies, see CfGoalSeek
+    goal_seek_stable_load: int = 0
+    goal_seek_unstable_load: int = None
+    goal_seek_converged: bool = False
+    # (desired load, kpi_1) of each goal seek iteration and the saturation curve fit
+    goal_seek_points: list = None
+    goal_seek_fit_max: float = 0.0
+    goal_seek_fit_scale: float = 0.0
+    goal_seek_fit_sharpness: float = 0.0
+    goal_seek_knee_load: int = 0
     max_load_reached: bool = False
     max_load: int = 0
     stop: bool = False  # test loop control
+    stop_reason: str = None
+    # goal seek ended by the strategy or max load, not by a timeout
+    goal_seek_finished: bool = False
+    # load at the end of a finished goal seek, recorded in the results index
+    final_load: int = 0
+    # kpi_1 samples of the steady phase or sustain period for the early stop
+    early_stop_values: list = None
     phase: str = None  # time phase of test: ramp up, steady ramp down
 
     # rolling statistics
     rolling_sample_size: int = 3
     max_var_reference: float = 0.03
-    rolling_tps: RollingStats = None
-    rolling_ttfb: RollingStats = None
-    rolling_current_load: RollingStats = None
-    rolling_count_since_goal_seek: RollingStats = None
-    rolling_cps: RollingStats = None
-    rolling_conns: RollingStats = None
-    rolling_bw: RollingStats = None
+    rolling_bank: RollingStatsBank = None
+    rolling_max_var: any = None
+    # stability_window samples per KPI for the statistical stability methods
+    rolling_steady_bank: RollingStatsBank = None
+    rolling_kpi_rows: any = None
+    rolling_tps: RollingStatsView = None
+    rolling_ttfb: RollingStatsView = None
+    rolling_current_load: RollingStatsView = None
+    rolling_count_since_goal_seek: RollingStatsView = None
+    rolling_cps: RollingStatsView = None
+    rolling_conns: RollingStatsView = None
+    rolling_bw: RollingStatsView = None
+    rolling_response_time: RollingStatsView = None
 
     kpi_1: any = None
     kpi_2: any = None
@@ -313,6 +760,7 @@ class RunData:
     kpi_1_list: list = None
     kpi_2_list: list = None
     ramp_seek_kpi: any = None
+    latency_kpi: any = None
 
     start_time: any = None
     timer: any = None
@@ -323,28 +771,150 @@ class RunData:
     time_to_stop: int = 0
     test_started: bool = False
 
+class IterationRecorder:
+    """Records RunData fields once per goal seek, ramp seek or open conns iteration
+
+    Values are read with one operator.attrgetter built from the fields (dotted names
+    like kpi_1.avg_val work) and stored with the clock time in a preallocated float64
+    array, one row per field, that doubles when full. None is stored as nan and
+    booleans as 0/1. Export with to_frame, to_csv or to_parquet (requires pyarrow).
+
+    :param fields: (column name, RunData attribute) pairs.
+    :param capacity: initial number of iterations.
+    """
+
+    def __init__(self, fields, capacity=64):
+        self.fields = tuple(tuple(pair) for pair in fields)
+        self.columns = ("time",) + tuple(name for name, _ in self.fields)
+        self.getter = operator.attrgetter(*(attr for _, attr in self.fields))
+        self.data = np.empty((len(self.columns), capacity), dtype=np.float64)
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def record(self, t, rd):
+        """Adds an iteration with the current values of the fields of rd"""
+        if self.rows == self.data.shape[1]:
+            grown = np.empty((len(self.columns), 2 * self.rows), dtype=np.float64)
+            grown[:, : self.rows] = self.data[:, : self.rows]
+            self.data = grown
+        values = self.getter(rd)
+        if len(self.fields) == 1:
+            values = (values,)
+        self.data[0, self.rows] = t
+        self.data[1:, self.rows] = np.array(values, dtype=np.float64)
+        self.rows += 1
+
+    def column(self, name):
+        """
+        :return: array view of the recorded values of column name.
+        """
+        return self.data[self.columns.index(name), : self.rows]
+
+    def last(self):
+        """
+        :return: dict of the last iteration, None if nothing is recorded.
+        """
+        if self.rows == 0:
+            return None
+        return dict(zip(self.columns, self.data[:, self.rows - 1].tolist()))
+
+    def to_frame(self, start_time=0.0):
+        """
+        :param start_time: subtracted from the time column, e.g. rd.start_time.
+        :return: DataFrame with one row per iteration.
+        """
+        df = pd.DataFrame(self.data[:, : self.rows].T, columns=list(self.columns))
+        df["time"] = (df["time"] - start_time).round(2)
+        # whole number columns without gaps are int64, like read_detailed_parts
+        for column in self.columns[1:]:
+            values = df[column]
+            if len(values) and values.notna().all() and (values == np.floor(values)).all():
+                df[column] = values.astype(np.int64)
+        return df
+
+    def to_csv(self, csv_file, start_time=0.0):
+        self.to_frame(start_time).to_csv(csv_file, index=False)
+
+    def to_parquet(self, parquet_file, start_time=0.0):
+        if pa is None:
+            raise ImportError("IterationRecorder.to_parquet requires pyarrow")
+        table = pa.Table.from_pandas(self.to_frame(start_time), preserve_index=False)
+        pyarrow.parquet.write_table(table, parquet_file)
+
+    def state(self):
+        """Recorded iterations as a json serializable dict for a checkpoint"""
+        return {"columns": list(self.columns), "rows": self.data[:, : self.rows].tolist()}
+
+    def load_state(self, state):
+        if tuple(state["columns"]) != self.columns:
+            raise ValueError(f"recorded columns {state['columns']} differ")
+        rows = np.array(state["rows"], dtype=np.float64).reshape(len(self.columns), -1)
+        self.rows = 0
+        if rows.shape[1] > self.data.shape[1]:
+            self.data = np.empty((len(self.columns), rows.shape[1]), dtype=np.float64)
+        self.data[:, : rows.shape[1]] = rows
+        self.rows = rows.shape[1]
+
+
+# RunData fields recorded per goal seek and ramp seek iteration by CfRunTest
+seek_iteration_fields = (
+    ("goal_seek_count", "goal_seek_count"),
+    ("ramp_seek_complete", "ramp_seek_complete"),
+    ("desired_load", "c_desired_load"),
+    ("current_load", "c_current_load"),
+    ("tps", "c_http_successful_txns_sec"),
+    ("cps", "c_tcp_established_conn_rate"),
+    ("open_conns", "c_tcp_established_conns"),
+    ("bandwidth", "c_total_bandwidth"),
+    ("ttfb", "c_tcp_avg_ttfb"),
+    ("memory_percent", "c_memory_percent_used"),
+    ("kpi_1", "kpi_1.avg_val"),
+    ("kpi_1_stable", "kpi_1.stable"),
+    ("kpi_2", "kpi_2.avg_val"),
+    ("kpi_2_stable", "kpi_2.stable"),
+)
+
+
 class CfOpenConns:
+    """Open connections goal seek by client and server memory
+
+    Memory used is fitted to a line of the open connections load over every goal
+    seek tick captured in tracker, and the load is set to the prediction for
+    memory_target of the client memory pool, not above the prediction for
+    server_memory_target of the server memory pool. The fit is refined with every
+    tick, a jump more than max_extrapolation times the highest tracked load goes to
+    approach_target first. Until the tracked loads span min_span_fraction of the
+    highest load the load is bounded by the memory used per load, see bounded_load.
+    """
+
+    # client memory pool fraction to fill, server memory pool fraction allowed
+    memory_target = 0.97
+    server_memory_target = 0.95
+    approach_target = 0.9
+    max_extrapolation = 2
+    settled_fraction = 0.01
+    # loads fitted must span this fraction of the highest load, closer loads leave
+    # the slope to memory jitter
+    min_span_fraction = 0.05
+
     def __init__(self, rt):
         self.c_startup_load: int = 0
         self.c_startup_mem: int = 0
         self.c_new_conns_mem: int = 0
-        self.inc_conns_within_c_mem: int = 0
         self.rt = rt  # the CfRunTest object
         self.disabled = True
         self.got_startup_data = False
-        self.first_new_load = True
         self.changed_load_highest = 0
-        # power of 2 dividing the distance between starting open conns load and max load
-        # (e.g.2**5 = 32 steps from current to max)
-        self.steps_to_max = 3
-        self.current_step = 1
         self.tracker_mapper = (
             ("setpoint", "c_desired_load"),
             ("load", "c_current_load"),
             ("memory", "c_memory_main_used"),
+            ("server_memory", "s_memory_main_used"),
             ("cps", "c_tcp_established_conn_rate"),
         )
-        self.tracker = {}
+        self.tracker = IterationRecorder(self.tracker_mapper)
 
     def enable(self):
         self.disabled = False
@@ -372,11 +942,8 @@ class CfOpenConns:
     def capture_goal_seek_iteration(self):
         if self.disabled:
             return
-        t = time.time()
-        self.tracker[t] = {}
-        for key, data_name in self.tracker_mapper:
-            exec(f"self.tracker[t]['{key}'] = self.rt.rd.{data_name}")
-        log.debug(f"CfOpenConns -- {t-self.rt.rd.start_time:.2f}: {self.tracker[t]}")
+        self.tracker.record(self.rt.clock.time(), self.rt.rd)
+        log.debug(f"CfOpenConns -- {self.tracker.last()}")
 
     def skip_goal_seek(self):
         if self.disabled:
@@ -400,65 +967,131 @@ class CfOpenConns:
     def dump_iteration_data(self, csv_file):
         if self.disabled:
             return
-        field_names = ["time"] + [x[0] for x in self.tracker_mapper]
-        dw = csv.DictWriter(csv_file, field_names)
-        dw.writeheader()
-        for time_key in self.tracker:
-            row_dict = {"time": f"{time_key - self.rt.rd.start_time:.2f}"}
-            row_dict.update(self.tracker[time_key])
-            dw.writerow(row_dict)
+        self.tracker.to_csv(csv_file, self.rt.rd.start_time)
 
     def is_load_type_conns(self):
         return not self.disabled
 
+    def memory_model(self, key, memory_size):
+        """Least squares fit memory = intercept + slope * load of the tracked ticks
+
+        The last tick of each load is used. With SimUsers the current load changes
+        ahead of the connections, so the latest load is left out while its memory is
+        still moving by more than settled_fraction of memory_size per tick.
+
+        :param key: tracker memory key, memory or server_memory.
+        :param memory_size: memory pool size of key.
+        :return: (intercept, slope), None if the loads span less than
+         min_span_fraction of the highest load or slope <= 0.
+        """
+        loads = self.tracker.column("load")
+        memories = self.tracker.column(key)
+        keep = loads > 0
+        # last tick of each load
+        keep[:-1] &= loads[:-1] != loads[1:]
+        if (
+            len(loads) >= 2
+            and loads[-1] == loads[-2]
+            and abs(memories[-1] - memories[-2]) > self.settled_fraction * memory_size
+        ):
+            keep[-1] = False
+        kept = loads[keep]
+        if len(kept) < 2 or kept.max() - kept.min() < self.min_span_fraction * kept.max():
+            return None
+        slope, intercept = np.polyfit(loads[keep], memories[keep], 1)
+        if slope <= 0:
+            return None
+        return intercept, slope
+
+    def predict_load(self, key, memory_size, fraction):
+        """
+        :return: load using fraction of memory_size, or None without a memory model.
+        """
+        if memory_size <= 0:
+            return None
+        model = self.memory_model(key, memory_size)
+        if model is None:
+            return None
+        intercept, slope = model
+        return round((fraction * memory_size - intercept) / slope)
+
+    def bounded_load(self, rd):
+        """Load for the memory targets without a memory model
+
+        Memory used per load is taken as used / load, which includes the memory used
+        without connections, so the load does not fill more than memory_target of the
+        client and server_memory_target of the server memory pool.
+
+        :return: new load, current load + incr_high without memory data.
+        """
+        bounds = []
+        for used, size, target in (
+            (rd.c_memory_main_used, rd.c_memory_main_size, self.memory_target),
+            (rd.s_memory_main_used, rd.s_memory_main_size, self.server_memory_target),
+        ):
+            if used > 0 and size > 0 and rd.c_current_load > 0:
+                bounds.append(int(target * size * rd.c_current_load / used))
+        if not bounds:
+            return rd.c_current_load + rd.in_incr_high * rd.in_capacity_adjust
+        return min(bounds)
+
     def get_new_load(self):
+        rd = self.rt.rd
         if (
-            self.rt.rd.c_current_desired_load_variance >= 1.0
-            and self.rt.rd.c_memory_percent_used < 100
-            and self.rt.rd.s_memory_percent_used < 100
+            rd.c_current_desired_load_variance >= 1.0
+            and rd.c_memory_percent_used < 100
+            and rd.s_memory_percent_used < 100
         ):
             pass
         else:
-            self.rt.rd.max_load_reached = True
-        if (
-            self.rt.rd.rolling_conns.increase_avg == 0
-            and self.rt.rd.c_memory_percent_used > 99.5
-        ):
-            self.rt.rd.max_load_reached = True
-        if self.rt.rd.max_load_reached:
+            rd.max_load_reached = True
+        if rd.rolling_conns.increase_avg == 0 and rd.c_memory_percent_used > 99.5:
+            rd.max_load_reached = True
+        if rd.c_memory_percent_used >= 100 * self.memory_target:
+            log.info(
+                f"CfOpenConns -- client memory {rd.c_memory_percent_used}% >= "
+                f"target {self.memory_target:.0%}"
+            )
+            rd.max_load_reached = True
+        if rd.max_load_reached:
             log.info("CfOpenConns -- No more load increase; stop seeking.")
             return False
-        if self.first_new_load:
-            if self.rt.rd.c_current_load - self.c_startup_load > 0 and self.rt.rd.c_memory_main_used - self.c_startup_mem > 100:
-                self.first_new_load = False
-                self.rt.rd.c_mem_per_conn = (self.rt.rd.c_memory_main_used - self.c_startup_mem) / (
-                    self.rt.rd.c_current_load - self.c_startup_load
-                )
-                self.inc_conns_within_c_mem = int(
-                    0.96 * self.c_new_conns_mem / self.rt.rd.c_mem_per_conn
-                )
-            else:
-                self.inc_conns_within_c_mem = 5000
+
+        highest = max(self.tracker.column("load").max(initial=0), rd.c_current_load)
+        fraction = self.memory_target
+        client_load = self.predict_load("memory", rd.c_memory_main_size, fraction)
+        if client_load is not None and client_load > self.max_extrapolation * highest:
+            fraction = self.approach_target
+            client_load = self.predict_load("memory", rd.c_memory_main_size, fraction)
+        server_load = self.predict_load(
+            "server_memory", rd.s_memory_main_size, self.server_memory_target
+        )
+        if server_load is not None and server_load <= rd.c_current_load:
             log.info(
-                f"CfOpenConns -- c_mem_per_conn: {self.rt.rd.c_mem_per_conn}; "
-                f"self.inc_conns_within_c_mem: {self.inc_conns_within_c_mem}"
-                )
-        if self.rt.rd.c_memory_percent_used > 97:
-            self.current_step = 0
-            self.inc_conns_within_c_mem = self.rt.rd.in_incr_high * self.rt.rd.in_capacity_adjust
-        elif self.current_step > self.steps_to_max and self.rt.rd.c_memory_percent_used <= 97:
-            self.current_step = 1
-            self.c_new_conns_mem = self.rt.rd.c_memory_main_size - self.rt.rd.c_memory_main_used
-            self.inc_conns_within_c_mem = int(self.c_new_conns_mem / self.rt.rd.c_mem_per_conn)
-        if self.current_step <= self.steps_to_max:
-            binary_deductor = 1 / (2 ** self.current_step)
-        # bincurrent_stepary deductor generates a progression like this: 1/2, 1/4, 1/8, ..., 0
-        new_load = self.rt.rd.c_current_load + int(binary_deductor * self.inc_conns_within_c_mem)
+                f"CfOpenConns -- server memory {rd.s_memory_percent_used}% at load "
+                f"{server_load} for target {self.server_memory_target:.0%}"
+            )
+            rd.max_load_reached = True
+            return False
+        if client_load is None:
+            new_load = self.bounded_load(rd)
+            if new_load <= rd.c_current_load:
+                log.info(f"CfOpenConns -- memory bounded load {new_load}, stop seeking.")
+                rd.max_load_reached = True
+                return False
+        else:
+            rd.c_mem_per_conn = self.memory_model("memory", rd.c_memory_main_size)[1]
+            new_load = client_load
+            if server_load is not None:
+                new_load = min(new_load, server_load)
+            if new_load <= rd.c_current_load:
+                new_load = rd.c_current_load + rd.in_incr_high * rd.in_capacity_adjust
         log.info(
-            f"CfOpenConns -- current_step: {self.current_step}; "
-            f"cur load: {self.rt.rd.c_current_load}, new_load: {new_load}, add load: {binary_deductor * self.inc_conns_within_c_mem}"
+            f"CfOpenConns -- c_mem_per_conn: {rd.c_mem_per_conn}; client load for "
+            f"{fraction:.0%} memory: {client_load}; server load for "
+            f"{self.server_memory_target:.0%} memory: {server_load}; "
+            f"cur load: {rd.c_current_load}, new_load: {new_load}"
         )
-        self.current_step += 1
         if new_load < self.changed_load_highest:
             new_load = self.changed_load_highest
         else:
@@ -466,35 +1099,85 @@ class CfOpenConns:
         return new_load
 
 class CfRunTest:
-    def __init__(self, cf, rd, test_details, result_file, temp_file_dir):
+    # rolling statistics KPIs: (name, RunData source attribute, round digits)
+    # count_since_goal_seek has no source, it is updated with 1 every tick
+    rolling_kpis = [
+        ("tps", "c_http_successful_txns_sec", 0),
+        ("ttfb", "c_tcp_avg_ttfb", 1),
+        ("current_load", "c_current_load", 0),
+        ("cps", "c_tcp_established_conn_rate", 0),
+        ("conns", "c_tcp_established_conns", 0),
+        ("bw", "c_total_bandwidth", 0),
+        ("response_time", "c_url_avg_response_time", 3),
+        ("count_since_goal_seek", None, 1),  # round to 1 for > 0 avg
+    ]
+
+    # /statistics counters copied to RunData each tick, replace with a StatsExtractor
+    # of a longer schema to capture more counters
+    stats_extractor = StatsExtractor()
+
+    def __init__(self, cf, rd, test_details, result_file, temp_file_dir,
+                 tick_periods=None, tick_policy="skip", clock=time, results_index=None):
         log.info(f"script version: {script_version}")
         self.cf = cf  # CfClient instance
         self.rd = rd
+        # time source with time(), monotonic() and sleep(), the time module or a
+        # CfSimulator.VirtualClock
+        self.clock = clock
+        # CfResultsIndex.ResultsIndex for warm start, or None
+        self.results_index = results_index
         #log.info(f"self.rd is: {self.rd}")
         self.ocj = CfOpenConns(self)  # special behavior for open conns tests
+        # goal seek and ramp seek iterations, saved with the detailed report
+        self.iterations = IterationRecorder(seek_iteration_fields)
         self.result_file = result_file
         self.temp_dir = temp_file_dir
         self.test = test_details
+        self.ticker = TickScheduler(
+            tick_periods, tick_policy, clock.monotonic, clock.sleep
+        )
+        # called once when the test winds down (rampdown, sustain or stop), e.g. to
+        # stage the next test
+        self.on_wind_down = None
+        # called after each result line, e.g. to save a checkpoint
+        self.on_checkpoint = None
 
     def init_sequence(self, cf, rd, test_details):
+        if not self.prepare(cf, rd, test_details):
+            return False
+        self.start(cf, rd)
+        return True
+
+    def prepare(self, cf, rd, test_details):
+        """Reads the test and queue and updates the test load on the controller
+
+        Does not touch the result file and can run while another test is running.
+
+        :return: False if the test can not run on the queue
+        """
         self.init_input_csv(rd, test_details)
 
         rd.test_config = self.get_test_config(cf, rd)
         rd.queue_id = rd.test_config["config"]["queue"]["id"]
         rd.queue_info = self.get_queue(cf, rd.queue_id)
-        log.info(f"queue info: \n{json.dumps(rd.queue_info, indent=4)}")
+        log.info("queue info: \n%s", LazyJson(rd.queue_info))
 
         if not self.init_capacity_adj(rd):
             return False
 
         self.software_version_lookup(rd.queue_info)
         self.get_report_info(rd)
-        self.result_file.make_report_dir(self.report_dir)
-        self.result_file.make_report_csv_file(self.report_name)
         self.init_simuser_birth_rate_max(rd)
         self.init_update_config_load(rd)
         self.update_config_load_controller(cf, rd)
+        return True
 
+    def start(self, cf, rd):
+        """Starts the prepared test and writes the first result line"""
+        self.result_file.make_report_dir(self.report_dir)
+        self.result_file.make_report_csv_file(self.report_name)
+        rd.start_time = self.clock.time()
+        rd.timer = self.clock.time() - rd.start_time
         rd.test_run = self.start_test_run(cf, rd)
         self.init_test_run(rd, cf.controller_ip)
 
@@ -503,6 +1186,21 @@ class CfRunTest:
         self.save_results(rd)
         return True
 
+    def resume(self, cf, rd):
+        """Reattaches to the test run of a restored checkpoint
+
+        :return: True if the test run is still active
+        """
+        self.update_test_run(cf, rd)
+        log.info(f"resume test run {rd.id}, status: {rd.status} sub status: {rd.sub_status}")
+        return rd.status not in {"stopped", "finished", "failed"}
+
+    def wind_down(self):
+        if self.on_wind_down is not None:
+            on_wind_down = self.on_wind_down
+            self.on_wind_down = None
+            on_wind_down()
+
     def init_input_csv(self, rd, test_details):
         rd.test_id = test_details["id"]
         rd.type_v2 = test_details["type"]
@@ -528,6 +1226,23 @@ class CfRunTest:
         rd.in_sustain_period = int(test_details["sustain_period"])
         rd.variance_sample_size = int(test_details["variance_sample_size"])
         rd.in_max_variance = float(test_details["max_variance"])
+        stability_method = get_steady_state_method(test_details.get("stability_method"))
+        rd.in_stability_method = stability_method.name
+        rd.in_precision = self.float_or_zero(test_details.get("precision"))
+        rd.in_warm_start = self.if_in_set_true(
+            test_details, "warm_start", {"y", "yes", "true"}
+        )
+        stability_window = int(self.float_or_zero(test_details.get("stability_window")))
+        if stability_window:
+            rd.in_stability_window = stability_window
+        if rd.in_stability_window < stability_method.min_window:
+            # the default window is raised silently, a configured one with a warning
+            if stability_window:
+                log.warning(
+                    f"stability_window {stability_window} is below the "
+                    f"{stability_method.name} minimum, using {stability_method.min_window}"
+                )
+            rd.in_stability_window = stability_method.min_window
         rd.in_ramp_low = int(test_details.get("ramp_low", 60))
         rd.in_ramp_med = int(test_details.get("ramp_med", 40))
         rd.in_ramp_high = int(test_details.get("ramp_high", 20))
@@ -550,6 +1265,17 @@ class CfRunTest:
             rd.living_simusers_max_bool,
             test_details.get("living_simusers_max", False))
 
+        rd.in_goal_seek_strategy = get_goal_seek_strategy(
+            test_details.get("goal_seek_strategy")
+        ).name
+        rd.in_latency_kpi = test_details.get("latency_kpi", "ttfb") or "ttfb"
+        rd.in_latency_ceiling = self.float_or_zero(test_details.get("latency_ceiling"))
+        if rd.in_latency_ceiling > 0:
+            # latency constrained goal seek for all load types
+            rd.in_goal_seek_strategy = "latency"
+        elif rd.in_goal_seek_strategy == "latency":
+            log.warning("latency goal seek without latency_ceiling, using step")
+            rd.in_goal_seek_strategy = "step"
         rd.in_goal_seek = test_details["goal_seek"]
         if rd.in_goal_seek.lower() in {"true", "y", "yes"}:
             rd.in_goal_seek = True
@@ -557,8 +1283,8 @@ class CfRunTest:
         else:
             rd.in_goal_seek = False
         
-        rd.start_time = time.time()
-        rd.timer = time.time() - rd.start_time
+        rd.start_time = self.clock.time()
+        rd.timer = self.clock.time() - rd.start_time
 
     def init_simuser_birth_rate_max(self, rd):
         if not (rd.type_v2 == "open_connections" and rd.in_load_type == "simusers"):
@@ -697,15 +1423,19 @@ class CfRunTest:
         # rolling statistics
         rd.rolling_sample_size = rd.variance_sample_size
         rd.max_var_reference = rd.in_max_variance
-        rd.rolling_tps = RollingStats(rd.rolling_sample_size, 0)
-        rd.rolling_ttfb = RollingStats(rd.rolling_sample_size, 1)
-        rd.rolling_current_load = RollingStats(rd.rolling_sample_size, 0)
-        rd.rolling_count_since_goal_seek = RollingStats(
-            rd.rolling_sample_size, 1
-        )  # round to 1 for > 0 avg
-        rd.rolling_cps = RollingStats(rd.rolling_sample_size, 0)
-        rd.rolling_conns = RollingStats(rd.rolling_sample_size, 0)
-        rd.rolling_bw = RollingStats(rd.rolling_sample_size, 0)
+        rd.rolling_bank = RollingStatsBank(rd.rolling_sample_size)
+        max_var = []
+        for name, source, round_digits in self.rolling_kpis:
+            view = rd.rolling_bank.add(name, round_digits)
+            setattr(rd, f"rolling_{name}", view)
+            max_var.append(rd.max_var_reference if source else 0)
+        rd.rolling_max_var = np.array(max_var)
+        rd.rolling_kpi_rows = np.array([source is not None for _, source, _ in self.rolling_kpis])
+        rd.rolling_steady_bank = None
+        if rd.in_stability_method != "variance":
+            rd.rolling_steady_bank = RollingStatsBank(rd.in_stability_window)
+            for name, source, round_digits in self.rolling_kpis:
+                rd.rolling_steady_bank.add(name, round_digits)
 
         rd.kpi_1 = rd.rolling_tps
         rd.kpi_2 = rd.rolling_cps
@@ -714,6 +1444,7 @@ class CfRunTest:
         rd.kpi_1_list = []
         rd.kpi_2_list = []
         rd.ramp_seek_kpi = rd.rolling_tps
+        rd.latency_kpi = rd.rolling_ttfb
 
     @staticmethod
     def if_in_set_true(dict_var, dict_key, in_set):
@@ -734,6 +1465,13 @@ class CfRunTest:
                 return True
         return False
 
+    @staticmethod
+    def float_or_zero(in_value):
+        try:
+            return float(in_value)
+        except (TypeError, ValueError):
+            return 0.0
+
     @staticmethod
     def return_int_if_present(present, value):
         if present:
@@ -745,7 +1483,7 @@ class CfRunTest:
             response = cf.get_test(
                 rd.type_v2, rd.test_id, self.temp_dir / "running_test_config.json"
             )
-            log.debug(f"{json.dumps(response, indent=4)}")
+            log.debug("%s", LazyJson(response))
         except Exception as detailed_exception:
             log.error(
                 f"Exception occurred when retrieving the test: "
@@ -905,6 +1643,13 @@ class CfRunTest:
             self.ocj.enable()
         self.update_startload_rampup_for_ec_sha384_on_cfv(rd)
         rd.in_start_load = int(rd.in_start_load) * rd.in_capacity_adjust
+        if (
+            rd.in_warm_start
+            and rd.in_goal_seek
+            and test_type != "conns"
+            and self.results_index is not None
+        ):
+            self.results_index.warm_start(self, rd)
         self.update_load_constraints(rd)
         load_update = {
             "config": {
@@ -929,7 +1674,7 @@ class CfRunTest:
         response = cf.update_test(
             rd.type_v2, rd.test_id, self.temp_dir / "test_load_update.json"
         )
-        log.info(f"{json.dumps(response, indent=4)}")
+        log.info("%s", LazyJson(response))
         rd.test_config = self.get_test_config(cf, rd)
 
     def update_load_constraints(self, rd):
@@ -979,7 +1724,7 @@ class CfRunTest:
     def start_test_run(self, cf, rd):
         try:
             response = cf.start_test(rd.test_id)
-            log.info(f"{json.dumps(response, indent=4)}")
+            log.info("%s", LazyJson(response))
             rd.test_started = True
         except Exception as detailed_exception:
             log.error(
@@ -989,8 +1734,17 @@ class CfRunTest:
             rd.test_started = False
         return response
 
-    def update_test_run(self, cf, rd):
-        rd.test_run_update = cf.get_test_run(rd.id)
+    def update_test_run(self, cf, rd, snapshot=None):
+        """Updates run status from the controller or from a fetched snapshot
+
+        :param snapshot: RunSnapshot from CfClient.fetch_test_run_snapshot, if
+         None the test run is requested from the controller
+        :return: True
+        """
+        if snapshot is None:
+            rd.test_run_update = cf.get_test_run(rd.id)
+        else:
+            rd.test_run_update = snapshot.test_run
         rd.status = rd.test_run_update.get("status")  # main run status 'running'
         rd.sub_status = rd.test_run_update.get("subStatus")
         rd.score = rd.test_run_update.get("score")
@@ -1059,136 +1813,20 @@ class CfRunTest:
             rd.phase = "goalseek"
             log.info(f"goal seek phase: {rd.phase}")
 
-    def update_run_stats(self, cf, rd):
-        get_run_stats = cf.fetch_test_run_statistics(rd.id)
+    def update_run_stats(self, cf, rd, snapshot=None):
+        if snapshot is None:
+            get_run_stats = cf.fetch_test_run_statistics(rd.id)
+        else:
+            get_run_stats = snapshot.statistics
         #log.debug(f'{get_run_stats}')
         #log.debug(json.dumps(get_run_stats, indent=4))
-        self.update_client_stats(rd, get_run_stats)
-        self.update_server_stats(rd, get_run_stats)
-
-    def update_client_stats(self, rd, get_run_stats):
-        client_stats = {}
-        for i in get_run_stats["client"]:
-            if "type" in i and "subType" in i and "value" in i:
-                type = i["type"]
-                sub_type = i["subType"]
-                value = i["value"]
-                if not type in client_stats:
-                    client_stats[type] = {}
-                client_stats[type][sub_type] = value
-            elif "type" in i and "value" in i:
-                type = i["type"]
-                value = i["value"]
-                client_stats[type] = value
-        self.assign_client_run_stats(rd, client_stats)
-
-    def update_server_stats(self, rd, get_run_stats):
-        server_stats = {}
-        for i in get_run_stats["server"]:
-            if "type" in i and "subType" in i and "value" in i:
-                type = i["type"]
-                sub_type = i["subType"]
-                value = i["value"]
-                if not type in server_stats:
-                    server_stats[type] = {}
-                server_stats[type][sub_type] = value
-            elif "type" in i and "value" in i:
-                type = i["type"]
-                value = i["value"]
-                server_stats[type] = value
-        self.assign_server_run_stats(rd, server_stats)
-
-    def assign_client_run_stats(self, rd, client_stats):
-        rd.c_rx_bandwidth = client_stats.get("driver", {}).get("rxBandwidth", 0)
-        rd.c_rx_packet_count = client_stats.get("driver", {}).get("rxPacketCount", 0)
-        rd.c_rx_packet_rate = client_stats.get("driver", {}).get("rxPacketRate", 0)
-        rd.c_tx_bandwidth = client_stats.get("driver", {}).get("txBandwidth", 0)
-        rd.c_tx_packet_count = client_stats.get("driver", {}).get("txPacketCount", 0)
-        rd.c_tx_packet_rate = client_stats.get("driver", {}).get("txPacketRate", 0)
-        rd.c_rx_byte_rate = client_stats.get("sum", {}).get("rxByteRate", 0)
-        rd.c_tx_byte_rate = client_stats.get("sum", {}).get("txByteRate", 0)
-        rd.c_http_aborted_txns = client_stats.get("http", {}).get("abortedTxns", 0)
-        rd.c_http_aborted_txns_sec = client_stats.get("http", {}).get(
-            "abortedTxnsPerSec", 0
-        )
-        rd.c_http_attempted_txns = client_stats.get("sum", {}).get("attemptedTxns", 0)
-        rd.c_http_attempted_txns_sec = client_stats.get("sum", {}).get(
-            "attemptedTxnsPerSec", 0
-        )
-        rd.c_http_successful_txns = client_stats.get("sum", {}).get(
-            "successfulTxns", 0
-        )
-        rd.c_http_successful_txns_sec = client_stats.get("sum", {}).get(
-            "successfulTxnsPerSec", 0
-        )
-        rd.c_http_unsuccessful_txns = client_stats.get("sum", {}).get(
-            "unsuccessfulTxns", 0
-        )
-        rd.c_http_unsuccessful_txns_sec = client_stats.get("sum", {}).get(
-            "unsuccessfulTxnsPerSec", 0
-        )
-        rd.c_loadspec_avg_idle = client_stats.get("loadspec", {}).get(
-            "averageIdleTime", 0
-        )
-        rd.c_loadspec_avg_cpu = round(
-            client_stats.get("loadspec", {}).get("cpuUtilized", 0), 1
-        )
-        rd.c_memory_main_size = client_stats.get("memory", {}).get("mainPoolSize", 0)
-        rd.c_memory_main_used = client_stats.get("memory", {}).get("mainPoolUsed", 0)
-        rd.c_memory_packetmem_used = client_stats.get("memory", {}).get(
-            "packetMemoryUsed", 0
-        )
-        rd.c_memory_rcv_queue_length = client_stats.get("memory", {}).get(
-            "rcvQueueLength", 0
-        )
-        rd.c_simusers_alive = client_stats.get("simusers", {}).get("simUsersAlive", 0)
-        rd.c_simusers_animating = client_stats.get("simusers", {}).get(
-            "simUsersAnimating", 0
-        )
-        rd.c_simusers_blocking = client_stats.get("simusers", {}).get(
-            "simUsersBlocking", 0
-        )
-        rd.c_simusers_sleeping = client_stats.get("simusers", {}).get(
-            "simUsersSleeping", 0
-        )
-        rd.c_simusers_suspending = client_stats.get("simusers", {}).get(
-            "simUsersSuspending", 0
-        )
-        rd.c_current_load = client_stats.get("sum", {}).get("currentLoadSpecCount", 0)
-        rd.c_desired_load = client_stats.get("sum", {}).get("desiredLoadSpecCount", 0)
-        rd.c_tcp_avg_ttfb = round(
-            client_stats.get("tcp", {}).get("averageTimeToFirstByte", 0), 1
-        )
-        rd.c_tcp_avg_tt_synack = round(
-            client_stats.get("tcp", {}).get("averageTimeToSynAck", 0), 1
-        )
-        rd.c_tcp_cumulative_attempted_conns = client_stats.get("tcp", {}).get(
-            "cummulativeAttemptedConns", 0
-        )
-        rd.c_tcp_cumulative_established_conns = client_stats.get("tcp", {}).get(
-            "cummulativeEstablishedConns", 0
-        )
-        rd.c_url_avg_response_time = round(
-            client_stats.get("url", {}).get("averageRespTimePerUrl", 0), 1
-        )
+        self.stats_extractor.extract(rd, get_run_stats)
+        self.update_derived_run_stats(rd)
+
+    def update_derived_run_stats(self, rd):
+        """Updates the RunData fields computed from the extracted run stats"""
         if self.divide_by_1000:
             rd.c_url_avg_response_time = round(rd.c_url_avg_response_time / 1000, 3)
-        rd.c_tcp_attempted_conn_rate = client_stats.get("sum", {}).get(
-            "attemptedConnRate", 0
-        )
-        rd.c_tcp_established_conn_rate = client_stats.get("sum", {}).get(
-            "establishedConnRate", 0
-        )
-        rd.c_tcp_attempted_conns = client_stats.get("sum", {}).get(
-            "attemptedConns", 0
-        )
-        rd.c_tcp_established_conns = client_stats.get("sum", {}).get(
-            "currentEstablishedConns", 0
-        )
-
-        rd.time_elapsed = client_stats.get("timeElapsed", 0)
-        rd.time_remaining = client_stats.get("timeRemaining", 0)
-
         rd.c_total_bandwidth = rd.c_rx_bandwidth + rd.c_tx_bandwidth
         rd.c_total_byte_rate = rd.c_rx_byte_rate + rd.c_tx_byte_rate
         rd.c_total_packet_count = rd.c_rx_packet_count + rd.c_tx_packet_count
@@ -1207,29 +1845,6 @@ class CfRunTest:
             ) / rd.c_http_successful_txns
         if rd.phase in ["rampup", "goalseek"]:
             self.ocj.set_startup_data()
-        return True
-
-    def assign_server_run_stats(self, rd, server_stats):
-        rd.s_rx_bandwidth = server_stats.get("driver", {}).get("rxBandwidth", 0)
-        rd.s_rx_packet_count = server_stats.get("driver", {}).get("rxPacketCount", 0)
-        rd.s_rx_packet_rate = server_stats.get("driver", {}).get("rxPacketRate", 0)
-        rd.s_tx_bandwidth = server_stats.get("driver", {}).get("txBandwidth", 0)
-        rd.s_tx_packet_count = server_stats.get("driver", {}).get("txPacketCount", 0)
-        rd.s_tx_packet_rate = server_stats.get("driver", {}).get("txPacketRate", 0)
-        rd.s_memory_main_size = server_stats.get("memory", {}).get("mainPoolSize", 0)
-        rd.s_memory_main_used = server_stats.get("memory", {}).get("mainPoolUsed", 0)
-        rd.s_memory_packetmem_used = server_stats.get("memory", {}).get(
-            "packetMemoryUsed", 0
-        )
-        rd.s_memory_rcv_queue_length = server_stats.get("memory", {}).get(
-            "rcvQueueLength", 0
-        )
-        rd.s_memory_avg_cpu = round(
-            server_stats.get("memory", {}).get("cpuUtilized", 0), 1
-        )
-        rd.s_tcp_closed_error = server_stats.get("sum", {}).get("closedWithError", 0)
-        rd.s_tcp_closed = server_stats.get("sum", {}).get("closedWithNoError", 0)
-        rd.s_tcp_closed_reset = server_stats.get("sum", {}).get("closedWithReset", 0)
 
         if rd.s_memory_main_size > 0 and rd.s_memory_main_used > 0:
             rd.s_memory_percent_used = round(100 *
@@ -1289,11 +1904,11 @@ class CfRunTest:
         :return: True if no statements failed and there were no exceptions. False otherwise.
         """
         log.debug("Inside the RunTest/wait_for_running_status method.")
-        i = 0
+        self.ticker.start("wait_running")
         while True:
-            time.sleep(4)
-            rd.timer = int(round(time.time() - rd.start_time))
-            i += 4
+            self.ticker.wait()
+            rd.timer = int(round(self.clock.time() - rd.start_time))
+            i = self.ticker.elapsed()
             if not self.update_test_run(cf, rd):
                 return False
             if rd.status == "running":
@@ -1318,7 +1933,7 @@ class CfRunTest:
                 return False
         rd.time_to_run = rd.timer
         log.debug(f"Test {rd.name} successfully went to running status.")
-        log.debug(json.dumps(rd.test_run_update, indent=4))
+        log.debug("%s", LazyJson(rd.test_run_update))
         rd.run_id = rd.test_run_update.get("runId")
         rd.report_link = (
             "https://"
@@ -1343,7 +1958,7 @@ class CfRunTest:
         for run in test_runs:
             if run["status"] == "running":
                 log.debug(
-                    f"check_running_tests found running test: {json.dumps(run, indent=4)}"
+                    "check_running_tests found running test: %s", LazyJson(run)
                 )
                 # if waiting and running test IDs match, change the running test
                 if rd.test_id == run["testId"]:
@@ -1369,11 +1984,11 @@ class CfRunTest:
         :return: True if no statements failed and there were no exceptions. False otherwise.
         """
         log.debug("Inside the RunTest/wait_for_running_sub_status method.")
-        i = 0
+        self.ticker.start("wait_traffic")
         while True:
-            time.sleep(4)
-            rd.timer = int(round(time.time() - rd.start_time))
-            i += 4
+            self.ticker.wait()
+            rd.timer = int(round(self.clock.time() - rd.start_time))
+            i = self.ticker.elapsed()
             if not self.update_test_run(cf, rd):
                 return False
             print(
@@ -1393,7 +2008,7 @@ class CfRunTest:
                 return False
         rd.time_to_start = rd.timer - rd.time_to_run
         log.debug(f"Test {rd.name} successfully went to traffic state.")
-        log.debug(json.dumps(rd.test_run_update, indent=4))
+        log.debug("%s", LazyJson(rd.test_run_update))
         return True
 
     def stop_wait_for_finished_status(self, cf, rd):
@@ -1403,19 +2018,25 @@ class CfRunTest:
          False otherwise.
         """
         log.debug("Inside the stop_test/wait_for_finished_status method.")
+        self.wind_down()
         rd.time_to_stop_start = rd.timer
         if rd.status == "running":
             self.cf.stop_test(rd.id)
 
-        i = 0
+        if rd.c_desired_load > 0:
+            self.update_run_stats(cf, rd)
+            self.save_results(rd)
+        self.ticker.start("stop")
         while True:
+            self.ticker.wait()
+            rd.timer = int(round(self.clock.time() - rd.start_time))
+            i = self.ticker.elapsed()
+            snapshot = None
             if rd.c_desired_load > 0:
-                self.update_run_stats(cf, rd)
+                snapshot = cf.fetch_test_run_snapshot(rd.id)
+                self.update_run_stats(cf, rd, snapshot)
                 self.save_results(rd)
-            time.sleep(4)
-            rd.timer = int(round(time.time() - rd.start_time))
-            i += 4
-            if not self.update_test_run(cf, rd):
+            if not self.update_test_run(cf, rd, snapshot):
                 return False
             if rd.status in {"stopped", "finished", "failed"}:
                 print(f"{rd.timer} status: {rd.status}")
@@ -1451,10 +2072,12 @@ class CfRunTest:
         log.debug("Inside the RunTest/wait_for_test_activity method.")
         test_generates_activity = False
         i = 0
+        self.ticker.start("wait_activity")
         while not test_generates_activity:
-            rd.timer = int(round(time.time() - rd.start_time))
-            self.update_test_run(cf, rd)
-            self.update_run_stats(cf, rd)
+            rd.timer = int(round(self.clock.time() - rd.start_time))
+            snapshot = cf.fetch_test_run_snapshot(rd.id)
+            self.update_test_run(cf, rd, snapshot)
+            self.update_run_stats(cf, rd, snapshot)
             # self.print_test_status(rd)
 
             if rd.sub_status is None:
@@ -1473,14 +2096,13 @@ class CfRunTest:
                 log.error(error_msg)
                 print(error_msg)
                 return False
-            time.sleep(4)
-            i = i + 4
+            self.ticker.wait()
+            i = self.ticker.elapsed()
             print(f"")
         rd.time_to_activity = rd.timer - rd.time_to_start - rd.time_to_run
         return True
 
-    @staticmethod
-    def countdown(t):
+    def countdown(self, t):
         """countdown function
 
         Can be used after load increase for results to update
@@ -1492,7 +2114,7 @@ class CfRunTest:
             mins, secs = divmod(t, 60)
             time_format = "{:02d}:{:02d}".format(mins, secs)
             print(time_format, end="\r")
-            time.sleep(1)
+            self.clock.sleep(1)
             t -= 1
 
     def goal_seek(self, rd):
@@ -1509,14 +2131,18 @@ class CfRunTest:
             new_load = rd.c_current_load + (rd.in_incr_low *
                                               rd.in_capacity_adjust)
         else:
+            strategy = get_goal_seek_strategy(rd.in_goal_seek_strategy)
             if self.ocj.is_load_type_conns():
                 new_load = self.ocj.get_new_load()
+            elif strategy.all_load_types:
+                new_load = strategy.next_load(self, rd)
+                log.info(f"{strategy.name} new_load = {new_load}")
             elif self.check_if_load_type_simusers(rd):
                 new_load = self.goal_seek_set_simuser_kpi(rd, rd.kpi_1)
                 log.info(f"new_load = {new_load}")
             elif self.check_if_load_type_default(rd):
-                new_load = self.goal_seek_set_default(rd)
-                log.info(f"new_load = {new_load}")
+                new_load = strategy.next_load(self, rd)
+                log.info(f"{strategy.name} new_load = {new_load}")
             else:
                 report_error = f"Unknown load type: " \
                     f"{rd.test_config['config']['loadSpecification']['type']}"
@@ -1672,26 +2298,22 @@ class CfRunTest:
 
         :return: None
         """
-        rd.rolling_tps.update(rd.c_http_successful_txns_sec)
-        rd.rolling_tps.check_if_stable(rd.max_var_reference)
-
-        rd.rolling_ttfb.update(rd.c_tcp_avg_ttfb)
-        rd.rolling_ttfb.check_if_stable(rd.max_var_reference)
-
-        rd.rolling_current_load.update(rd.c_current_load)
-        rd.rolling_current_load.check_if_stable(rd.max_var_reference)
-
-        rd.rolling_cps.update(rd.c_tcp_established_conn_rate)
-        rd.rolling_cps.check_if_stable(rd.max_var_reference)
-
-        rd.rolling_conns.update(rd.c_tcp_established_conns)
-        rd.rolling_conns.check_if_stable(rd.max_var_reference)
-
-        rd.rolling_bw.update(rd.c_total_bandwidth)
-        rd.rolling_bw.check_if_stable(rd.max_var_reference)
-
-        rd.rolling_count_since_goal_seek.update(1)
-        rd.rolling_count_since_goal_seek.check_if_stable(0)
+        values = [
+            getattr(rd, source) if source else 1 for name, source, digits in self.rolling_kpis
+        ]
+        rd.rolling_bank.update(values)
+        if rd.rolling_steady_bank is None:
+            rd.rolling_bank.check_if_stable(rd.rolling_max_var)
+            return
+        # statistical method for the KPI rows, the seek count row is a counter
+        rd.rolling_steady_bank.update(values)
+        method = get_steady_state_method(rd.in_stability_method)
+        stable = np.where(
+            rd.rolling_kpi_rows,
+            method.stable(rd.rolling_steady_bank, rd.rolling_max_var),
+            rd.rolling_bank.variance <= rd.rolling_max_var,
+        )
+        rd.rolling_bank.check_if_stable(rd.rolling_max_var, stable)
 
     def check_kpi(self, rd):
         rd.in_kpi_1 = rd.in_kpi_1.lower()
@@ -1739,6 +2361,16 @@ class CfRunTest:
             log.debug(f"check_ramp_seek_kpi unknown kpi, setting to TPS")
             rd.ramp_seek_kpi = rd.rolling_tps
 
+    def check_latency_kpi(self, rd):
+        rd.in_latency_kpi = rd.in_latency_kpi.lower()
+        if rd.in_latency_kpi == "ttfb":
+            rd.latency_kpi = rd.rolling_ttfb
+        elif rd.in_latency_kpi == "response_time":
+            rd.latency_kpi = rd.rolling_response_time
+        else:
+            log.debug(f"check_latency_kpi unknown kpi, setting to TTFB")
+            rd.latency_kpi = rd.rolling_ttfb
+
     @staticmethod
     def return_bool_true(check_if, is_value):
         if isinstance(check_if, bool):
@@ -1747,7 +2379,7 @@ class CfRunTest:
             return True
         return False
 
-    def control_test(self, cf, rd):
+    def control_test(self, cf, rd, resume=False):
         """Main test control
 
         Runs test. Start by checking if test is in running state followed by checking
@@ -1755,36 +2387,47 @@ class CfRunTest:
         First updates stats, checks the phase test is in based on elapsed time, then updates
         rolloing averages.
 
+        :param resume: continue a test restored from a checkpoint that has traffic,
+         skips waiting for running status and activity
         :return: True if test completed successfully
         """
-        # exit control_test if test does not go into running state
-        if not self.wait_for_running_status(cf, rd):
-            log.info(f"control_test end, wait_for_running_status False")
-            return False
-        # exit control_test if test does not go into running state
-        if not self.wait_for_running_sub_status(cf, rd):
-            log.info(f"control_test end, wait_for_running_sub_status False")
-            return False
-        # exit control_test if test does not have successful transactions
-        if not self.wait_for_test_activity(cf, rd):
-            self.stop_wait_for_finished_status(cf, rd)
-            log.info(f"control_test end, wait_for_test_activity False")
-            return False
+        if not resume:
+            # exit control_test if test does not go into running state
+            if not self.wait_for_running_status(cf, rd):
+                log.info(f"control_test end, wait_for_running_status False")
+                return False
+            # exit control_test if test does not go into running state
+            if not self.wait_for_running_sub_status(cf, rd):
+                log.info(f"control_test end, wait_for_running_sub_status False")
+                return False
+            # exit control_test if test does not have successful transactions
+            if not self.wait_for_test_activity(cf, rd):
+                self.stop_wait_for_finished_status(cf, rd)
+                log.info(f"control_test end, wait_for_test_activity False")
+                return False
         self.check_ramp_seek_kpi(rd)
         self.check_kpi(rd)
-        rd.rolling_count_since_goal_seek.reset()
+        self.check_latency_kpi(rd)
+        if not resume:
+            rd.rolling_count_since_goal_seek.reset()
         # self.countdown(12)
         # test control loop - runs until self.stop is set to True
+        self.ticker.start("control")
         while not rd.stop:
             self.update_run_stats(cf, rd)
             self.update_phase(rd)
             self.check_stop_conditions(rd)
+            if rd.phase in {"rampdown", "shutdown"}:
+                self.wind_down()
             self.update_rolling_averages(rd)
 
             # print stats if test is running
             if rd.sub_status is None:
                 self.print_test_stats(rd)
                 self.save_results(rd)
+                if rd.phase == "steady" and self.check_early_stop(rd):
+                    rd.phase = "stopping"
+                    rd.stop = True
 
             if rd.in_ramp_seek and not rd.ramp_seek_complete:
                 log.info(f"control_test going to ramp_seek")
@@ -1795,18 +2438,53 @@ class CfRunTest:
                 self.control_test_goal_seek_kpi(rd, rd.kpi_1, rd.kpi_2,
                                                 rd.in_kpi_and_or)
             print(f"")
-            time.sleep(4)
+            self.ticker.wait()
+        if (
+            rd.in_goal_seek
+            and (rd.goal_seek_finished or rd.max_load_reached)
+            and rd.phase != "timeout"
+        ):
+            rd.final_load = rd.c_current_load
         # if goal_seek is yes enter sustained steady phase
         self.wait_openconn_cps_end(cf, rd)
         if rd.in_goal_seek and rd.in_sustain_period > 0:
             self.sustain_test(cf, rd)
         # stop test and wait for finished status
+        self.save_iterations(rd)
         if self.stop_wait_for_finished_status(cf, rd):
             rd.time_to_stop = rd.timer - rd.time_to_stop_start
             #self.save_results(rd)
             return True
         return False
 
+    def save_iterations(self, rd):
+        """Writes the seek iterations next to the detailed report
+
+        <test>_<time stamp>_Iterations.csv, or .parquet with a parquet detailed
+        report. Open connections tests add the CfOpenConns memory iterations as
+        <test>_<time stamp>_OpenConns.csv (.parquet).
+        """
+        report_location = getattr(self.result_file, "report_location", None)
+        if report_location is None or not pathlib.Path(report_location).is_dir():
+            return
+        report_location = pathlib.Path(report_location)
+        name = f"{rd.in_name}_{self.result_file.time_stamp}{self.result_file.name_suffix}"
+        recorders = (("Iterations", self.iterations), ("OpenConns", self.ocj.tracker))
+        for suffix, recorder in recorders:
+            if len(recorder) == 0:
+                continue
+            try:
+                if getattr(self.result_file, "file_format", "csv") == "parquet":
+                    recorder.to_parquet(
+                        report_location / f"{name}_{suffix}.parquet", rd.start_time
+                    )
+                else:
+                    recorder.to_csv(report_location / f"{name}_{suffix}.csv", rd.start_time)
+            except Exception as detailed_exception:
+                log.error(
+                    f"Exception occurred writing the {suffix} file: \n<{detailed_exception}>"
+                )
+
     def check_stop_conditions(self, rd):
         log.debug(f"in check_stop_conditions method")
         # stop test if time_remaining returned from controller == 0
@@ -1865,6 +2543,7 @@ class CfRunTest:
             rd.in_capacity_adjust = 1
             return
 
+        self.iterations.record(self.clock.time(), rd)
         if self.ramp_seek(rd, ramp_kpi, ramp_to_value):
             # reset rolling count > no load increase until
             # at least the window size interval.
@@ -1919,7 +2598,7 @@ class CfRunTest:
                     eventlogs = self.cf.fetch_event_logs(rd.id)
                     for line in eventlogs["logs"]:
                         if message in line:
-                            log.debug(f"eventLog: \n{json.dumps(eventlogs, indent=4)}")
+                            log.debug("eventLog: \n%s", LazyJson(eventlogs))
                             message = line + f"\nSuspending Simusers: {rd.c_simusers_suspending}, stop goal seek"
                             print(message)
                             rd.max_load_reached = True
@@ -1967,6 +2646,7 @@ class CfRunTest:
                 goal_seek = False
 
         if goal_seek:
+            self.iterations.record(self.clock.time(), rd)
             if self.goal_seek(rd):
                 # reset rolling count > no load increase until
                 # at least the window size interval.
@@ -1974,25 +2654,30 @@ class CfRunTest:
                 rd.rolling_count_since_goal_seek.reset()
             else:
                 log.info(f"control_test end, goal_seek False")
+                rd.goal_seek_finished = True
                 rd.stop = True
 
     def wait_openconn_cps_end(self, cf, rd):
         if self.test_type == "conns" and rd.in_load_type == "SimUsers":
+            self.ticker.start("openconn_cps_end")
             while rd.c_tcp_established_conn_rate > 0:
                 log.info(f"still waiting cps down to 0")
                 self.update_run_stats(cf, rd)
                 if rd.sub_status is None:
                     self.print_test_stats(rd)
                     self.save_results(rd)
-                time.sleep(4)
+                self.ticker.wait()
         return True
 
 
     def sustain_test(self, cf, rd):
         rd.phase = "steady"
+        self.wind_down()
+        rd.early_stop_values = []
+        self.ticker.start("sustain")
         while rd.in_sustain_period > 0:
-            rd.timer = int(round(time.time() - rd.start_time))
-            sustain_period_loop_time_start = time.time()
+            rd.timer = int(round(self.clock.time() - rd.start_time))
+            sustain_period_loop_time_start = self.clock.time()
             self.update_run_stats(cf, rd)
             if rd.time_remaining < 30 and rd.in_goal_seek:
                 rd.phase = "timeout"
@@ -2004,15 +2689,42 @@ class CfRunTest:
             if rd.sub_status is None:
                 self.print_test_stats(rd)
                 self.save_results(rd)
+                if self.check_early_stop(rd):
+                    rd.in_sustain_period = 0
+                    break
 
-            time.sleep(4)
+            self.ticker.wait()
             rd.in_sustain_period = rd.in_sustain_period - (
-                time.time() - sustain_period_loop_time_start
+                self.clock.time() - sustain_period_loop_time_start
             )
         rd.phase = "stopping"
         # self.stop_wait_for_finished_status(cf, rd)
         return True
 
+    def check_early_stop(self, rd):
+        """Checks if the steady kpi_1 mean is known to the test precision
+
+        Adds the current kpi_1 sample and checks if the 95% confidence interval of
+        the mean, with the autocorrelation of the samples taken into account, is
+        not wider than in_precision relative to the mean.
+
+        :return: True if the test can stop, rd.stop_reason is set
+        """
+        if rd.in_precision <= 0:
+            return False
+        if rd.early_stop_values is None:
+            rd.early_stop_values = []
+        source = {name: source for name, source, _ in self.rolling_kpis}[rd.kpi_1.name]
+        rd.early_stop_values.append(float(getattr(rd, source)))
+        reached, reason = precision_reached(rd.early_stop_values, rd.in_precision)
+        log.debug(f"early stop {rd.in_kpi_1}: {reason}")
+        if not reached:
+            return False
+        rd.stop_reason = f"early stop, {rd.in_kpi_1} {reason}"
+        log.info(rd.stop_reason)
+        print(rd.stop_reason)
+        return True
+
     def save_results(self, rd):
 
         csv_list = [
@@ -2079,15 +2791,25 @@ class CfRunTest:
             rd.time_to_start,
             rd.time_to_activity,
             rd.time_to_stop,
+            self.ticker.jitter,
+            self.ticker.overruns,
+            rd.goal_seek_knee_load,
+            rd.goal_seek_fit_max,
+            rd.goal_seek_fit_scale,
+            rd.goal_seek_fit_sharpness,
             script_version,
             rd.report_link,
         ]
         self.result_file.append_file(csv_list)
+        if self.on_checkpoint is not None:
+            self.on_checkpoint()
 
 class DetailedCsvReport:
     def __init__(self, report_location):
         log.debug("Initializing detailed csv result files.")
         self.time_stamp = time.strftime("%Y%m%d-%H%M")
+        # added to report file names, e.g. _q1 for queue 1 of a parallel suite
+        self.name_suffix = ""
         log.debug(f"Current time stamp: {self.time_stamp}")
         self.report_location_parent = report_location
         #self.report_csv_file = report_location / f"{self.time_stamp}_Detailed.csv"
@@ -2155,9 +2877,17 @@ class DetailedCsvReport:
             "t_start",
             "t_tx",
             "t_stop",
+            "tick_jitter",
+            "tick_overruns",
+            "knee_load",
+            "fit_max",
+            "fit_scale",
+            "fit_sharpness",
             "version",
             "report",
         ]
+        # lines of the running test, for IncrementalReport
+        self.test_lines = []
 
     def append_columns(self):
         """
@@ -2186,12 +2916,33 @@ class DetailedCsvReport:
             csv_line = ",".join(map(str, csv_list)) + "\n"
             with open(self.report_csv_file, "a") as f:
                 f.write(csv_line)
+            self.test_lines.append(csv_line)
         except Exception as detailed_exception:
             log.error(
                 f"Exception occurred  writing to the detailed report file: \n<{detailed_exception}>\n"
             )
+
+    def flush(self):
+        """Lines are written by append_file, nothing is buffered"""
+        pass
+
+    def reopen(self, report_csv_file):
+        """Continues writing to an existing report file, e.g. after a resume"""
+        self.report_csv_file = pathlib.Path(report_csv_file)
+        self.report_location = self.report_csv_file.parent
+        self.test_lines = []
+
+    def take_test_rows(self):
+        """
+        Rows appended since the last call, parsed like the full report file.
+        :return: DataFrame with the detailed report columns.
+        """
+        csv_text = ",".join(map(str, self.columns)) + "\n" + "".join(self.test_lines)
+        self.test_lines = []
+        return pd.read_csv(io.StringIO(csv_text))
+
     def make_report_csv_file(self, new_report_csv_name):
-        new_report_csv_name = self.report_location / f"{new_report_csv_name}_{self.time_stamp}_Detailed.csv"
+        new_report_csv_name = self.report_location / f"{new_report_csv_name}_{self.time_stamp}{self.name_suffix}_Detailed.csv"
         print(new_report_csv_name)
         if new_report_csv_name.is_file():
             return
@@ -2208,11 +2959,190 @@ class DetailedCsvReport:
         self.report_location = report_dir
 
 
+class DetailedColumnarReport(DetailedCsvReport):
+    """Detailed report sink that stores ticks in typed column arrays
+
+    Ticks are buffered in preallocated numpy arrays, one per DetailedCsvReport column,
+    and written as a part file of a <name>_Detailed.parquet (or .feather) directory
+    every flush_rows ticks (about 4 minutes at the default tick) and on flush(),
+    which Checkpoint.test_running calls before saving a checkpoint. Report loads the
+    directory with load_detailed_report. Requires the pyarrow package.
+    """
+
+    string_columns = {
+        "test_name",
+        "state",
+        "test_type_v1",
+        "test_type_v2",
+        "load_type",
+        "test_id",
+        "run_id",
+        "report",
+    }
+    bool_columns = {
+        "seek_ready",
+        "tps_stable",
+        "cps_stable",
+        "conns_stable",
+        "ttfb_stable",
+        "bw_stable",
+    }
+
+    def __init__(self, report_location, file_format="parquet", flush_rows=60):
+        if pa is None:
+            raise ImportError("DetailedColumnarReport requires pyarrow: pip install pyarrow")
+        if file_format not in {"parquet", "feather"}:
+            raise ValueError(f"unknown detailed report format: {file_format}")
+        super().__init__(report_location)
+        self.file_format = file_format
+        self.flush_rows = flush_rows
+        self.dtypes = []
+        for column in self.columns:
+            if column in self.string_columns:
+                self.dtypes.append(object)
+            elif column in self.bool_columns:
+                self.dtypes.append(bool)
+            else:
+                self.dtypes.append(np.float64)
+        self.arrays = [np.empty(flush_rows, dtype=dtype) for dtype in self.dtypes]
+        self.rows = 0
+        self.parts = 0
+        # first part file of the running test, for IncrementalReport
+        self.test_first_part = 0
+
+    def append_columns(self):
+        pass
+
+    def append_file(self, csv_list):
+        """
+        Adds one tick, values are converted to the column type.
+        :param csv_list: values in DetailedCsvReport.columns order.
+        :return: no specific return value.
+        """
+        row = self.rows
+        for array, dtype, value in zip(self.arrays, self.dtypes, csv_list):
+            if dtype is object:
+                array[row] = None if value is None else str(value)
+            elif dtype is bool:
+                array[row] = bool(value)
+            else:
+                try:
+                    array[row] = value
+                except (TypeError, ValueError):
+                    array[row] = np.nan
+        self.rows += 1
+        if self.rows == self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered ticks as a new part file of the report directory"""
+        if self.rows == 0:
+            return
+        try:
+            table = pa.table(
+                {
+                    column: pa.array(array[: self.rows])
+                    for column, array in zip(self.columns, self.arrays)
+                }
+            )
+            part_file = self.report_csv_file / f"part-{self.parts:05d}.{self.file_format}"
+            if self.file_format == "parquet":
+                pyarrow.parquet.write_table(table, part_file)
+            else:
+                pyarrow.feather.write_feather(table, part_file)
+            self.parts += 1
+        except Exception as detailed_exception:
+            log.error(
+                f"Exception occurred  writing to the detailed report file: \n<{detailed_exception}>\n"
+            )
+        self.rows = 0
+
+    def reopen(self, report_csv_file):
+        """Continues writing to an existing report directory, e.g. after a resume"""
+        super().reopen(report_csv_file)
+        self.rows = 0
+        self.parts = len(list(self.report_csv_file.glob(f"part-*.{self.file_format}")))
+        self.test_first_part = self.parts
+
+    def take_test_rows(self):
+        """
+        Rows appended since the last call.
+        :return: DataFrame with the detailed report columns.
+        """
+        self.flush()
+        parts = [
+            self.report_csv_file / f"part-{part:05d}.{self.file_format}"
+            for part in range(self.test_first_part, self.parts)
+        ]
+        self.test_first_part = self.parts
+        return read_detailed_parts(parts, self.file_format)
+
+    def make_report_csv_file(self, new_report_csv_name):
+        new_report_csv_name = (
+            self.report_location
+            / f"{new_report_csv_name}_{self.time_stamp}{self.name_suffix}_Detailed.{self.file_format}"
+        )
+        print(new_report_csv_name)
+        if new_report_csv_name.is_dir():
+            return
+        else:
+            self.flush()
+            new_report_csv_name.mkdir(parents=False, exist_ok=True)
+            self.report_csv_file = new_report_csv_name
+            self.parts = 0
+            self.test_first_part = 0
+
+
+def load_detailed_report(report_file):
+    """
+    Loads a detailed report written by DetailedCsvReport or DetailedColumnarReport.
+    :param report_file: csv file or parquet/feather report directory.
+    :return: DataFrame with the DetailedCsvReport columns.
+    """
+    report_file = pathlib.Path(report_file)
+    if not report_file.is_dir():
+        return pd.read_csv(report_file)
+    file_format = report_file.suffix[1:]
+    return read_detailed_parts(
+        sorted(report_file.glob(f"part-*.{file_format}")), file_format
+    )
+
+
+def read_detailed_parts(parts, file_format):
+    """
+    Loads detailed report part files written by DetailedColumnarReport.
+    :param parts: part files in write order.
+    :param file_format: parquet or feather.
+    :return: DataFrame with the DetailedCsvReport columns.
+    """
+    if pa is None:
+        raise ImportError("loading columnar detailed reports requires pyarrow")
+    if file_format == "feather":
+        tables = [pyarrow.feather.read_table(part) for part in parts]
+    else:
+        tables = [pyarrow.parquet.read_table(part) for part in parts]
+    if not tables:
+        return pd.DataFrame(columns=DetailedCsvReport(".").columns)
+    df = pa.concat_tables(tables).to_pandas()
+    # match read_csv type inference, whole number columns without gaps are int64 and
+    # empty columns are float64
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and len(values) and values.isna().all():
+            df[column] = values.astype(np.float64)
+        elif values.dtype == np.float64 and len(values) and values.notna().all():
+            if (values == np.floor(values)).all():
+                df[column] = values.astype(np.int64)
+    return df
+
+
 class Report:
-    def __init__(self, report_csv_file, column_order):
+    def __init__(self, report_csv_file, column_order, df_base=None):
         self.report_csv_file = report_csv_file
         self.col_order = column_order
-        self.df_base = pd.read_csv(self.report_csv_file)
+        if df_base is None:
+            df_base = load_detailed_report(self.report_csv_file)
+        self.df_base = df_base
         self.df_steady = self.df_base[self.df_base.state == "steady"].copy()
         self.unique_tests = self.df_base["test_name"].unique().tolist()
         self.results = []
@@ -2223,104 +3153,99 @@ class Report:
         self.df_filter = pd.DataFrame(self.df_results)
 
     def process_results(self):
-        for name in self.unique_tests:
-            d = {}
-            d["test_name"] = name
-
-            # get mean values from steady state
-            mean_cols = [
-                "cps",
-                "tps",
-                "total_bandwidth",
-                "open_conns",
-                "tcp_avg_tt_synack",
-                "tcp_avg_ttfb",
-                "url_response_time",
-                "client_cpu",
-                "client_pkt_mem",
-                "client_rcv_queue",
-                "server_cpu",
-                "server_pkt_mem",
-                "server_rcv_queue",
-            ]
-            for col in mean_cols:
-                d[col] = self.df_steady.loc[
-                    self.df_steady["test_name"] == name, col
-                ].mean()
-
-            # get maximum values for all states
-            max_cols = [
-                "successful_txn",
-                "unsuccessful_txn",
-                "aborted_txn",
-                "total_tcp_established",
-                "total_tcp_attempted",
-                "seconds",
-                "current_load",
-                "t_run",
-                "t_start",
-                "t_tx",
-                "t_stop",
-            ]
-            for col in max_cols:
-                d[col] = self.df_base.loc[self.df_base["test_name"] == name, col].max()
-
-            max_steady_cols = ["seconds"]
-            for col in max_steady_cols:
-                d[col] = self.df_steady.loc[
-                    self.df_steady["test_name"] == name, col
-                ].max()
-
-            # checks steady vs. all state max, add _max to column name
-            max_compare_cols = ["cps", "tps", "total_bandwidth"]
-            for col in max_compare_cols:
-                col_name = col + "_max"
-                d[col_name] = self.df_base.loc[
-                    self.df_base["test_name"] == name, col
-                ].max()
-            # find current_load and seconds for max tps
-            d["max_tps_load"] = self.df_base.loc[
-                self.df_base["tps"] == d["tps_max"], "current_load"
-            ].iloc[0]
-            d["max_tps_seconds"] = self.df_base.loc[
-                self.df_base["tps"] == d["tps_max"], "seconds"
-            ].iloc[0]
-            total_pkt_count_sum = self.df_base.loc[self.df_base["test_name"] == name, "total_packet_count"].sum()
-            total_byte_rate_sum = self.df_base.loc[self.df_base["test_name"] == name, "total_byte_rate"].sum()
-            if total_pkt_count_sum > 0:
-                d["avg_pkt_size"] = int(total_byte_rate_sum / total_pkt_count_sum)
-            else:
-                d["avg_pkt_size"] = 0
-            # get script version from test
-            d["version"] = self.df_base.loc[self.df_base["test_name"] == name, "version"].iloc[0]
-
-            # get report link for current test - changed to take from last row in test
-            # d["report"] = self.df_base.loc[self.df_base["tps"] == d["tps_max"], "report"].iloc[0]
-            d["report"] = self.df_base.loc[self.df_base["test_name"] == name, "report"].iloc[-1]
-
-            # find min and max tps from steady phase
-            max_steady_compare = ["tps"]
-            for col in max_steady_compare:
-                col_name_min = col + "_stdy_min"
-                col_name_max = col + "_stdy_max"
-                col_name_delta = col + "_stdy_delta"
-                d[col_name_min] = self.df_steady.loc[
-                    self.df_steady["test_name"] == name, col
-                ].min()
-                d[col_name_max] = self.df_steady.loc[
-                    self.df_steady["test_name"] == name, col
-                ].max()
-
-                if d[col_name_min] != 0:
-                    d[col_name_delta] = (
-                        (d[col_name_max] - d[col_name_min]) / d[col_name_min]
-                    ) * 100
-
-                    d[col_name_delta] = round(d[col_name_delta], 3)
-                else:
-                    d[col_name_delta] = 0
+        tests = pd.Index(self.unique_tests, name="test_name")
+        base = self.df_base.groupby("test_name", sort=False)
+        steady = self.df_steady.groupby("test_name", sort=False)
+        df = pd.DataFrame(index=tests)
+
+        # get mean values from steady state
+        mean_cols = [
+            "cps",
+            "tps",
+            "total_bandwidth",
+            "open_conns",
+            "tcp_avg_tt_synack",
+            "tcp_avg_ttfb",
+            "url_response_time",
+            "client_cpu",
+            "client_pkt_mem",
+            "client_rcv_queue",
+            "server_cpu",
+            "server_pkt_mem",
+            "server_rcv_queue",
+        ]
+        df[mean_cols] = steady[mean_cols].mean().reindex(tests)
+
+        # get maximum values for all states
+        max_cols = [
+            "successful_txn",
+            "unsuccessful_txn",
+            "aborted_txn",
+            "total_tcp_established",
+            "total_tcp_attempted",
+            "seconds",
+            "current_load",
+            "t_run",
+            "t_start",
+            "t_tx",
+            "t_stop",
+        ]
+        df[max_cols] = base[max_cols].max().reindex(tests)
+
+        max_steady_cols = ["seconds"]
+        df[max_steady_cols] = steady[max_steady_cols].max().reindex(tests)
 
-            self.results.append(d)
+        # checks steady vs. all state max, add _max to column name
+        max_compare_cols = ["cps", "tps", "total_bandwidth"]
+        df[[col + "_max" for col in max_compare_cols]] = (
+            base[max_compare_cols].max().reindex(tests).to_numpy()
+        )
+        # find current_load and seconds for max tps, first row of the test at max tps
+        max_tps_rows = (
+            self.df_base[self.df_base["tps"] == base["tps"].transform("max")]
+            .drop_duplicates("test_name")
+            .set_index("test_name")
+            .reindex(tests)
+        )
+        df["max_tps_load"] = max_tps_rows["current_load"]
+        df["max_tps_seconds"] = max_tps_rows["seconds"]
+        pkt_sums = base[["total_packet_count", "total_byte_rate"]].sum().reindex(tests)
+        df["avg_pkt_size"] = [
+            int(byte_rate / pkt_count) if pkt_count > 0 else 0
+            for pkt_count, byte_rate in zip(
+                pkt_sums["total_packet_count"], pkt_sums["total_byte_rate"]
+            )
+        ]
+        # get script version from first row and report link from last row in test
+        first_rows = self.df_base.drop_duplicates("test_name", keep="first")
+        df["version"] = first_rows.set_index("test_name")["version"].reindex(tests)
+        last_rows = self.df_base.drop_duplicates("test_name", keep="last")
+        df["report"] = last_rows.set_index("test_name")["report"].reindex(tests)
+
+        # find min and max tps from steady phase
+        max_steady_compare = ["tps"]
+        for col in max_steady_compare:
+            col_name_min = col + "_stdy_min"
+            col_name_max = col + "_stdy_max"
+            col_name_delta = col + "_stdy_delta"
+            df[col_name_min] = steady[col].min().reindex(tests)
+            df[col_name_max] = steady[col].max().reindex(tests)
+            stdy_min = df[col_name_min]
+            delta = ((df[col_name_max] - stdy_min) / stdy_min.where(stdy_min != 0)) * 100
+            df[col_name_delta] = delta.round(3).where(stdy_min != 0, 0)
+
+        self.results = df.reset_index().to_dict("records")
+
+    @classmethod
+    def from_summary(cls, df_results):
+        """Report for html and csv output of an existing summary table"""
+        report = cls.__new__(cls)
+        report.report_csv_file = None
+        report.col_order = list(df_results.columns)
+        report.results = []
+        report.df_results = df_results
+        report.df_filter = pd.DataFrame(df_results)
+        return report
 
     def reset_df_filter(self):
         self.df_filter = pd.DataFrame(self.df_results)
@@ -2436,134 +3361,404 @@ class Report:
         ]
         return styles
 
+    # html table column styles
+    column_props = {
+        "test_name": {"width": "20em", "min-width": "14em", "text-align": "left"},
+        "cps": {"width": "6em", "min-width": "5em", "text-align": "right"},
+        "tps": {"width": "6em", "min-width": "5em", "text-align": "right"},
+        "cps_max": {"width": "6em", "min-width": "5em", "text-align": "right"},
+        "tps_max": {"width": "6em", "min-width": "5em", "text-align": "right"},
+        "total_bandwidth": {
+            "width": "8em",
+            "min-width": "7em",
+            "text-align": "right",
+        },
+        "total_bandwidth_max": {
+            "width": "8em",
+            "min-width": "7em",
+            "text-align": "right",
+        },
+        "open_conns": {"width": "8em", "min-width": "7em", "text-align": "right"},
+        "tcp_avg_tt_synack": {
+            "width": "3.7em",
+            "min-width": "3.7em",
+            "text-align": "right",
+        },
+        "tcp_avg_ttfb": {
+            "width": "3.7em",
+            "min-width": "3.7em",
+            "text-align": "right",
+        },
+        "avg_pkt_size": {
+            "width": "7em",
+            "min-width": "6em",
+            "text-align": "right",
+        },
+        "url_response_time": {
+            "width": "3.7em",
+            "min-width": "3.7em",
+            "text-align": "right",
+        },
+        "report": {"width": "3.7em", "min-width": "3.7em", "text-align": "right"},
+        "successful_txn": {
+            "width": "8em",
+            "min-width": "7em",
+            "text-align": "right",
+        },
+        "total_tcp_established": {
+            "width": "5em",
+            "min-width": "5em",
+            "text-align": "right",
+        },
+        "total_tcp_attempted": {
+            "width": "5em",
+            "min-width": "5em",
+            "text-align": "right",
+        },
+        "seconds": {"width": "3.7em", "min-width": "3.7em", "text-align": "right"},
+        "tps_stdy_min": {"width": "3.2em", "min-width": "3.2em", "text-align": "right"},
+        "tps_stdy_max": {"width": "3.2em", "min-width": "3.2em", "text-align": "right"},
+        "tps_stdy_delta": {
+            "width": "3.2em",
+            "min-width": "3.2em",
+            "text-align": "right",
+        },
+        "client_cpu": {"width": "3em", "min-width": "3em", "text-align": "right"},
+        "server_cpu": {"width": "3em", "min-width": "3em", "text-align": "right"},
+        "client_pkt_mem": {
+            "width": "3.5em",
+            "min-width": "3.5em",
+            "text-align": "right",
+        },
+        "client_rcv_queue": {
+            "width": "3.5em",
+            "min-width": "3.5em",
+            "text-align": "right",
+        },
+        "server_pkt_mem": {
+            "width": "3.9em",
+            "min-width": "3.9em",
+            "text-align": "right",
+        },
+        "server_rcv_queue": {
+            "width": "3.9em",
+            "min-width": "3.9em",
+            "text-align": "right",
+        },
+        "current_load": {
+            "width": "3.7em",
+            "min-width": "3.7em",
+            "text-align": "right",
+        },
+        "unsuccessful_txn": {
+            "width": "3.8em",
+            "min-width": "3.8em",
+            "text-align": "right",
+        },
+        "aborted_txn": {
+            "width": "3.5em",
+            "min-width": "3.5em",
+            "text-align": "right",
+        },
+        "max_tps_seconds": {
+            "width": "3.7em",
+            "min-width": "3.7em",
+            "text-align": "right",
+        },
+        "max_tps_load": {
+            "width": "3.7em",
+            "min-width": "3.7em",
+            "text-align": "right",
+        },
+        "t_run": {"width": "3em", "min-width": "3.7em", "text-align": "right"},
+        "t_start": {"width": "3em", "min-width": "3em", "text-align": "right"},
+        "t_tx": {"width": "3em", "min-width": "3em", "text-align": "right"},
+        "t_stop": {"width": "3em", "min-width": "3em", "text-align": "right"},
+        "version": {"width": "3em", "min-width": "3em", "text-align": "right"},
+    }
+
     def html_table(self, selected_style):
-        # Style
-        props = {
-            "test_name": {"width": "20em", "min-width": "14em", "text-align": "left"},
-            "cps": {"width": "6em", "min-width": "5em", "text-align": "right"},
-            "tps": {"width": "6em", "min-width": "5em", "text-align": "right"},
-            "cps_max": {"width": "6em", "min-width": "5em", "text-align": "right"},
-            "tps_max": {"width": "6em", "min-width": "5em", "text-align": "right"},
-            "total_bandwidth": {
-                "width": "8em",
-                "min-width": "7em",
-                "text-align": "right",
-            },
-            "total_bandwidth_max": {
-                "width": "8em",
-                "min-width": "7em",
-                "text-align": "right",
-            },
-            "open_conns": {"width": "8em", "min-width": "7em", "text-align": "right"},
-            "tcp_avg_tt_synack": {
-                "width": "3.7em",
-                "min-width": "3.7em",
-                "text-align": "right",
-            },
-            "tcp_avg_ttfb": {
-                "width": "3.7em",
-                "min-width": "3.7em",
-                "text-align": "right",
-            },
-            "avg_pkt_size": {
-                "width": "7em",
-                "min-width": "6em",
-                "text-align": "right",
-            },
-            "url_response_time": {
-                "width": "3.7em",
-                "min-width": "3.7em",
-                "text-align": "right",
-            },
-            "report": {"width": "3.7em", "min-width": "3.7em", "text-align": "right"},
-            "successful_txn": {
-                "width": "8em",
-                "min-width": "7em",
-                "text-align": "right",
-            },
-            "total_tcp_established": {
-                "width": "5em",
-                "min-width": "5em",
-                "text-align": "right",
-            },
-            "total_tcp_attempted": {
-                "width": "5em",
-                "min-width": "5em",
-                "text-align": "right",
-            },
-            "seconds": {"width": "3.7em", "min-width": "3.7em", "text-align": "right"},
-            "tps_stdy_min": {"width": "3.2em", "min-width": "3.2em", "text-align": "right"},
-            "tps_stdy_max": {"width": "3.2em", "min-width": "3.2em", "text-align": "right"},
-            "tps_stdy_delta": {
-                "width": "3.2em",
-                "min-width": "3.2em",
-                "text-align": "right",
-            },
-            "client_cpu": {"width": "3em", "min-width": "3em", "text-align": "right"},
-            "server_cpu": {"width": "3em", "min-width": "3em", "text-align": "right"},
-            "client_pkt_mem": {
-                "width": "3.5em",
-                "min-width": "3.5em",
-                "text-align": "right",
-            },
-            "client_rcv_queue": {
-                "width": "3.5em",
-                "min-width": "3.5em",
-                "text-align": "right",
-            },
-            "server_pkt_mem": {
-                "width": "3.9em",
-                "min-width": "3.9em",
-                "text-align": "right",
-            },
-            "server_rcv_queue": {
-                "width": "3.9em",
-                "min-width": "3.9em",
-                "text-align": "right",
-            },
-            "current_load": {
-                "width": "3.7em",
-                "min-width": "3.7em",
-                "text-align": "right",
-            },
-            "unsuccessful_txn": {
-                "width": "3.8em",
-                "min-width": "3.8em",
-                "text-align": "right",
-            },
-            "aborted_txn": {
-                "width": "3.5em",
-                "min-width": "3.5em",
-                "text-align": "right",
-            },
-            "max_tps_seconds": {
-                "width": "3.7em",
-                "min-width": "3.7em",
-                "text-align": "right",
-            },
-            "max_tps_load": {
-                "width": "3.7em",
-                "min-width": "3.7em",
-                "text-align": "right",
-            },
-            "t_run": {"width": "3em", "min-width": "3.7em", "text-align": "right"},
-            "t_start": {"width": "3em", "min-width": "3em", "text-align": "right"},
-            "t_tx": {"width": "3em", "min-width": "3em", "text-align": "right"},
-            "t_stop": {"width": "3em", "min-width": "3em", "text-align": "right"},
-            "version": {"width": "3em", "min-width": "3em", "text-align": "right"},
+        return render_html_table(self.df_filter, selected_style)
+
+
+def render_html_table(df, selected_style, renderer="styler"):
+    """
+    Renders a summary table as html.
+    :param df: filtered summary table.
+    :param selected_style: table styles, e.g. Report.style_a().
+    :param renderer: "styler" pandas Styler or "template" plain string template,
+     much faster for large tables and does not need jinja2.
+    :return: html string.
+    """
+    if renderer == "template":
+        return template_html_table(df, selected_style)
+    all_columns = set(df.columns)
+    html = df.style.set_properties(
+        subset="test_name", **Report.column_props["test_name"]
+    )
+    for k, v in Report.column_props.items():
+        if k in all_columns:
+            html = html.set_properties(subset=k, **v)
+    try:
+        html = html.set_table_styles(selected_style).hide_index().render()
+    except AttributeError:
+        html = html.set_table_styles(selected_style).hide(axis=0).to_html()
+
+    return html
+
+
+def template_html_table(df, selected_style):
+    """Same table layout and styles as the Styler output, rendered with str.join"""
+    table_id = f"T_{uuid.uuid4().hex[:5]}"
+    try:
+        precision = pd.get_option("styler.format.precision")
+    except KeyError:
+        # pandas < 1.4, the Styler uses the display precision
+        precision = pd.get_option("display.precision")
+    css = []
+    for style in selected_style:
+        props = "".join(f"  {k}: {v};\n" for k, v in style["props"])
+        css.append(f"#{table_id} {style['selector']} {{\n{props}}}\n")
+    for col_num, col in enumerate(df.columns):
+        if col in Report.column_props:
+            props = "".join(
+                f"  {k}: {v};\n" for k, v in Report.column_props[col].items()
+            )
+            css.append(f"#{table_id} td.col{col_num} {{\n{props}}}\n")
+    head = "".join(
+        f'      <th class="col_heading level0 col{col_num}" >{col}</th>\n'
+        for col_num, col in enumerate(df.columns)
+    )
+    rows = []
+    for row_num, row in enumerate(df.itertuples(index=False, name=None)):
+        cells = []
+        for col_num, value in enumerate(row):
+            if isinstance(value, float):
+                value = f"{value:.{precision}f}" if not math.isnan(value) else "nan"
+            cells.append(f'      <td class="data row{row_num} col{col_num}" >{value}</td>\n')
+        rows.append("    <tr>\n" + "".join(cells) + "    </tr>\n")
+    return (
+        f'<style type="text/css">\n{"".join(css)}</style>\n'
+        f'<table id="{table_id}">\n  <thead>\n    <tr>\n{head}    </tr>\n  </thead>\n'
+        f'  <tbody>\n{"".join(rows)}  </tbody>\n</table>\n'
+    )
+
+
+def start_render_processes(processes):
+    """
+    Starts the HtmlReportRenderer process pool.
+
+    Call it before anything starts a thread (setup_logging, ResponseLogWriter,
+    CfClient): forking a process with live threads can leave a child waiting on a
+    lock held by a thread that does not exist in the child. The fork start method
+    starts all workers on the first submit, so one job is run here.
+    :param processes: number of render processes.
+    :return: ProcessPoolExecutor, None for processes <= 1 or without fork.
+    """
+    if processes <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    if threading.active_count() > 1:
+        log.warning(
+            f"html render processes started with {threading.active_count()} threads running"
+        )
+    executor = ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("fork")
+    )
+    executor.submit(int).result()
+    return executor
+
+
+class HtmlReportRenderer:
+    """Renders the html sub tables of all html report variants
+
+    Each sub table row filter (report_tables) is applied once and shared by the
+    report variants (html_additional_reports column filters). Variants with the same
+    columns are rendered once. With an executor the tables are rendered in its
+    process pool, see start_render_processes. The executor is owned by the caller.
+
+    :param report_tables: sub table test name filters, None for all tests.
+    :param html_reports: {report name: columns or None for all columns}.
+    :param renderer: "styler" or "template", see render_html_table.
+    :param executor: start_render_processes pool, None renders in process.
+    """
+
+    def __init__(self, report_tables, html_reports, renderer="styler", executor=None):
+        if renderer not in {"styler", "template"}:
+            raise ValueError(f"unknown html renderer: {renderer}")
+        self.report_tables = report_tables
+        self.html_reports = html_reports
+        self.renderer = renderer
+        self.executor = executor
+
+    def render(self, df_results, sub_tables=None):
+        """
+        Renders sub tables for all report variants.
+        :param df_results: formatted summary table, Report.df_results.
+        :param sub_tables: sub tables to render, default all report_tables.
+        :return: {(report name, sub table): html with heading, empty if no tests}.
+        """
+        if sub_tables is None:
+            sub_tables = self.report_tables
+        style = Report.style_a()
+        jobs = {}
+        tables = {}
+        for sub_table in sub_tables:
+            df_sub = df_results
+            if sub_table is not None:
+                df_sub = df_results[df_results.test_name.str.contains(sub_table)]
+            if len(df_sub.index) == 0:
+                for k in self.html_reports:
+                    tables[(k, sub_table)] = None
+                continue
+            if sub_table is None:
+                heading = f"<h3>ALL TESTS - including above tests</h3>"
+            else:
+                heading = f"<h3>{sub_table}</h3>"
+            for k, filtered_columns in self.html_reports.items():
+                columns = None if filtered_columns is None else tuple(filtered_columns)
+                key = (sub_table, columns)
+                if key not in jobs:
+                    df = df_sub
+                    if columns is not None:
+                        df = df_sub.drop(columns=df_sub.columns.difference(columns))
+                    jobs[key] = (df, heading)
+                tables[(k, sub_table)] = key
+        if self.executor is not None:
+            futures = {
+                key: self.executor.submit(render_html_table, df, style, self.renderer)
+                for key, (df, heading) in jobs.items()
+            }
+            rendered = {key: jobs[key][1] + f.result() for key, f in futures.items()}
+        else:
+            rendered = {
+                key: heading + render_html_table(df, style, self.renderer)
+                for key, (df, heading) in jobs.items()
+            }
+        return {
+            table_key: "" if key is None else rendered[key]
+            for table_key, key in tables.items()
         }
 
-        # html = ''
-        all_columns = set(self.df_filter.columns)
-        html = self.df_filter.style.set_properties(
-            subset="test_name", **props["test_name"]
+
+class IncrementalReport:
+    """Summary reports updated one finished test at a time
+
+    Keeps the summary table of each detailed report file and the rendered html sub
+    tables. After a test only its rows are aggregated, the _all.csv is rewritten and
+    only the html sub tables matching the test name are rendered again. Output is
+    the same as a full Report rebuild with csv_report and html_report.
+    renderer and executor are passed to HtmlReportRenderer.
+    """
+
+    def __init__(
+        self,
+        column_order,
+        report_tables,
+        html_reports,
+        script_version,
+        report_header="",
+        renderer="styler",
+        executor=None,
+    ):
+        self.col_order = column_order
+        self.report_tables = report_tables
+        self.html_reports = html_reports
+        self.script_version = script_version
+        self.report_header = report_header
+        self.html_renderer = HtmlReportRenderer(
+            report_tables, html_reports, renderer, executor
         )
-        for k, v in props.items():
-            if k in all_columns:
-                html = html.set_properties(subset=k, **v)
-        try:
-            html = html.set_table_styles(selected_style).hide_index().render()
-        except AttributeError:
-            html = html.set_table_styles(selected_style).hide(axis=0).to_html()
+        # {detailed report file: summary DataFrame}
+        self.summaries = {}
+        # {detailed report file: {(html report name, sub table): html}}
+        self.html_tables = {}
 
-        return html
\ No newline at end of file
+    def update(self, detailed_report):
+        """
+        Adds the rows of the finished test and writes the summary reports.
+        :param detailed_report: DetailedCsvReport or DetailedColumnarReport.
+        :return: summary Report of the detailed report file.
+        """
+        report_file = detailed_report.report_csv_file
+        df_rows = detailed_report.take_test_rows()
+        names = df_rows["test_name"].unique().tolist()
+        summary = self.summaries.get(report_file)
+        order = [] if summary is None else summary["test_name"].tolist()
+        known = set(order)
+        if any(name in known for name in names):
+            # test name ran before in this file, aggregate all its rows
+            detailed_report.flush()
+            df_base = load_detailed_report(report_file)
+            df_rows = df_base[df_base["test_name"].isin(names)]
+        summary_new = Report(report_file, self.col_order, df_rows).df_results
+        if summary is not None and len(summary.index):
+            order = order + [name for name in names if name not in known]
+            summary = pd.concat(
+                [summary[~summary["test_name"].isin(names)], summary_new],
+                ignore_index=True,
+            )
+            summary_new = (
+                summary.set_index("test_name", drop=False)
+                .loc[order]
+                .reset_index(drop=True)
+                .reindex(columns=self.col_order)
+            )
+        summary = summary_new
+        self.summaries[report_file] = summary
+        self.write(report_file, summary, names)
+        return Report.from_summary(summary)
+
+    def load_summary(self, report_file):
+        """Aggregates all tests of an existing detailed report file"""
+        summary = Report(report_file, self.col_order).df_results
+        self.summaries[report_file] = summary
+        return summary
+
+    def rebuild(self, detailed_report):
+        """
+        Aggregates the whole detailed report file and writes the summary reports,
+        e.g. for a test resumed from a checkpoint.
+        :return: summary Report of the detailed report file.
+        """
+        detailed_report.take_test_rows()
+        report_file = detailed_report.report_csv_file
+        summary = self.load_summary(report_file)
+        self.html_tables.pop(report_file, None)
+        self.write(report_file, summary)
+        return Report.from_summary(summary)
+
+    def write(self, report_file, summary, names=None):
+        """
+        Writes the _all.csv and html reports of a summary table.
+        :param names: test names changed since the last write, None for all.
+        :return: no specific return value.
+        """
+        file_name = report_file.stem
+        file_path = report_file.parent
+        if file_name.endswith("_Detailed"):
+            file_name = file_name[: -len("_Detailed")]
+        table = Report.from_summary(summary)
+        # create summary csv report with all columns
+        csv_report_file = pathlib.Path(file_path / f"{file_name}_all.csv")
+        print(csv_report_file)
+        table.df_filter.to_csv(csv_report_file, index=False)
+        # create html report files, render sub tables with changed rows
+        tables = self.html_tables.setdefault(report_file, {})
+        changed = [
+            sub_table
+            for sub_table in self.report_tables
+            if sub_table is None
+            or names is None
+            or not tables
+            or any(re.search(sub_table, name) for name in names)
+        ]
+        tables.update(self.html_renderer.render(summary, changed))
+        for k in self.html_reports:
+            report_html_file = pathlib.Path(file_path / f"{file_name}_{k}.html")
+            print(report_html_file)
+            write_html_report(
+                [tables[(k, sub_table)] for sub_table in self.report_tables],
+                report_html_file,
+                self.script_version,
+                self.report_header,
+            )
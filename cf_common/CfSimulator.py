@@ -0,0 +1,737 @@
+import contextlib
+import copy
+import inspect
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import pathlib
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from cf_common.CfClient import CfClientMetrics, RunSnapshot
+from cf_common.CfRunTest import CfRunTest, DetailedCsvReport, RunData
+
+log = logging.getLogger(__name__)
+
+# run_tests.csv row used as the base of simulated runs
+simulated_test = {
+    "name": "simulated",
+    "id": "sim-test",
+    "type": "http_connections_per_second",
+    "run": "Y",
+    "run_order": "1",
+    "goal_seek": "Y",
+    "ramp_seek": "N",
+    "ramp_kpi": "cps",
+    "ramp_value": "1000",
+    "ramp_step": "5",
+    "duration": "1800",
+    "startup": "5",
+    "rampup": "10",
+    "rampdown": "10",
+    "shutdown": "10",
+    "sustain_period": "30",
+    "kpi_1": "tps",
+    "kpi_2": "cps",
+    "kpi_and_or": "OR",
+    "load_type": "simusers",
+    "start_load": "7",
+    "incr_low": "7",
+    "incr_med": "5",
+    "incr_high": "3",
+    "low_threshold": "20",
+    "med_threshold": "5",
+    "high_threshold": "1",
+    "variance_sample_size": "3",
+    "max_variance": "0.03",
+    "capacity_adj": "auto",
+    "ramp_low": "40",
+    "ramp_med": "30",
+    "ramp_high": "20",
+    "living_simusers_max": "none",
+    "goal_seek_strategy": "step",
+    "latency_kpi": "ttfb",
+    "latency_ceiling": "none",
+    "stability_method": "variance",
+    "stability_window": "10",
+    "precision": "none",
+    "warm_start": "N",
+}
+
+# loadSpecification keys holding the load value
+load_keys = ("simUsers", "bandwidth", "connectionsPerSecond", "connections")
+# memory state change event of CyberFlood when the heap memory is exhausted
+memory_throttled_event = "Heap Memory state changed from OK to Throttled Free"
+
+
+class VirtualClock:
+    """Time source for simulated runs, sleep advances the time without waiting
+
+    Has the time(), monotonic() and sleep() functions of the time module used by
+    CfRunTest and TickScheduler.
+    """
+
+    def __init__(self, start=1_600_000_000.0):
+        self.now = float(start)
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+
+class DutModel:
+    """Load response of a simulated device under test
+
+    Throughput follows load with gain and bends into capacity at a knee:
+    gain * load / (1 + (gain * load / capacity) ** sharpness) ** (1 / sharpness),
+    a larger sharpness gives a harder knee. For connections/second and bandwidth
+    load types the load is the throughput (gain 1). Open connections are limited by
+    the client memory pool, time to first byte grows with utilization as
+    ttfb / (1 - utilization).
+
+    :param capacity: max throughput, transactions/second for SimUsers and open
+     connections, load units for connections/second and bandwidth.
+    :param gain: transactions/second per SimUser or open connection below the knee.
+    :param sharpness: knee sharpness.
+    :param noise: relative standard deviation of the measured rates.
+    :param ttfb: time to first byte in ms without load.
+    :param txns_per_conn: transactions per connection.
+    :param txn_kbits: bandwidth in kbps per transaction/second.
+    :param conn_lifetime: seconds a connection stays open in rate tests.
+    :param conn_rate: max new connections/second of open connections tests.
+    :param memory_size: client main memory pool size.
+    :param memory_base: memory pool used without connections.
+    :param memory_per_conn: memory pool used per open connection.
+    :param seed: random seed of the noise.
+    """
+
+    def __init__(
+        self,
+        capacity=20000,
+        gain=100.0,
+        sharpness=4.0,
+        noise=0.01,
+        ttfb=2.0,
+        txns_per_conn=1.0,
+        txn_kbits=80.0,
+        conn_lifetime=0.5,
+        conn_rate=50000,
+        memory_size=4_000_000,
+        memory_base=200_000,
+        memory_per_conn=2.0,
+        seed=None,
+    ):
+        self.capacity = capacity
+        self.gain = gain
+        self.sharpness = sharpness
+        self.noise = noise
+        self.ttfb = ttfb
+        self.txns_per_conn = txns_per_conn
+        self.txn_kbits = txn_kbits
+        self.conn_lifetime = conn_lifetime
+        self.conn_rate = conn_rate
+        self.memory_size = memory_size
+        self.memory_base = memory_base
+        self.memory_per_conn = memory_per_conn
+        self.rng = random.Random(seed)
+        self.start("http_throughput", "SimUsers")
+
+    def start(self, test_type, load_type):
+        """Resets the state for a new test run"""
+        self.open_conns_test = test_type == "open_connections"
+        self.load_type = load_type.lower()
+        self.conns = 0.0
+
+    def saturate(self, offered):
+        if offered <= 0:
+            return 0.0
+        ratio = (offered / self.capacity) ** self.sharpness
+        return offered / (1 + ratio) ** (1 / self.sharpness)
+
+    def throughput(self, load):
+        """Noise free transactions/second (or load units for rate load types)"""
+        if self.load_type in {"connections/second", "bandwidth"}:
+            return self.saturate(load)
+        return self.saturate(self.gain * load)
+
+    def max_conns(self):
+        return int((self.memory_size - self.memory_base) / self.memory_per_conn)
+
+    def noisy(self, value):
+        if self.noise <= 0 or value <= 0:
+            return value
+        return max(0.0, value * self.rng.gauss(1, self.noise))
+
+    def step(self, desired_load, seconds):
+        """
+        Advances the DUT by seconds at desired_load.
+        :return: dict with current_load, tps, cps, conns, bandwidth, ttfb, cpu,
+         memory_used, memory_size and suspending.
+        """
+        suspending = 0
+        if self.open_conns_test:
+            target = min(desired_load, self.max_conns())
+            if self.load_type == "simusers":
+                suspending = max(0, desired_load - target)
+            conns = min(target, self.conns + self.conn_rate * seconds)
+            cps = max(0.0, conns - self.conns) / seconds if seconds > 0 else 0.0
+            self.conns = conns
+            current_load = desired_load if self.load_type == "simusers" else conns
+            tps = cps * self.txns_per_conn
+            utilization = cps / self.conn_rate
+        else:
+            achieved = self.throughput(desired_load)
+            utilization = achieved / self.capacity
+            achieved = self.noisy(achieved)
+            if self.load_type == "connections/second":
+                current_load = achieved
+                cps = achieved
+                tps = cps * self.txns_per_conn
+            elif self.load_type == "bandwidth":
+                current_load = achieved
+                tps = achieved / self.txn_kbits
+                cps = tps / self.txns_per_conn
+            else:
+                current_load = desired_load
+                tps = achieved
+                cps = tps / self.txns_per_conn
+            self.conns = cps * self.conn_lifetime
+        utilization = min(utilization, 0.99)
+        return {
+            "current_load": int(round(current_load)),
+            "tps": int(round(tps)),
+            "cps": int(round(cps)),
+            "conns": int(round(self.conns)),
+            "bandwidth": int(round(tps * self.txn_kbits)),
+            "ttfb": round(self.noisy(self.ttfb / (1 - utilization)), 1),
+            "cpu": round(100 * utilization, 1),
+            "memory_used": int(self.memory_base + self.memory_per_conn * self.conns),
+            "memory_size": self.memory_size,
+            "suspending": int(suspending),
+        }
+
+
+def simulated_queue_info(queue_id="sim-queue", device_ip="10.0.0.1", cores=6, ports=2):
+    """get_queue response of a single compute group queue"""
+    return {
+        "id": queue_id,
+        "capacity": 60,
+        "computeGroups": [
+            {"cores": cores, "ports": [f"{device_ip}/1/{p}" for p in range(1, ports + 1)]}
+        ],
+        "ports": [],
+        "portCount": ports,
+        "devices": [
+            {
+                "ip": device_ip,
+                "description": "CF: Simulated DUT",
+                "slots": [
+                    {
+                        "profile": "Performance-Simulated",
+                        "model": "CF: SIM-100G",
+                        "computeGroups": [{"software": "l4l7lxc5.8.0.0"}],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def simulated_test_config(test_type, test_id, queue_id="sim-queue", device_ip="10.0.0.1"):
+    """get_test response with one client and one server interface"""
+    config = {
+        "queue": {"id": queue_id},
+        "loadSpecification": {"type": "SimUsers"},
+        "protocol": {},
+    }
+    client = {"portSystemId": f"{device_ip}/1/1"}
+    server = {"portSystemId": f"{device_ip}/1/2"}
+    if test_type == "advanced_mixed_traffic":
+        config["relationships"] = [{"client": client, "server": server}]
+    else:
+        config["interfaces"] = {"client": [client], "server": [server]}
+    return {"id": test_id, "name": test_id, "config": config}
+
+
+def iso_time(t):
+    if t is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t))
+
+
+def stats_list(groups):
+    """{type: {subType: value} or value} as the statistics list of the controller"""
+    stats = []
+    for stat_type, values in groups.items():
+        if isinstance(values, dict):
+            for sub_type, value in values.items():
+                stats.append({"type": stat_type, "subType": sub_type, "value": value})
+        else:
+            stats.append({"type": stat_type, "value": values})
+    return stats
+
+
+class SimulatedRun:
+    """State of one simulated test run"""
+
+    def __init__(self, run_id, test_id, test_type, config, started_at, timing):
+        self.id = run_id
+        self.test_id = test_id
+        self.test_type = test_type
+        self.name = config.get("name", test_id)
+        self.load_spec = copy.deepcopy(config["config"]["loadSpecification"])
+        self.queue_id = config["config"]["queue"]["id"]
+        self.created_at = started_at
+        self.running_at = started_at + timing["wait"]
+        self.traffic_at = self.running_at + timing["init"]
+        self.stop_time = timing["stop"]
+        self.stop_at = None
+        self.target = next(
+            (self.load_spec[k] for k in load_keys if k in self.load_spec), 0
+        )
+        self.duration = int(self.load_spec.get("duration", 1800))
+        self.last_step = None
+        self.sample = None
+        self.totals = {"txns": 0.0, "conns": 0.0}
+
+    def status(self, now):
+        if now < self.running_at:
+            return "waiting", None
+        if self.stop_at is not None:
+            if now >= self.stop_at + self.stop_time:
+                return "stopped", None
+            return "running", "stopping"
+        if now < self.traffic_at:
+            return "running", "initializing"
+        if now - self.traffic_at >= self.duration:
+            return "finished", None
+        return "running", None
+
+    def elapsed(self, now):
+        end = now if self.stop_at is None else min(now, self.stop_at)
+        return int(min(max(end - self.traffic_at, 0), self.duration))
+
+    def desired_load(self, now):
+        """Load of the load specification phase, ramped down after stop"""
+        status, sub_status = self.status(now)
+        if status != "running" or sub_status == "initializing":
+            return 0
+        if sub_status == "stopping":
+            return self.target * max(0.0, 1 - (now - self.stop_at) / self.stop_time)
+        spec = self.load_spec
+        elapsed = now - self.traffic_at
+        startup = int(spec.get("startup", 0))
+        rampup = int(spec.get("rampup", 0))
+        rampdown = int(spec.get("rampdown", 0))
+        shutdown = int(spec.get("shutdown", 0))
+        if elapsed < startup:
+            return 0
+        if elapsed < startup + rampup:
+            return self.target * (elapsed - startup) / rampup
+        rampdown_at = self.duration - rampdown - shutdown
+        if elapsed < rampdown_at:
+            return self.target
+        if elapsed < rampdown_at + rampdown:
+            return self.target * (1 - (elapsed - rampdown_at) / rampdown)
+        return 0
+
+    def test_run(self, now):
+        status, sub_status = self.status(now)
+        elapsed = self.elapsed(now)
+        finished_at = None
+        if status == "finished":
+            finished_at = self.traffic_at + self.duration
+        elif status == "stopped":
+            finished_at = self.stop_at + self.stop_time
+        return {
+            "id": self.id,
+            "testId": self.test_id,
+            "queueId": self.queue_id,
+            "runId": f"{self.id}-result",
+            "status": status,
+            "subStatus": sub_status,
+            "score": None,
+            "grade": None,
+            "test": {"id": self.test_id, "name": self.name, "type": self.test_type},
+            "createdAt": iso_time(self.created_at),
+            "updatedAt": iso_time(now),
+            "startedAt": iso_time(self.running_at) if now >= self.running_at else None,
+            "finishedAt": iso_time(finished_at),
+            "progress": int(100 * elapsed / self.duration) if self.duration else 0,
+            "timeElapsed": elapsed,
+            "timeRemaining": self.duration - elapsed,
+        }
+
+
+class SimulatedCfClient:
+    """In-process CfClient for offline runs of CfRunTest
+
+    Implements the CfClient methods used by CfRunTest and the run scripts. Test runs
+    follow the controller life cycle (waiting, running with initializing sub status,
+    traffic, stopping, stopped or finished) on clock, and statistics come from
+    dut. Pass the same VirtualClock to CfRunTest to run a test in milliseconds.
+
+    :param dut: DutModel, one DUT shared by the runs of the client.
+    :param clock: VirtualClock or the time module.
+    :param tests: {test id: get_test response}, unknown ids get simulated_test_config.
+    :param queue_info: get_queue response, default simulated_queue_info.
+    :param wait_time: seconds from start until running status.
+    :param init_time: seconds from running status until traffic.
+    :param stop_time: seconds from stop until stopped status.
+    :param call_time: seconds each API call advances a VirtualClock.
+    """
+
+    def __init__(
+        self,
+        dut=None,
+        clock=None,
+        tests=None,
+        queue_info=None,
+        wait_time=8,
+        init_time=6,
+        stop_time=6,
+        call_time=0.0,
+    ):
+        self.dut = dut if dut is not None else DutModel()
+        self.clock = clock if clock is not None else VirtualClock()
+        self.tests = copy.deepcopy(tests) if tests else {}
+        self.queue_info = queue_info or simulated_queue_info()
+        self.timing = {"wait": wait_time, "init": init_time, "stop": stop_time}
+        self.call_time = call_time
+        self.controller_ip = "simulator"
+        self.exception_state = True
+        self.client_metrics = CfClientMetrics()
+        self.runs = {}
+
+    def call(self, endpoint):
+        self.client_metrics.record(endpoint, self.call_time, 200, 0, 0)
+        if self.call_time and isinstance(self.clock, VirtualClock):
+            self.clock.sleep(self.call_time)
+        return self.clock.time()
+
+    def metrics(self):
+        return self.client_metrics.snapshot()
+
+    def connect(self):
+        self.call("POST /token")
+
+    def test_config(self, test_type, test_id):
+        if test_id not in self.tests:
+            self.tests[test_id] = simulated_test_config(
+                test_type, test_id, self.queue_info["id"]
+            )
+        return self.tests[test_id]
+
+    def get_test(self, test_type, test_id, outfile):
+        self.call("GET /tests/{type}/{id}")
+        response = copy.deepcopy(self.test_config(test_type, test_id))
+        with open(outfile, "w") as f:
+            json.dump(response, f, indent=4)
+        return response
+
+    def update_test(self, test_type, test_id, infile):
+        self.call("PUT /tests/{type}/{id}")
+        with open(infile, "r") as f:
+            update = json.load(f)
+        config = self.test_config(test_type, test_id)
+        config["config"]["loadSpecification"].update(
+            update.get("config", {}).get("loadSpecification", {})
+        )
+        return copy.deepcopy(config)
+
+    def get_queue(self, queue_id):
+        self.call("GET /queues/{id}")
+        return copy.deepcopy(self.queue_info)
+
+    def get_system_version(self):
+        self.call("GET /system/version")
+        return {"version": "simulated"}
+
+    def start_test(self, test_id):
+        now = self.call("PUT /tests/{id}/start")
+        config = self.tests.get(test_id)
+        if config is None:
+            config = self.test_config("http_throughput", test_id)
+        test_type = config.get("type", "http_throughput")
+        run_id = f"sim-run-{len(self.runs) + 1}"
+        run = SimulatedRun(run_id, test_id, test_type, config, now, self.timing)
+        self.runs[run_id] = run
+        self.dut.start(test_type, run.load_spec.get("type", "SimUsers"))
+        return run.test_run(now)
+
+    def list_test_runs(self):
+        now = self.call("GET /test_runs")
+        return [run.test_run(now) for run in self.runs.values()]
+
+    def get_test_run(self, test_run_id):
+        now = self.call("GET /test_runs/{id}")
+        return self.runs[test_run_id].test_run(now)
+
+    def fetch_test_run_statistics(self, test_run_id):
+        now = self.call("GET /test_runs/{id}/statistics")
+        return self.statistics(self.runs[test_run_id], now)
+
+    def fetch_test_run_snapshot(self, test_run_id):
+        statistics = self.fetch_test_run_statistics(test_run_id)
+        test_run = self.get_test_run(test_run_id)
+        return RunSnapshot(test_run, statistics, self.clock.time())
+
+    def fetch_event_logs(self, test_run_id):
+        self.call("GET /test_runs/{id}/eventlogs")
+        run = self.runs[test_run_id]
+        logs = []
+        if run.sample and run.sample["memory_used"] >= 0.97 * run.sample["memory_size"]:
+            logs.append(f"{iso_time(self.clock.time())} {memory_throttled_event}")
+        return {"logs": logs}
+
+    def stop_test(self, test_run_id):
+        now = self.call("PUT /test_runs/{id}/stop")
+        run = self.runs[test_run_id]
+        if run.stop_at is None and run.status(now)[0] in {"waiting", "running"}:
+            run.stop_at = now
+        return run.test_run(now)
+
+    def change_load(self, test_run_id, new_load):
+        self.call("PUT /test_runs/{id}/changeload")
+        self.runs[test_run_id].target = new_load
+        return {"load": new_load}
+
+    def step(self, run, now):
+        """Advances the DUT of run to now, samples are reused within a second"""
+        if run.sample is not None and now - run.last_step < 1:
+            return run.sample
+        seconds = 0 if run.last_step is None else now - run.last_step
+        run.sample = self.dut.step(run.desired_load(now), seconds)
+        run.totals["txns"] += run.sample["tps"] * seconds
+        run.totals["conns"] += run.sample["cps"] * seconds
+        run.last_step = now
+        return run.sample
+
+    def statistics(self, run, now):
+        sample = self.step(run, now)
+        elapsed = run.elapsed(now)
+        desired = int(round(run.desired_load(now)))
+        rx_bw = int(sample["bandwidth"] * 0.9)
+        tx_bw = sample["bandwidth"] - rx_bw
+        txns = int(run.totals["txns"])
+        conns = int(run.totals["conns"])
+        memory = {
+            "mainPoolSize": sample["memory_size"],
+            "mainPoolUsed": sample["memory_used"],
+            "packetMemoryUsed": 0,
+            "rcvQueueLength": 0,
+        }
+        client = {
+            "sum": {
+                "successfulTxnsPerSec": sample["tps"],
+                "attemptedTxnsPerSec": sample["tps"],
+                "unsuccessfulTxnsPerSec": 0,
+                "successfulTxns": txns,
+                "attemptedTxns": txns,
+                "unsuccessfulTxns": 0,
+                "currentLoadSpecCount": sample["current_load"],
+                "desiredLoadSpecCount": desired,
+                "establishedConnRate": sample["cps"],
+                "attemptedConnRate": sample["cps"],
+                "currentEstablishedConns": sample["conns"],
+                "attemptedConns": sample["conns"],
+                "rxByteRate": rx_bw * 125,
+                "txByteRate": tx_bw * 125,
+            },
+            "driver": {
+                "rxBandwidth": rx_bw,
+                "txBandwidth": tx_bw,
+                "rxPacketCount": txns * 8,
+                "txPacketCount": txns * 6,
+                "rxPacketRate": sample["tps"] * 8,
+                "txPacketRate": sample["tps"] * 6,
+            },
+            "http": {"abortedTxns": 0, "abortedTxnsPerSec": 0},
+            "tcp": {
+                "averageTimeToFirstByte": sample["ttfb"],
+                "averageTimeToSynAck": round(sample["ttfb"] / 2, 1),
+                "cummulativeEstablishedConns": conns,
+                "cummulativeAttemptedConns": conns,
+            },
+            "url": {"averageRespTimePerUrl": sample["ttfb"] * 1200},
+            "memory": memory,
+            "loadspec": {"cpuUtilized": sample["cpu"], "averageIdleTime": 0},
+            "simusers": {
+                "simUsersAlive": sample["current_load"],
+                "simUsersAnimating": sample["current_load"],
+                "simUsersBlocking": 0,
+                "simUsersSleeping": 0,
+                "simUsersSuspending": sample["suspending"],
+            },
+            "timeElapsed": elapsed,
+            "timeRemaining": run.duration - elapsed,
+        }
+        server = {
+            "sum": {"closedWithNoError": conns, "closedWithError": 0, "closedWithReset": 0},
+            "driver": {
+                "rxBandwidth": tx_bw,
+                "txBandwidth": rx_bw,
+                "rxPacketCount": txns * 6,
+                "txPacketCount": txns * 8,
+                "rxPacketRate": sample["tps"] * 6,
+                "txPacketRate": sample["tps"] * 8,
+            },
+            "memory": dict(memory, cpuUtilized=sample["cpu"]),
+        }
+        return {"client": stats_list(client), "server": stats_list(server)}
+
+
+class SimulatedResultFile(DetailedCsvReport):
+    """Detailed report sink that keeps the rows in memory"""
+
+    def __init__(self):
+        super().__init__(pathlib.Path("simulation"))
+
+    def append_columns(self):
+        pass
+
+    def append_file(self, csv_list):
+        self.test_lines.append(",".join(map(str, csv_list)) + "\n")
+
+    def make_report_dir(self, report_dir_name):
+        self.report_location = self.report_location_parent / report_dir_name
+
+    def make_report_csv_file(self, new_report_csv_name):
+        self.report_csv_file = (
+            self.report_location
+            / f"{new_report_csv_name}_{self.time_stamp}{self.name_suffix}_Detailed.csv"
+        )
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of simulate_run"""
+    completed: bool
+    rows: pd.DataFrame
+    goal_seek_count: int
+    max_load_reached: bool
+    max_load: float
+    max_tps: float
+    steady_tps: float
+    steady_load: float
+    seconds: float
+
+    def summary(self):
+        """Result values without the detailed rows"""
+        return {k: v for k, v in vars(self).items() if k != "rows"}
+
+
+def simulate_run(
+    test=None,
+    dut=None,
+    tick_periods=None,
+    tick_policy="skip",
+    quiet=True,
+    results_index=None,
+    **client_args,
+):
+    """
+    Runs one test with CfRunTest against a SimulatedCfClient on a VirtualClock.
+    :param test: run_tests.csv row, default simulated_test.
+    :param dut: DutModel, default DutModel().
+    :param quiet: discard the console output of CfRunTest.
+    :param results_index: ResultsIndex for warm start, the completed run is recorded.
+    :param client_args: SimulatedCfClient arguments, e.g. wait_time.
+    :return: SimulationResult.
+    """
+    test = dict(test or simulated_test)
+    clock = VirtualClock()
+    cf = SimulatedCfClient(dut, clock, **client_args)
+    cf.tests.setdefault(
+        test["id"], simulated_test_config(test["type"], test["id"], cf.queue_info["id"])
+    )
+    cf.tests[test["id"]]["type"] = test["type"]
+    cf.tests[test["id"]]["name"] = test["name"]
+    result_file = SimulatedResultFile()
+    rd = RunData()
+    started = clock.time()
+    output = io.StringIO() if quiet else None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            rt = CfRunTest(
+                cf, rd, test, result_file, pathlib.Path(temp_dir),
+                tick_periods, tick_policy, clock, results_index,
+            )
+            completed = rt.init_sequence(cf, rd, test) and rt.control_test(cf, rd)
+    if completed and results_index is not None:
+        results_index.record(rt, rd)
+    rows = result_file.take_test_rows()
+    steady = rows[rows["state"] == "steady"]
+    return SimulationResult(
+        completed=bool(completed),
+        rows=rows,
+        goal_seek_count=rd.goal_seek_count,
+        max_load_reached=rd.max_load_reached,
+        max_load=float(rows["current_load"].max()) if len(rows.index) else 0.0,
+        max_tps=float(rows["tps"].max()) if len(rows.index) else 0.0,
+        steady_tps=float(steady["tps"].mean()) if len(steady.index) else 0.0,
+        steady_load=float(steady["current_load"].mean()) if len(steady.index) else 0.0,
+        seconds=round(clock.time() - started, 3),
+    )
+
+
+def sweep_run(args):
+    test, dut_args, tick_periods, tick_policy = args
+    result = simulate_run(test, DutModel(**dut_args), tick_periods, tick_policy)
+    return result.summary()
+
+
+def sweep(test=None, grid=None, dut_args=None, repeats=1, tick_periods=None,
+          tick_policy="skip", processes=1):
+    """
+    Simulates a test for every combination of grid values.
+
+    Grid keys that are DutModel arguments change the DUT, other keys change the
+    run_tests.csv row, e.g. {"incr_low": [5, 7], "max_variance": [0.01, 0.03],
+    "capacity": [10000, 40000]}. Each combination runs repeats times with noise
+    seeds 0..repeats-1.
+
+    :param dut_args: DutModel arguments used for all runs.
+    :param processes: number of simulation processes (fork start method only).
+    :return: DataFrame with the grid values, seed and SimulationResult summary.
+    """
+    test = dict(test or simulated_test)
+    grid = grid or {}
+    dut_names = set(inspect.signature(DutModel).parameters)
+    names = list(grid)
+    jobs = []
+    params = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        combination = dict(zip(names, values))
+        for seed in range(repeats):
+            run_test = dict(test)
+            run_dut = dict(dut_args or {}, seed=seed)
+            for name, value in combination.items():
+                if name in dut_names:
+                    run_dut[name] = value
+                else:
+                    run_test[name] = value
+            params.append(dict(combination, seed=seed))
+            jobs.append((run_test, run_dut, tick_periods, tick_policy))
+    if processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            results = list(executor.map(sweep_run, jobs))
+    else:
+        results = [sweep_run(job) for job in jobs]
+    log.info(f"sweep: {len(results)} simulated runs")
+    return pd.DataFrame([dict(p, **r) for p, r in zip(params, results)])
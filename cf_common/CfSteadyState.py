@@ -0,0 +1,270 @@
+import logging
+import math
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# two sided 95% quantile of the normal distribution
+z_critical = 1.959964
+# 95% quantile of the max of a Brownian bridge (Kolmogorov), for the scaled CUSUM
+cusum_critical = 1.358
+
+
+class SteadyStateMethod:
+    """Decides which KPIs are stable from their rolling windows
+
+    Methods are selected per test with the stability_method column of run_tests.csv.
+    The statistical methods use a RollingStatsBank with stability_window samples per
+    KPI. Their stable flags replace the variance check of the KPI rows in
+    RollingStatsBank.check_if_stable, so goal seek, ramp seek and the sustain period
+    use them unchanged. They keep no state, the windows are in the bank.
+    min_window is the smallest stability_window at which the method can reject a
+    stable window, smaller windows are raised to it.
+    """
+
+    name = None
+    min_window = 3
+
+    def stable(self, bank, max_var):
+        """
+        :param bank: RollingStatsBank with the KPI windows.
+        :param max_var: max_variance per KPI row.
+        :return: boolean stable array, one per KPI row.
+        """
+        raise NotImplementedError
+
+
+class VarianceSteadyState(SteadyStateMethod):
+    """(max - min) / avg of the window not above max_variance"""
+
+    name = "variance"
+
+    def stable(self, bank, max_var):
+        return bank.variance <= max_var
+
+
+class CvSteadyState(SteadyStateMethod):
+    """Coefficient of variation, std / avg of the window, not above max_variance
+
+    A single outlier moves the standard deviation less than the max - min range.
+    """
+
+    name = "cv"
+
+    def stable(self, bank, max_var):
+        windows = bank.ordered_windows()
+        std = windows.std(axis=1, ddof=1)
+        cv = bank.safe_divide(std, np.abs(windows.mean(axis=1)))
+        return cv <= max_var
+
+
+class MannKendallSteadyState(SteadyStateMethod):
+    """No monotonic trend in the window by the Mann-Kendall test at 5%
+
+    Rank based, so outliers hardly change the verdict while slow drift does. Below 5
+    samples even a strictly monotonic window stays under the critical z.
+    """
+
+    name = "mann_kendall"
+    min_window = 5
+
+    def stable(self, bank, max_var):
+        windows = bank.ordered_windows()
+        n = windows.shape[1]
+        upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+        signs = np.sign(windows[:, None, :] - windows[:, :, None])
+        s = (signs * upper).sum(axis=(1, 2))
+        var_s = self.variance(windows)
+        z = bank.safe_divide(s - np.sign(s), np.sqrt(var_s))
+        return np.abs(z) < z_critical
+
+    @staticmethod
+    def variance(windows):
+        """Variance of the Mann-Kendall S statistic of each row with the tie correction
+
+        Ties are the runs of equal values in the sorted rows, every row starts a run.
+        """
+        rows, n = windows.shape
+        ordered = np.sort(windows, axis=1)
+        starts = np.ones((rows, n), dtype=bool)
+        starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        first = np.flatnonzero(starts)
+        ties = np.diff(np.append(first, starts.size))
+        correction = np.bincount(
+            first // n, weights=ties * (ties - 1) * (2 * ties + 5), minlength=rows
+        )
+        return (n * (n - 1) * (2 * n + 5) - correction) / 18
+
+
+class SlopeSteadyState(SteadyStateMethod):
+    """Least squares slope of the window not significant at 5% (t test)"""
+
+    name = "slope"
+
+    def stable(self, bank, max_var):
+        windows = bank.ordered_windows()
+        n = windows.shape[1]
+        t = np.arange(n) - (n - 1) / 2
+        sxx = (t * t).sum()
+        slope = windows @ t / sxx
+        residuals = windows - windows.mean(axis=1)[:, None] - slope[:, None] * t
+        se = np.sqrt((residuals * residuals).sum(axis=1) / (n - 2) / sxx)
+        t_stat = bank.safe_divide(slope, se)
+        # a perfect line has no residuals, only a flat line is stable
+        t_stat = np.where(se == 0, np.where(slope == 0, 0, np.inf), t_stat)
+        return np.abs(t_stat) < t_critical(n - 2)
+
+
+class CusumSteadyState(SteadyStateMethod):
+    """No change point in the window by the CUSUM of deviations from the window avg
+
+    The max absolute cumulative sum scaled by std * sqrt(n) is compared to the 95%
+    quantile of its distribution for a stationary window. The quantile is the large
+    sample one, a clean linear ramp only exceeds it from 12 samples.
+    """
+
+    name = "cusum"
+    min_window = 12
+
+    def stable(self, bank, max_var):
+        windows = bank.ordered_windows()
+        n = windows.shape[1]
+        cusum = np.cumsum(windows - windows.mean(axis=1)[:, None], axis=1)
+        scale = windows.std(axis=1, ddof=1) * math.sqrt(n)
+        statistic = bank.safe_divide(np.abs(cusum).max(axis=1), scale)
+        return statistic <= cusum_critical
+
+
+# two sided quantiles of Student's t for df 1 to 30 per confidence level
+t_tables = {
+    0.95: (
+        12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+    ),
+    0.99: (
+        63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+        3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+        2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750,
+    ),
+}
+# two sided quantiles of the normal distribution per confidence level
+z_quantiles = {0.95: z_critical, 0.99: 2.575829}
+# confidence of each early stop check, the check repeats every tick so a single
+# check needs more than the 95% wanted for the stopped mean
+look_confidence = 0.99
+
+
+def t_critical(df, confidence=0.95):
+    """Two sided quantile of Student's t, confidence 0.95 or 0.99
+
+    Exact for df up to 30, rounded down for fractional df, the Cornish-Fisher
+    expansion (error < 0.002) above.
+    """
+    if df < 1:
+        return math.inf
+    table = t_tables[confidence]
+    if df <= len(table):
+        return table[int(df) - 1]
+    z = z_quantiles[confidence]
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+    )
+
+
+def effective_sample_size(values):
+    """Number of independent samples with the same variance of the mean
+
+    n / (1 + 2 * sum of the lag autocorrelations), summed up to the first lag with
+    autocorrelation <= 0, and not above the AR(1) estimate n * (1 - r) / (1 + r)
+    with the lag 1 autocorrelation r corrected for its small sample bias. Sample
+    autocorrelations of short windows are biased low, so both estimates alone
+    overstate the effective sample size of strongly correlated KPI samples.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    deviations = values - values.mean()
+    c0 = deviations @ deviations
+    if c0 == 0:
+        return float(n)
+    rho_sum = 0.0
+    for lag in range(1, n // 2):
+        rho = deviations[:-lag] @ deviations[lag:] / c0
+        if rho <= 0:
+            break
+        rho_sum += rho
+    n_eff = n / (1 + 2 * rho_sum)
+    r = deviations[:-1] @ deviations[1:] / c0
+    # Kendall's bias of the lag 1 autocorrelation is -(1 + 3 r) / n
+    r = min(0.99, r + (1 + 3 * r) / n)
+    if r > 0:
+        n_eff = min(n_eff, n * (1 - r) / (1 + r))
+    return min(float(n), n_eff)
+
+
+def mean_confidence_interval(values, confidence=0.95):
+    """Mean and half width of its confidence interval
+
+    :param values: KPI samples, oldest first.
+    :param confidence: 0.95 or 0.99.
+    :return: (mean, half width, effective sample size)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean = float(values.mean())
+    n_eff = effective_sample_size(values)
+    if len(values) < 2 or n_eff < 2:
+        return mean, math.inf, n_eff
+    std = float(values.std(ddof=1))
+    return mean, t_critical(n_eff - 1, confidence) * std / math.sqrt(n_eff), n_eff
+
+
+def precision_reached(values, precision, min_samples=30, min_effective=10):
+    """Checks if the confidence interval of the mean is narrow enough
+
+    The interval has look_confidence, so that the mean when a check every tick
+    first passes is within precision about 95% of the time.
+
+    :param values: KPI samples of the steady phase, oldest first.
+    :param precision: max half width of the interval relative to the mean, e.g. 0.01.
+    :param min_samples: samples needed before the autocorrelation is trusted.
+    :param min_effective: effective sample size needed before the interval is trusted.
+    :return: (True if reached, reason)
+    """
+    if len(values) < min_samples:
+        return False, f"{len(values)} < {min_samples} samples"
+    mean, half_width, n_eff = mean_confidence_interval(values, look_confidence)
+    if mean <= 0:
+        return False, f"mean {mean} <= 0"
+    if n_eff < min_effective:
+        return False, f"effective sample size {n_eff:.1f} < {min_effective}"
+    relative = half_width / mean
+    reason = (
+        f"mean {mean:.2f} +/- {half_width:.2f} ({look_confidence:.0%}, {relative:.2%}), "
+        f"{len(values)} samples, effective sample size {n_eff:.1f}, "
+        f"precision {precision:.2%}"
+    )
+    return relative <= precision, reason
+
+
+steady_state_methods = {
+    method.name: method
+    for method in (
+        VarianceSteadyState(),
+        CvSteadyState(),
+        MannKendallSteadyState(),
+        SlopeSteadyState(),
+        CusumSteadyState(),
+    )
+}
+
+
+def get_steady_state_method(name):
+    """Method registered as name, variance for empty or unknown names"""
+    name = (name or "variance").strip().lower()
+    if name not in steady_state_methods:
+        log.warning(f"unknown stability method {name}, using variance")
+        name = "variance"
+    return steady_state_methods[name]
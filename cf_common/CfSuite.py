@@ -0,0 +1,398 @@
+import json
+import logging
+import pathlib
+import threading
+
+import pandas as pd
+
+from cf_common.CfCheckpoint import Checkpoint, test_key
+from cf_common.CfRunTest import CfRunTest, RunData
+
+log = logging.getLogger(__name__)
+
+
+def run_enabled(test):
+    return test["run"].lower() in {"y", "yes", "true"}
+
+
+class TestStager:
+    """Prepares the next test on a background thread
+
+    CfRunTest.prepare reads the test config and queue and updates the test load on
+    the controller. The staged test uses its own temp directory so the config files of
+    the running test are not overwritten.
+    """
+
+    def __init__(
+        self,
+        cf,
+        result_file,
+        staged_dir,
+        tick_periods=None,
+        tick_policy="skip",
+        results_index=None,
+    ):
+        self.cf = cf
+        self.result_file = result_file
+        self.staged_dir = staged_dir
+        self.staged_dir.mkdir(parents=True, exist_ok=True)
+        self.tick_periods = tick_periods
+        self.tick_policy = tick_policy
+        self.results_index = results_index
+        self.test = None
+        self.thread = None
+        self.staged = None
+
+    def stage(self, test):
+        """Starts preparing test in the background"""
+        log.info(f"staging next test: {test['name']}")
+        self.test = test
+        self.staged = None
+        self.thread = threading.Thread(
+            target=self.prepare, args=(test,), name="cf_stager", daemon=True
+        )
+        self.thread.start()
+
+    def prepare(self, test):
+        rd = RunData()
+        rt = CfRunTest(
+            self.cf, rd, test, self.result_file, self.staged_dir,
+            self.tick_periods, self.tick_policy, results_index=self.results_index,
+        )
+        try:
+            prepared = rt.prepare(self.cf, rd, test)
+        except BaseException as detailed_exception:
+            # SystemExit from CfClient.exception_continue_check included
+            log.error(
+                f"Exception occurred when staging test {test['name']}: "
+                f"\n<{detailed_exception!r}>"
+            )
+            return
+        self.staged = (rt, rd, prepared)
+
+    def take(self, test):
+        """
+        Waits for the staged test.
+        :param test: test details of the test to run.
+        :return: (CfRunTest, RunData, prepare result) or None if test was not staged
+         or staging failed.
+        """
+        if self.thread is None or self.test is not test:
+            return None
+        self.thread.join()
+        staged = self.staged
+        self.thread = None
+        self.test = None
+        self.staged = None
+        if staged is not None:
+            log.info(f"using staged test: {test['name']}")
+        return staged
+
+
+class SuiteRunner:
+    """Runs the enabled tests of run_tests.csv in order
+
+    While a test winds down (rampdown, sustain or stop) the next test is prepared by
+    a TestStager, so it can start as soon as the queue is free. A test is not staged
+    while the same test id is running, staging updates the test load on the
+    controller.
+
+    :param report: IncrementalReport updated after each test, or None.
+    :param stage_next: prepare the next test while the current test winds down.
+    :param checkpoint: Checkpoint saving suite progress and the running test, or None.
+    :param results_index: ResultsIndex recording completed goal seeking tests for warm
+     start, or None.
+    """
+
+    def __init__(
+        self,
+        cf,
+        test_list,
+        result_file,
+        temp_dir,
+        report=None,
+        tick_periods=None,
+        tick_policy="skip",
+        stage_next=True,
+        checkpoint=None,
+        results_index=None,
+    ):
+        self.cf = cf
+        self.tests = [test for test in test_list if run_enabled(test)]
+        self.result_file = result_file
+        self.checkpoint = checkpoint
+        self.results_index = results_index
+        self.temp_dir = temp_dir
+        self.report = report
+        self.tick_periods = tick_periods
+        self.tick_policy = tick_policy
+        self.stager = None
+        if stage_next:
+            self.stager = TestStager(
+                cf, result_file, temp_dir / "staged", tick_periods, tick_policy,
+                results_index,
+            )
+
+    def run(self, resume=False):
+        """
+        Runs the tests in order.
+        :param resume: continue from the checkpoint, finished tests are skipped and
+         the running test is reattached.
+        """
+        tests = self.tests
+        if resume and self.checkpoint is not None and self.checkpoint.load():
+            tests = self.resume_suite()
+        elif self.checkpoint is not None:
+            self.checkpoint.start(self.result_file)
+        for index, test in enumerate(tests):
+            next_test = None
+            if index + 1 < len(tests):
+                next_test = tests[index + 1]
+            self.run_test(test, next_test)
+
+    def resume_suite(self):
+        """
+        Restores the report state and continues the test running at the checkpoint.
+        :return: tests not started yet.
+        """
+        state = self.checkpoint.state
+        if state["time_stamp"]:
+            self.result_file.time_stamp = state["time_stamp"]
+        if self.report is not None:
+            for report_file in state["report_files"]:
+                report_file = pathlib.Path(report_file)
+                if report_file.exists() and report_file != self.running_report_file():
+                    self.report.load_summary(report_file)
+        tests = [test for test in self.tests if not self.checkpoint.is_completed(test)]
+        running_key = self.checkpoint.running_key()
+        if tests and running_key is not None:
+            if test_key(tests[0]) == running_key:
+                test = tests.pop(0)
+                self.resume_test(test, tests[0] if tests else None)
+            else:
+                log.warning(f"checkpoint running test {running_key} not next in suite")
+        log.info(f"resume, remaining tests: {[t['name'] for t in tests]}")
+        return tests
+
+    def running_report_file(self):
+        running = self.checkpoint.state["running"]
+        if running is None or running["report_csv_file"] is None:
+            return None
+        return pathlib.Path(running["report_csv_file"])
+
+    def resume_test(self, test, next_test=None):
+        """
+        Reattaches to the test run saved in the checkpoint and continues control.
+        :return: True if control_test completed successfully.
+        """
+        running = self.checkpoint.state["running"]
+        print(f"\nresume test:\n{json.dumps(test, indent=4)}")
+        rd = RunData()
+        rt = CfRunTest(
+            self.cf, rd, test, self.result_file, self.temp_dir,
+            self.tick_periods, self.tick_policy, results_index=self.results_index,
+        )
+        Checkpoint.restore(rt, rd, running)
+        report_file = self.running_report_file()
+        if report_file is not None:
+            self.result_file.reopen(report_file)
+        result = False
+        if rt.resume(self.cf, rd):
+            self.set_callbacks(rt, test, next_test)
+            result = rt.control_test(
+                self.cf, rd, resume=rd.status == "running" and rd.sub_status is None
+            )
+        else:
+            log.info(f"test run {rd.id} is not active, not resuming control")
+        if result and self.results_index is not None:
+            self.results_index.record(rt, rd)
+        if self.report is not None and report_file is not None:
+            self.report.rebuild(self.result_file)
+        self.checkpoint.test_completed(test)
+        return result
+
+    def set_callbacks(self, rt, test, next_test):
+        if (
+            self.stager is not None
+            and next_test is not None
+            and next_test["id"] != test["id"]
+        ):
+            rt.on_wind_down = lambda: self.stager.stage(next_test)
+        if self.checkpoint is not None:
+            rt.on_checkpoint = lambda: self.checkpoint.test_running(test, rt)
+
+    def run_test(self, test, next_test=None):
+        """
+        Prepares (or takes the staged), starts and controls test.
+        :return: True if control_test completed successfully.
+        """
+        print(f"\ntest details:\n{json.dumps(test, indent=4)}")
+        staged = None
+        if self.stager is not None:
+            staged = self.stager.take(test)
+        if staged is not None:
+            rt, rd, prepared = staged
+        else:
+            rd = RunData()
+            rt = CfRunTest(
+                self.cf, rd, test, self.result_file, self.temp_dir,
+                self.tick_periods, self.tick_policy, results_index=self.results_index,
+            )
+            prepared = rt.prepare(self.cf, rd, test)
+        if not prepared:
+            if self.checkpoint is not None:
+                self.checkpoint.test_completed(test)
+            return False
+        self.set_callbacks(rt, test, next_test)
+        rt.start(self.cf, rd)
+        if self.checkpoint is not None:
+            self.checkpoint.test_running(test, rt, force=True)
+        result = rt.control_test(self.cf, rd)
+        if result and self.results_index is not None:
+            self.results_index.record(rt, rd)
+        # update reports with the finished test
+        if self.report is not None:
+            self.report.update(self.result_file)
+        if self.checkpoint is not None:
+            self.checkpoint.test_completed(test)
+        return result
+
+
+class ParallelSuiteRunner:
+    """Runs the tests of each controller queue concurrently
+
+    Tests are grouped by the queue of their test config, keeping run_order within a
+    queue, and each queue runs in its own thread with a SuiteRunner. Every queue
+    writes its own detailed report (file names suffixed _q1, _q2, ...) and summary
+    reports, the summaries are merged into reports without suffix at the end. An
+    exception (or SystemExit) in a queue ends only that queue, it is logged and the
+    first one is raised again after all queues finished and the reports are merged.
+
+    :param make_result_file: returns a new DetailedCsvReport or DetailedColumnarReport.
+    :param make_report: returns a new IncrementalReport, or None for no reports.
+    :param checkpoint_file: checkpoint file name, each queue saves to its own file
+     with suffix _q1, _q2, ... or None for no checkpoints.
+    :param results_index: ResultsIndex shared by all queues, or None.
+    """
+
+    def __init__(
+        self,
+        cf,
+        test_list,
+        make_result_file,
+        temp_dir,
+        make_report=None,
+        tick_periods=None,
+        tick_policy="skip",
+        stage_next=True,
+        checkpoint_file=None,
+        checkpoint_interval=20,
+        results_index=None,
+    ):
+        self.cf = cf
+        self.tests = [test for test in test_list if run_enabled(test)]
+        self.make_result_file = make_result_file
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.results_index = results_index
+        self.temp_dir = temp_dir
+        self.make_report = make_report
+        self.tick_periods = tick_periods
+        self.tick_policy = tick_policy
+        self.stage_next = stage_next
+        self.runners = []
+        # {queue id: exception that ended the queue}
+        self.failures = {}
+
+    def queue_id(self, test):
+        config = self.cf.get_test(
+            test["type"], test["id"], self.temp_dir / "queue_lookup_config.json"
+        )
+        return config["config"]["queue"]["id"]
+
+    def group_by_queue(self):
+        """
+        :return: {queue id: tests in run order}
+        """
+        queues = {}
+        for test in self.tests:
+            queues.setdefault(self.queue_id(test), []).append(test)
+        return queues
+
+    def queue_checkpoint(self, queue_num):
+        if self.checkpoint_file is None:
+            return None
+        checkpoint_file = pathlib.Path(self.checkpoint_file)
+        return Checkpoint(
+            checkpoint_file.with_name(
+                f"{checkpoint_file.stem}_q{queue_num}{checkpoint_file.suffix}"
+            ),
+            self.checkpoint_interval,
+        )
+
+    def run(self, resume=False):
+        queues = self.group_by_queue()
+        time_stamp = None
+        threads = []
+        for queue_num, (queue_id, tests) in enumerate(queues.items(), start=1):
+            log.info(f"queue {queue_num} {queue_id}: {[t['name'] for t in tests]}")
+            result_file = self.make_result_file()
+            result_file.name_suffix = f"_q{queue_num}"
+            # same time stamp in all queue report names
+            if time_stamp is None:
+                time_stamp = result_file.time_stamp
+            result_file.time_stamp = time_stamp
+            queue_dir = self.temp_dir / f"queue_{queue_num}"
+            queue_dir.mkdir(parents=True, exist_ok=True)
+            report = self.make_report() if self.make_report is not None else None
+            runner = SuiteRunner(
+                self.cf,
+                tests,
+                result_file,
+                queue_dir,
+                report,
+                self.tick_periods,
+                self.tick_policy,
+                self.stage_next,
+                self.queue_checkpoint(queue_num),
+                self.results_index,
+            )
+            self.runners.append(runner)
+            threads.append(
+                threading.Thread(
+                    target=self.run_queue,
+                    args=(runner, queue_num, queue_id, resume),
+                    name=f"cf_queue_{queue_num}",
+                )
+            )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.make_report is not None:
+            self.merge_reports(self.make_report())
+        if self.failures:
+            log.error(f"suite failed, queues: {list(self.failures)}")
+            raise next(iter(self.failures.values()))
+
+    def run_queue(self, runner, queue_num, queue_id, resume):
+        try:
+            runner.run(resume)
+        except BaseException as detailed_exception:
+            log.exception(f"queue {queue_num} {queue_id} failed: {detailed_exception!r}")
+            self.failures[queue_id] = detailed_exception
+
+    def merge_reports(self, merged_report):
+        """Writes the summaries of all queues to reports without queue suffix"""
+        summaries = {}
+        for runner in self.runners:
+            suffix = runner.result_file.name_suffix
+            for report_file, summary in runner.report.summaries.items():
+                merged_name = report_file.name.replace(f"{suffix}_Detailed", "_Detailed")
+                summaries.setdefault(report_file.with_name(merged_name), []).append(
+                    summary
+                )
+        for report_file, queue_summaries in summaries.items():
+            merged_report.write(
+                report_file, pd.concat(queue_summaries, ignore_index=True)
+            )
@@ -27,21 +27,32 @@ def verify_directory_structure(bool_project_dir, input_dir, output_dir, report_d
 
 def html_report(df_table, sub_report_tables, html_report_file, filter_columns,
                 script_version, report_header=""):
+    tables_html = [
+        html_report_table(df_table, sub_table, filter_columns)
+        for sub_table in sub_report_tables
+    ]
+    write_html_report(tables_html, html_report_file, script_version, report_header)
+
+
+def html_report_table(df_table, sub_table, filter_columns):
+    df_table.reset_df_filter()
+    df_table.filter_rows_containing(sub_table)
+    df_table.filter_columns(filter_columns)
+    # check if there are results in a table before adding it to the html file
+    if len(df_table.df_filter.index) == 0:
+        return ""
+    if sub_table is None:
+        table_filter = f"<h3>ALL TESTS - including above tests</h3>"
+    else:
+        table_filter = f"<h3>{sub_table}</h3>"
+    return table_filter + df_table.html_table(df_table.style_a())
+
+
+def write_html_report(tables_html, html_report_file, script_version, report_header=""):
     html = ""
     report_header_html = f"<h2 style='color:Tomato;'>{report_header}</h2>"
     html = html + report_header_html
-
-    for sub_table in sub_report_tables:
-        df_table.reset_df_filter()
-        df_table.filter_rows_containing(sub_table)
-        df_table.filter_columns(filter_columns)
-        # check if there are results in a table before adding it to the html file
-        if not len(df_table.df_filter.index) == 0:
-            if sub_table is None:
-                table_filter = f"<h3>ALL TESTS - including above tests</h3>"
-            else:
-                table_filter = f"<h3>{sub_table}</h3>"
-            html = html + table_filter + df_table.html_table(df_table.style_a())
+    html = html + "".join(tables_html)
 
     script_version_html = f"\n<body>" \
                           f"\n<p>Script version: {script_version}</p>" \
@@ -10,11 +10,14 @@ from cf_common.CfClient import *
 from cf_runtests.input.cf_config import *
 from cf_runtests.input.credentials import *
 from cf_common.cf_functions import *
+from cf_common.CfLogging import *
 from cf_common.CfCreateTest import *
 
 if (pathlib.Path.cwd() / "dev_settings.py").is_file():
     from cf_runtests.dev_settings import *
 
+setup_logging(log_file, log_level, log_module_levels, log_format)
+
 input_dir, output_dir, report_dir = verify_directory_structure(
     in_project_dir, input_location, output_location, report_location
 )
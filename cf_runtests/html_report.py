@@ -9,16 +9,25 @@ sys.path.append(str(project_dir))
 from cf_runtests.input.cf_config import *
 from cf_common.cf_functions import *
 from cf_common.CfRunTest import *
+from cf_common.CfLogging import *
 
 if (pathlib.Path.cwd() / "dev_settings.py").is_file():
     from cf_runtests.dev_settings import *
 
+# fork the html render processes before logging starts its thread
+render_executor = start_render_processes(html_report_processes)
+setup_logging(log_file, log_level, log_module_levels, log_format)
+
 input_dir, output_dir, report_dir = verify_directory_structure(
     in_project_dir, input_location, output_location, report_location
 )
 
 if html_report_csv is None:
-    csv_files = report_dir.glob("*Detailed.csv")
+    # csv files or parquet/feather report directories
+    csv_files = [
+        p for p in report_dir.glob("*Detailed.*")
+        if p.suffix in {".csv", ".parquet", ".feather"}
+    ]
     latest_csv_file = max(csv_files, key=lambda p: p.stat().st_mtime)
     print(latest_csv_file)
 
@@ -34,10 +43,18 @@ csv_report_file = pathlib.Path(file_path / csv_name).with_suffix(".csv")
 print(csv_report_file)
 csv_report(table, csv_report_file)
 
-# create multiple html reports
+# create multiple html reports, sub tables are filtered once for all reports
+renderer = HtmlReportRenderer(
+    report_tables, html_additional_reports, html_renderer, render_executor
+)
+tables = renderer.render(table.df_results)
+if render_executor is not None:
+    render_executor.shutdown()
 for k, v in html_additional_reports.items():
     new_name = file_name + "_" + k
     report_file = pathlib.Path(file_path / new_name).with_suffix(".html")
     print(report_file)
     print(v)
-    html_report(table, report_tables, report_file, v, script_version)
+    write_html_report(
+        [tables[(k, sub_table)] for sub_table in report_tables], report_file, script_version
+    )
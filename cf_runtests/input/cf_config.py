@@ -16,6 +16,17 @@ input_location = "input"
 output_location = "output"
 #  TLS certificate validation - False or True
 verify_ssl = False
+# script log file (cf.log in working dir)
+log_file = 'cf.log'
+log_level = 'DEBUG'
+log_module_levels = {}  # per logger levels, e.g. {'urllib3': 'INFO', 'cf_common.CfClient': 'INFO'}
+log_format = 'text'  # 'text' or 'json' one compact json object per line
+# API response log (response.log in working dir), written by a background thread
+response_log_format = 'text'  # 'text' legacy format or 'json' one compact json object per line
+response_log_max_bytes = 100 * 1024 * 1024  # rotate size, 0 disables rotation
+response_log_backup_count = 5
+response_log_compress = True  # gzip rotated files
+response_log_sample_rates = {'/statistics': 1}  # log every n-th response of matching urls, 0 never
 
 
 # create_tests.py base test ID - use working HTTP Throughput test from controller.
@@ -39,9 +50,25 @@ delete_tests_csv = create_tests_output_list_csv  # csv file with tests to delete
 
 # run_tests.py
 run_tests_from_csv = 'run_tests.csv'  # from Global_settings input_location
+# control loop tick period in seconds per phase, 'default' is used for phases not listed
+# phases: wait_running, wait_traffic, wait_activity, control, openconn_cps_end, sustain, stop
+tick_periods = {'default': 4}
+tick_policy = 'skip'  # 'skip' drops ticks missed by a slow tick, 'catch_up' runs them back to back
+run_queues_in_parallel = False  # run tests of different controller queues at the same time
+stage_next_test = True  # prepare the next test while the current test is in rampdown, sustain or stop
+detailed_report_format = 'csv'  # 'csv', or 'parquet' / 'feather' (requires pyarrow)
+client_metrics_file = 'client_metrics.json'  # per endpoint api metrics, in output sub directory, None to disable
+checkpoint_file = 'checkpoint.json'  # suite progress for run_tests.py --resume, in output sub directory, None to disable
+checkpoint_interval = 20  # min seconds between checkpoints of the running test
+results_index_file = 'results_index.json'  # final loads of goal seek tests for the warm_start column, in output sub directory, None to disable
+# more /statistics counters copied to RunData each tick: (side, type, subType, RunData field, transform), e.g.
+# ('server', 'http', 'txnsPerSec', 's_http_txns_sec', None), transform None, 'round1', 'round3' or 'int'
+extra_run_stats = []
 
 # html_report.py and report portion of run_test.py
 html_report_csv = None  # If None take latest csv file from Report directory
+html_renderer = 'styler'  # 'styler' pandas Styler or 'template' faster plain template for large tables
+html_report_processes = 1  # render html tables in a process pool when > 1 (Linux/macOS fork only)
 report_tables = ['HTTP-CPS', 'HTTP-TPUT', 'TLS-CPS', 'TLS-TPUT', 'HTTP-LAT', 'TLS-LAT', 'HTTP-CON', 'TLS-CON', None]
 col_order = ['test_name', 'cps', 'tps', 'total_bandwidth', 'open_conns',
              'tcp_avg_tt_synack', 'tcp_avg_ttfb', 'avg_pkt_size', 'url_response_time',
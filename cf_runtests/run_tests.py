@@ -9,17 +9,33 @@ sys.path.append(str(project_dir))
 from cf_runtests.input.cf_config import *
 from cf_runtests.input.credentials import *
 from cf_common.cf_functions import *
+from cf_common.CfLogging import *
 from cf_common.CfClient import *
+from cf_common.CfResponseLog import *
 from cf_common.CfRunTest import *
+from cf_common.CfRunStats import *
+from cf_common.CfResultsIndex import *
+from cf_common.CfSuite import *
 
 if (pathlib.Path.cwd() / "dev_settings.py").is_file():
     from cf_runtests.dev_settings import *
 
+# fork the html render processes before logging and the client start threads
+render_executor = start_render_processes(html_report_processes)
+setup_logging(log_file, log_level, log_module_levels, log_format)
+
 input_dir, output_dir, report_dir = verify_directory_structure(
     in_project_dir, input_location, output_location, report_location
 )
 
-cf = CfClient(cf_controller_address, username, password, verify_ssl)
+response_log = ResponseLogWriter(
+    log_format=response_log_format,
+    max_bytes=response_log_max_bytes,
+    backup_count=response_log_backup_count,
+    compress=response_log_compress,
+    sample_rates=response_log_sample_rates,
+)
+cf = CfClient(cf_controller_address, username, password, verify_ssl, response_log)
 cf.connect()
 
 tests_to_run = input_dir / run_tests_from_csv
@@ -30,38 +46,80 @@ with open(tests_to_run, "r") as f:
 test_list = sorted(test_list, key=lambda k: int(k["run_order"]))
 log.debug(f"test list:\n{test_list}")
 
+# --resume continues the suite from the checkpoint of an interrupted run
+resume = "--resume" in sys.argv
+if resume:
+    sys.argv.remove("--resume")
+
 report_header = ""
 if len(sys.argv) >1:
     report_header = " ".join(sys.argv[1:])
     print(f"User defined report header: {report_header}")
-detailed_report = DetailedCsvReport(report_dir)
-
-for test in test_list:
-    if test["run"].lower() in {"y", "yes", "true"}:
-        print(f"\ntest details:\n{json.dumps(test, indent=4)}")
-        # rt = CfRunTest(cf, test, detailed_report, output_dir)
-        # if rt is not False:
-        #     rt.control_test()
-        rd = RunData()
-        rt = CfRunTest(cf, rd, test, detailed_report, output_dir)
-        if rt is not False:
-            if not rt.init_sequence(cf, rd, test):
-                continue
-            rt.control_test(cf, rd)
-        # create reports
-        table = Report(detailed_report.report_csv_file, col_order)
-        file_name = detailed_report.report_csv_file.stem
-        file_path = detailed_report.report_csv_file.parent
-        if file_name.endswith("_Detailed"):
-            file_name = file_name[: -len("_Detailed")]
-        # create summary csv report with all columns
-        csv_name = file_name + "_all"
-        csv_report_file = pathlib.Path(file_path / f"{csv_name}.csv")
-        print(csv_report_file)
-        csv_report(table, csv_report_file)
-        # create html report files
-        for k, v in html_additional_reports.items():
-            new_name = file_name + "_" + k
-            report_file = pathlib.Path(file_path / f"{new_name}.html")
-            print(report_file)
-            html_report(table, report_tables, report_file, v, script_version, report_header)
+
+
+if extra_run_stats:
+    CfRunTest.stats_extractor = StatsExtractor(run_stats_schema + tuple(extra_run_stats))
+
+results_index = None
+if results_index_file:
+    results_index = ResultsIndex(output_dir / results_index_file)
+
+
+def make_detailed_report():
+    if detailed_report_format == "csv":
+        return DetailedCsvReport(report_dir)
+    return DetailedColumnarReport(report_dir, detailed_report_format)
+
+
+def make_incremental_report():
+    return IncrementalReport(
+        col_order,
+        report_tables,
+        html_additional_reports,
+        script_version,
+        report_header,
+        html_renderer,
+        render_executor,
+    )
+
+
+if run_queues_in_parallel:
+    suite = ParallelSuiteRunner(
+        cf,
+        test_list,
+        make_detailed_report,
+        output_dir,
+        make_incremental_report,
+        tick_periods,
+        tick_policy,
+        stage_next_test,
+        output_dir / checkpoint_file if checkpoint_file else None,
+        checkpoint_interval,
+        results_index,
+    )
+    suite.run(resume)
+else:
+    checkpoint = None
+    if checkpoint_file:
+        checkpoint = Checkpoint(output_dir / checkpoint_file, checkpoint_interval)
+    incremental_report = make_incremental_report()
+    suite = SuiteRunner(
+        cf,
+        test_list,
+        make_detailed_report(),
+        output_dir,
+        incremental_report,
+        tick_periods,
+        tick_policy,
+        stage_next_test,
+        checkpoint,
+        results_index,
+    )
+    suite.run(resume)
+
+if client_metrics_file:
+    with open(output_dir / client_metrics_file, "w") as f:
+        json.dump(cf.metrics(), f, indent=4)
+response_log.close()
+if render_executor is not None:
+    render_executor.shutdown()
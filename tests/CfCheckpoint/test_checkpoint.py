@@ -0,0 +1,115 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cf_common.CfCheckpoint import Checkpoint
+from cf_common.CfRunTest import *
+
+
+def running_test(tmp_path, kpi_1="cps"):
+    rd = RunData()
+    rd.in_kpi_1 = kpi_1
+    rd.variance_sample_size = 4
+    result_file = SimpleNamespace(report_csv_file=tmp_path / "a_Detailed.csv")
+    rt = CfRunTest(None, rd, {"id": "1", "name": "a"}, result_file, tmp_path)
+    rt.init_rolling_stats(rd)
+    rt.check_kpi(rd)
+    for i in range(6):
+        rd.c_http_successful_txns_sec = 1000 + 10 * i
+        rd.c_tcp_established_conn_rate = np.int64(500 + i)
+        rt.update_rolling_averages(rd)
+    rd.phase = "steady"
+    rd.start_time = 1000.5
+    rt.report_dir = "model_profile"
+    rt.ocj.tracker.record(1001.25, SimpleNamespace(
+        c_desired_load=10, c_current_load=10, c_memory_main_used=500,
+        s_memory_main_used=400, c_tcp_established_conn_rate=2,
+    ))
+    return rt, rd
+
+
+def test_rolling_stats_bank_state_round_trip():
+    bank = RollingStatsBank(3)
+    tps = bank.add("tps", 0)
+    bank.add("ttfb", 1)
+    for values in ([100, 1.5], [120, 2.5], [130, 2.0], [90, 1.0]):
+        bank.update(values)
+        bank.check_if_stable(np.array([0.03, 0.03]))
+    state = json.loads(json.dumps(bank.state()))
+
+    restored = RollingStatsBank(3)
+    restored_tps = restored.add("tps", 0)
+    restored.add("ttfb", 1)
+    restored.load_state(state)
+    for key in RollingStatsBank.state_arrays:
+        assert getattr(restored, key).dtype == getattr(bank, key).dtype
+        assert np.array_equal(getattr(restored, key), getattr(bank, key))
+    assert restored_tps.list == tps.list
+    bank.update([95, 1.0])
+    restored.update([95, 1.0])
+    assert restored_tps.avg_val == tps.avg_val
+
+    with pytest.raises(ValueError):
+        RollingStatsBank(4).load_state(state)
+
+
+def test_checkpoint_restores_running_test(tmp_path):
+    rt, rd = running_test(tmp_path)
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    checkpoint.test_running({"run_order": "1", "id": "1", "name": "a"}, rt, force=True)
+
+    loaded = Checkpoint(tmp_path / "checkpoint.json")
+    assert loaded.load()
+    assert loaded.running_key() == "1|1|a"
+    assert loaded.state["report_files"] == [str(tmp_path / "a_Detailed.csv")]
+    rd_new = RunData()
+    rt_new = CfRunTest(None, rd_new, {}, None, tmp_path)
+    Checkpoint.restore(rt_new, rd_new, loaded.state["running"])
+
+    assert rd_new.phase == "steady"
+    assert rd_new.start_time == 1000.5
+    assert rd_new.kpi_1 is rd_new.rolling_cps
+    assert rd_new.rolling_tps.list == rd.rolling_tps.list
+    assert rd_new.rolling_cps.stable == rd.rolling_cps.stable
+    assert rt_new.report_dir == "model_profile"
+    assert rt_new.test == {"id": "1", "name": "a"}
+    assert rt_new.ocj.tracker.last() == rt.ocj.tracker.last()
+    assert rt_new.ocj.tracker.column("load").tolist() == [10]
+    # control continues with the same rolling windows
+    rt.update_rolling_averages(rd)
+    rt_new.update_rolling_averages(rd_new)
+    assert rd_new.rolling_tps.avg_val == rd.rolling_tps.avg_val
+    assert rd_new.rolling_tps.variance == rd.rolling_tps.variance
+
+
+def test_checkpoint_rate_limit_and_completed(tmp_path):
+    rt, rd = running_test(tmp_path)
+    test = {"run_order": "1", "id": "1", "name": "a"}
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json", interval=3600)
+    checkpoint.test_running(test, rt, force=True)
+    rd.phase = "rampdown"
+    checkpoint.test_running(test, rt)
+    loaded = Checkpoint(tmp_path / "checkpoint.json")
+    loaded.load()
+    assert loaded.state["running"]["run_data"]["phase"] == "steady"
+
+    checkpoint.test_completed(test)
+    loaded.load()
+    assert loaded.state["running"] is None
+    assert loaded.is_completed(test)
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+
+
+@pytest.mark.skipif(pa is None, reason="requires pyarrow")
+def test_checkpoint_flushes_columnar_report(tmp_path):
+    rt, rd = running_test(tmp_path)
+    rt.result_file = DetailedColumnarReport(tmp_path)
+    rt.result_file.make_report_dir("model_profile")
+    rt.result_file.make_report_csv_file("a")
+    rt.result_file.append_file([None] * len(rt.result_file.columns))
+    test = {"run_order": "1", "id": "1", "name": "a"}
+    Checkpoint(tmp_path / "checkpoint.json").test_running(test, rt, force=True)
+    assert rt.result_file.rows == 0
+    assert len(load_detailed_report(rt.result_file.report_csv_file).index) == 1
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cf_common.CfAsyncClient import *
+from cf_common.CfResponseLog import ResponseLogWriter
+
+token = "stub-token"
+
+
+class StubController:
+    """Local CyberFlood controller stub with the endpoints used by AsyncCfClient"""
+
+    def __init__(self):
+        self.loads = {}
+        self.status_failures = 0
+        self.requests = []
+        self.app = web.Application(middlewares=[self.record])
+        api = "/api/v2"
+        self.app.router.add_post(api + "/token", self.token)
+        self.app.router.add_get(api + "/tests/{type}/{id}", self.get_test)
+        self.app.router.add_post(api + "/tests/{type}/", self.post_test)
+        self.app.router.add_put(api + "/tests/{id}/start", self.start_test)
+        self.app.router.add_put(api + "/tests/{type}/{id}", self.update_test)
+        self.app.router.add_get(api + "/queues/{id}", self.get_queue)
+        self.app.router.add_get(api + "/test_runs/{id}", self.get_test_run)
+        self.app.router.add_get(api + "/test_runs/{id}/statistics", self.statistics)
+        self.app.router.add_get(api + "/test_runs/{id}/eventlogs", self.event_logs)
+        self.app.router.add_put(api + "/test_runs/{id}/stop", self.stop_test)
+        self.app.router.add_put(api + "/test_runs/{id}/changeload", self.change_load)
+
+    @web.middleware
+    async def record(self, request, handler):
+        self.requests.append((request.method, request.path))
+        if request.path != "/api/v2/token":
+            if request.headers.get("Authorization") != "Bearer " + token:
+                return web.json_response({"message": "unauthorized"}, status=401)
+        return await handler(request)
+
+    async def token(self, request):
+        data = await request.post()
+        if data["password"] != "password":
+            return web.json_response({"message": "bad credentials"}, status=401)
+        return web.json_response({"token": token})
+
+    async def get_test(self, request):
+        return web.json_response({"id": request.match_info["id"], "config": {}})
+
+    async def post_test(self, request):
+        body = await request.json()
+        return web.json_response({"id": "new", "name": body["name"]})
+
+    async def update_test(self, request):
+        body = await request.json()
+        return web.json_response({"id": request.match_info["id"], **body})
+
+    async def start_test(self, request):
+        return web.json_response({"id": "run-" + request.match_info["id"]})
+
+    async def get_queue(self, request):
+        return web.json_response({"id": request.match_info["id"], "capacity": 60})
+
+    async def get_test_run(self, request):
+        if self.status_failures > 0:
+            self.status_failures -= 1
+            return web.json_response({"message": "busy"}, status=503)
+        return web.json_response({"id": request.match_info["id"], "status": "running"})
+
+    async def statistics(self, request):
+        load = self.loads.get(request.match_info["id"], 0)
+        return web.json_response({"client": [
+            {"type": "sum", "subType": "currentLoadSpecCount", "value": load}
+        ], "server": []})
+
+    async def event_logs(self, request):
+        return web.json_response({"logs": ["started"]})
+
+    async def stop_test(self, request):
+        return web.json_response({"id": request.match_info["id"], "status": "stopping"})
+
+    async def change_load(self, request):
+        data = await request.post()
+        self.loads[request.match_info["id"]] = int(data["load"])
+        return web.json_response({"load": int(data["load"])})
+
+
+def run_with_stub(test_coroutine, tmp_path):
+    response_log = ResponseLogWriter(tmp_path / "response.log")
+
+    async def runner():
+        stub = StubController()
+        server = TestServer(stub.app)
+        await server.start_server()
+        client = AsyncCfClient(
+            "127.0.0.1", "user@company.com", "password", False, response_log
+        )
+        client.api = str(server.make_url("/api/v2"))
+        try:
+            return await test_coroutine(stub, client)
+        finally:
+            await client.close()
+            await server.close()
+
+    try:
+        return asyncio.run(runner())
+    finally:
+        response_log.close()
+
+
+def test_async_client_api(tmp_path):
+    async def scenario(stub, client):
+        await client.connect()
+        test = await client.get_test("http_throughput", "abc", tmp_path / "test.json")
+        assert test["id"] == "abc"
+        assert json.loads((tmp_path / "test.json").read_text())["id"] == "abc"
+        (tmp_path / "new.json").write_text(json.dumps({"name": "T01"}))
+        assert (await client.post_test("http_throughput", tmp_path / "new.json"))["name"] == "T01"
+        updated = await client.update_test("http_throughput", "abc", tmp_path / "new.json")
+        assert updated["name"] == "T01"
+        assert (await client.get_queue("q1"))["capacity"] == 60
+        run = await client.start_test("abc")
+        assert (await client.get_test_run(run["id"]))["status"] == "running"
+        await client.change_load(run["id"], 120)
+        stats = await client.fetch_test_run_statistics(run["id"])
+        assert stats["client"][0]["value"] == 120
+        assert (await client.fetch_event_logs(run["id"]))["logs"] == ["started"]
+        assert (await client.stop_test(run["id"]))["status"] == "stopping"
+        assert client.exception_state
+
+    run_with_stub(scenario, tmp_path)
+
+
+def test_async_client_concurrent_runs(tmp_path):
+    async def scenario(stub, client):
+        await client.connect()
+        run_ids = [f"run{i}" for i in range(10)]
+        await asyncio.gather(*(client.change_load(r, i) for i, r in enumerate(run_ids)))
+        stats = await asyncio.gather(
+            *(client.fetch_test_run_statistics(r) for r in run_ids)
+        )
+        assert [s["client"][0]["value"] for s in stats] == list(range(10))
+
+    run_with_stub(scenario, tmp_path)
+
+
+def test_async_client_retries_status_forcelist(tmp_path):
+    async def scenario(stub, client):
+        await client.connect()
+        client.retry_backoff_factor = 0
+        stub.status_failures = 2
+        response = await client.get_test_run("run1")
+        assert response["status"] == "running"
+        assert stub.requests.count(("GET", "/api/v2/test_runs/run1")) == 3
+
+    run_with_stub(scenario, tmp_path)
+
+
+def test_async_client_exits_on_error(tmp_path):
+    async def scenario(stub, client):
+        client.password = "wrong"
+        with pytest.raises(SystemExit):
+            await client.connect()
+        assert client.exception_state is False
+
+    run_with_stub(scenario, tmp_path)
@@ -0,0 +1,54 @@
+import responses
+
+from cf_common.CfClient import *
+from cf_common.CfResponseLog import ResponseLogWriter
+
+controller = "10.8.100.16"
+run_id = "14a6ce4514a420a92d9beb36c7bb0a03"
+
+
+@responses.activate
+def test_fetch_test_run_snapshot(tmp_path):
+    url = f"https://{controller}/api/v2/test_runs/{run_id}"
+    status = {"id": run_id, "status": "running", "timeElapsed": 40}
+    stats = {"client": [{"type": "sum", "subType": "successfulTxns", "value": 10}],
+             "server": []}
+    responses.add(responses.GET, url, json=status, status=200)
+    responses.add(responses.GET, url + "/statistics", json=stats, status=200)
+
+    cf = CfClient(
+        controller, "user", "password", False, ResponseLogWriter(tmp_path / "response.log")
+    )
+    snapshot = cf.fetch_test_run_snapshot(run_id)
+
+    assert snapshot.test_run == status
+    assert snapshot.statistics == stats
+    assert cf.exception_state
+
+
+@responses.activate
+def test_metrics_per_endpoint(tmp_path):
+    url = f"https://{controller}/api/v2/test_runs/{run_id}"
+    responses.add(responses.GET, url, json={"status": "running"}, status=200)
+    responses.add(responses.PUT, url + "/changeload", json={"error": "x"}, status=422)
+
+    cf = CfClient(
+        controller, "user", "password", False, ResponseLogWriter(tmp_path / "response.log")
+    )
+    cf.get_test_run(run_id)
+    cf.get_test_run(run_id)
+    try:
+        cf.change_load(run_id, 100)
+    except SystemExit:
+        pass
+    metrics = cf.metrics()
+
+    run = metrics["GET /test_runs/{id}"]
+    assert run["count"] == 2
+    assert run["errors"] == 0
+    assert run["status_codes"] == {"200": 2}
+    assert sum(run["latency"]["histogram"].values()) == 2
+    assert run["response_bytes"]["total"] > 0
+    change = metrics["PUT /test_runs/{id}/changeload"]
+    assert change["count"] == 1
+    assert change["errors"] == 1
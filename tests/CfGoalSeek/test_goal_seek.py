@@ -0,0 +1,185 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from cf_common.CfGoalSeek import *
+from cf_common.CfRunTest import CfOpenConns, RunData
+from cf_common.CfSimulator import DutModel, simulate_run, simulated_test
+
+
+def bisection_rd(max_load):
+    rd = RunData()
+    rd.in_incr_high = 10
+    rd.in_capacity_adjust = 1
+    rd.in_threshold_high = 100000
+    rd.kpi_1 = SimpleNamespace(stable=True)
+    rd.c_desired_load = 1000
+    return rd, max_load
+
+
+def test_get_goal_seek_strategy():
+    assert get_goal_seek_strategy(None).name == "step"
+    assert get_goal_seek_strategy(" Bisection ").name == "bisection"
+    assert get_goal_seek_strategy("unknown").name == "step"
+
+
+def test_bisection_probes_then_bisects():
+    rd, max_load = bisection_rd(max_load=23456)
+    strategy = BisectionGoalSeek()
+    loads = []
+    while True:
+        # DUT sustains loads up to max_load
+        rd.c_current_desired_load_variance = 1.0 if rd.c_desired_load <= max_load else 0.8
+        new_load = strategy.next_load(None, rd)
+        if new_load is False:
+            break
+        loads.append(new_load)
+        rd.c_desired_load = new_load
+    assert loads[:5] == [2000, 4000, 8000, 16000, 32000]
+    assert len(loads) < 20
+    assert max_load - 10 <= rd.c_desired_load <= max_load
+    assert rd.goal_seek_converged
+
+
+def test_bisection_unstable_kpi_is_unstable_load():
+    rd, _ = bisection_rd(max_load=0)
+    rd.c_current_desired_load_variance = 1.0
+    rd.kpi_1 = SimpleNamespace(stable=False)
+    assert BisectionGoalSeek().next_load(None, rd) == 500
+    assert rd.goal_seek_unstable_load == 1000
+
+
+def test_bisection_reaches_max_load_with_fewer_seeks():
+    test = dict(
+        simulated_test,
+        load_type="connections/second",
+        start_load="1000",
+        incr_low="1000",
+        incr_med="500",
+        incr_high="100",
+        low_threshold="5000",
+        med_threshold="10000",
+        high_threshold="40000",
+    )
+    step = simulate_run(dict(test, goal_seek_strategy="step"), DutModel(seed=3))
+    bisection = simulate_run(dict(test, goal_seek_strategy="bisection"), DutModel(seed=3))
+    assert bisection.completed
+    assert bisection.goal_seek_count < step.goal_seek_count / 2
+    # current load reaches 97% of desired up to about 0.6 * capacity
+    assert 0.5 * 20000 < bisection.steady_load < 0.65 * 20000
+
+
+def test_latency_above_ceiling_is_unstable_load():
+    rd, _ = bisection_rd(max_load=0)
+    rd.in_latency_ceiling = 5.0
+    rd.c_current_desired_load_variance = 1.0
+    rd.latency_kpi = SimpleNamespace(avg_val=4.0)
+    rt = SimpleNamespace(check_if_load_type_default=lambda rd: False)
+    strategy = LatencyGoalSeek()
+    # no max load for SimUsers load types
+    rd.in_threshold_high = 1000
+    assert strategy.next_load(rt, rd) == 2000
+    rd.c_desired_load = 2000
+    rd.latency_kpi = SimpleNamespace(avg_val=6.0)
+    assert strategy.next_load(rt, rd) == 1500
+    assert (rd.goal_seek_stable_load, rd.goal_seek_unstable_load) == (1000, 2000)
+
+
+def test_latency_ceiling_limits_steady_load():
+    test = dict(simulated_test, latency_ceiling="5")
+    unconstrained = simulate_run(dict(simulated_test), DutModel(seed=2))
+    latency = simulate_run(test, DutModel(seed=2))
+    assert latency.completed
+    assert latency.steady_load < unconstrained.steady_load
+    steady = latency.rows[latency.rows["state"] == "steady"]
+    assert steady["tcp_avg_ttfb"].mean() <= 5
+
+
+def test_knee_fit_recovers_saturation_curve():
+    dut = DutModel(capacity=10000, gain=50, sharpness=2, noise=0)
+    points = [[load, dut.throughput(load)] for load in (20, 40, 80, 160, 320)]
+    fit_max, fit_scale, fit_sharpness = KneeGoalSeek.fit(points)
+    assert abs(fit_max - 10000) < 100
+    assert abs(fit_scale - 200) < 5
+    assert fit_sharpness == 2
+    assert KneeGoalSeek.fit(points[:1]) is None
+
+
+def test_knee_jumps_to_knee_with_few_seeks():
+    step = simulate_run(dict(simulated_test), DutModel(seed=1))
+    knee = simulate_run(dict(simulated_test, goal_seek_strategy="knee"), DutModel(seed=1))
+    assert knee.completed
+    assert knee.goal_seek_count < step.goal_seek_count / 2
+    last = knee.rows.iloc[-1]
+    assert abs(last["fit_max"] - 20000) < 1000
+    # 90% of fit_max at the knee
+    assert 0.8 * 20000 < knee.steady_tps < 0.95 * 20000
+    assert last["knee_load"] > 0
+
+
+def test_open_conns_memory_model_skips_unsettled_load():
+    ocj = CfOpenConns(None)
+
+    def tick(t, load, memory):
+        ocj.tracker.record(t, SimpleNamespace(
+            c_desired_load=load, c_current_load=load, c_memory_main_used=memory,
+            s_memory_main_used=0, c_tcp_established_conn_rate=0,
+        ))
+
+    for t, (load, memory) in enumerate(
+        # memory still rising at the latest load
+        [(1000, 12000), (2000, 14000), (4000, 18000), (8000, 20000), (8000, 23000)]
+    ):
+        tick(t, load, memory)
+    intercept, slope = ocj.memory_model("memory", 100000)
+    assert (round(intercept), round(slope, 3)) == (10000, 2.0)
+    assert ocj.predict_load("memory", 100000, 0.5) == 20000
+    assert ocj.predict_load("server_memory", 100000, 0.5) is None
+    tick(5, 8000, 26000)
+    tick(6, 8000, 26000)
+    assert ocj.predict_load("memory", 100000, 0.5) == 20000
+
+
+def test_open_conns_without_memory_model_bounds_load_by_memory():
+    rd = RunData()
+    rd.rolling_conns = SimpleNamespace(increase_avg=1000)
+    rd.c_current_desired_load_variance = 1.0
+    rd.in_incr_high, rd.in_capacity_adjust = 1000, 1
+    rd.c_memory_main_size = rd.s_memory_main_size = 4_000_000
+    ocj = CfOpenConns(SimpleNamespace(rd=rd))
+    rng = np.random.default_rng(1)
+    # close loads, memory jitter decides the sign of the slope
+    for t, load in enumerate([1_200_000, 1_200_000, 1_200_008, 1_200_008]):
+        rd.c_current_load = rd.c_desired_load = load
+        rd.c_memory_main_used = int(0.65 * 4_000_000 + rng.uniform(-250_000, 250_000))
+        rd.s_memory_main_used = int(0.5 * 4_000_000)
+        rd.c_memory_percent_used = 100 * rd.c_memory_main_used / rd.c_memory_main_size
+        ocj.tracker.record(t, rd)
+    assert ocj.memory_model("memory", rd.c_memory_main_size) is None
+    new_load = ocj.get_new_load()
+    assert rd.c_current_load < new_load
+    # memory per load including the base memory, never above the memory target
+    per_load = rd.c_memory_main_used / rd.c_current_load
+    assert new_load * per_load <= CfOpenConns.memory_target * rd.c_memory_main_size
+    # no model and server memory at its target, stop
+    rd.s_memory_main_used = int(0.96 * 4_000_000)
+    ocj.changed_load_highest = 0
+    assert ocj.get_new_load() is False
+
+
+def test_open_conns_memory_model_reaches_memory_target_with_few_seeks():
+    test = dict(
+        simulated_test,
+        type="open_connections",
+        load_type="connections",
+        start_load="10000",
+        incr_high="1000",
+    )
+    run = simulate_run(test, DutModel(seed=1))
+    assert run.completed
+    assert run.max_load_reached
+    assert run.goal_seek_count <= 8
+    steady = run.rows[run.rows["state"] == "steady"]
+    # server memory, the same as the client memory here, limits the load
+    assert (0.9 * 100 < steady["client_mem"]).all()
+    assert (steady["client_mem"] <= CfOpenConns.server_memory_target * 100).all()
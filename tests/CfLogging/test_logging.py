@@ -0,0 +1,35 @@
+import json
+import logging
+
+from cf_common.CfLogging import *
+
+
+class CountingJson(LazyJson):
+    __slots__ = ()
+    dumps = 0
+
+    def __str__(self):
+        CountingJson.dumps += 1
+        return super().__str__()
+
+
+def test_lazy_json_not_serialized_when_level_disabled(tmp_path):
+    setup_logging(tmp_path / "cf.log", "DEBUG", {"cf_test.quiet": "INFO"})
+    CountingJson.dumps = 0
+    logging.getLogger("cf_test.quiet").debug("payload %s", CountingJson({"a": 1}))
+    logging.getLogger("cf_test.quiet").info("payload %s", CountingJson({"b": 2}))
+    stop_logging()
+
+    assert CountingJson.dumps == 1
+    assert '"b": 2' in (tmp_path / "cf.log").read_text()
+
+
+def test_json_lines_format(tmp_path):
+    setup_logging(tmp_path / "cf.log", "DEBUG", log_format="json")
+    logging.getLogger("cf_test").info("queue info: %s", LazyJson({"id": 1}, indent=None))
+    stop_logging()
+
+    entry = json.loads((tmp_path / "cf.log").read_text())
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "cf_test"
+    assert entry["msg"] == 'queue info: {"id": 1}'
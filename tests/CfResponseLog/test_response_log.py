@@ -0,0 +1,67 @@
+import gzip
+import json
+
+import pytest
+
+from cf_common.CfResponseLog import *
+
+
+def test_text_format_matches_legacy(tmp_path):
+    file_name = tmp_path / "response.log"
+    writer = ResponseLogWriter(file_name)
+    writer.create({"token": "abc"})
+    writer.append("get", 200, "https://cf/api/v2/test_runs/1", {"status": "running"})
+    writer.close()
+
+    assert file_name.read_text() == (
+        "{'token': 'abc'}\nget 200 https://cf/api/v2/test_runs/1\n{'status': 'running'}"
+    )
+
+
+def test_json_format_sampling(tmp_path):
+    file_name = tmp_path / "response.log"
+    writer = ResponseLogWriter(
+        file_name, log_format="json", sample_rates={"/statistics": 3}
+    )
+    for i in range(7):
+        writer.append("get", 200, "https://cf/api/v2/test_runs/1/statistics", {"i": i})
+    writer.append("put", 200, "https://cf/api/v2/test_runs/1/changeload", {"load": 5})
+    writer.close()
+
+    records = [json.loads(line) for line in file_name.read_text().splitlines()]
+    assert [r["response"] for r in records] == [{"i": 0}, {"i": 3}, {"i": 6}, {"load": 5}]
+    assert records[-1]["method"] == "put"
+    assert writer.sampled_out == 4
+
+
+def test_sample_rate_zero_never_logs(tmp_path):
+    file_name = tmp_path / "response.log"
+    writer = ResponseLogWriter(file_name, sample_rates={"/statistics": 0})
+    for i in range(3):
+        writer.append("get", 200, "https://cf/api/v2/test_runs/1/statistics", {"i": i})
+    writer.append("put", 200, "https://cf/api/v2/test_runs/1/changeload", {"load": 5})
+    writer.close()
+
+    assert "statistics" not in file_name.read_text()
+    assert writer.sampled_out == 3
+    for rate in (-1, 2.5, "10"):
+        with pytest.raises(ValueError):
+            ResponseLogWriter(tmp_path / "bad.log", sample_rates={"/statistics": rate})
+
+
+def test_rotation_with_gzip(tmp_path):
+    file_name = tmp_path / "response.log"
+    writer = ResponseLogWriter(
+        str(file_name), log_format="json", max_bytes=200, backup_count=2, compress=True
+    )
+    for i in range(20):
+        writer.append("get", 200, "https://cf/api/v2/test_runs/1", {"i": i, "x": "y" * 50})
+    writer.close()
+
+    assert (tmp_path / "response.log.1.gz").is_file()
+    assert (tmp_path / "response.log.2.gz").is_file()
+    assert not (tmp_path / "response.log.3.gz").exists()
+    with gzip.open(tmp_path / "response.log.1.gz", "rt") as f:
+        rotated = [json.loads(line)["response"]["i"] for line in f]
+    current = [json.loads(line)["response"]["i"] for line in file_name.read_text().splitlines()]
+    assert rotated[-1] + 1 == (current[0] if current else 20)
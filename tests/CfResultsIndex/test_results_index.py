@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from cf_common.CfResultsIndex import ResultsIndex
+from cf_common.CfRunTest import RunData
+from cf_common.CfSimulator import DutModel, simulate_run, simulated_test
+
+
+def device(software_version="5.8.0.0"):
+    return SimpleNamespace(
+        device_model="SIM-100G", device_profile="Simulated", software_version=software_version
+    )
+
+
+def recorded_rd(final_load=240):
+    rd = RunData()
+    rd.in_name = "a"
+    rd.in_goal_seek = True
+    rd.in_load_type = "SimUsers"
+    rd.final_load = final_load
+    rd.rolling_current_load = SimpleNamespace(highest_value=250)
+    return rd
+
+
+def test_record_and_warm_start(tmp_path):
+    index = ResultsIndex(tmp_path / "results_index.json")
+    index.record(device(), recorded_rd())
+    loaded = ResultsIndex(tmp_path / "results_index.json")
+    assert loaded.lookup(device(), recorded_rd())["max_load"] == 250
+    assert loaded.lookup(device("5.9.0.0"), recorded_rd()) is None
+
+    rd = recorded_rd()
+    rd.in_start_load = 7
+    rd.in_capacity_adjust = 1
+    rd.in_incr_low, rd.in_incr_med, rd.in_incr_high = 50, 20, 4
+    assert loaded.warm_start(device(), rd)
+    assert rd.in_start_load == 216
+    # 3 steps from 216 to 240
+    assert (rd.in_incr_low, rd.in_incr_med, rd.in_incr_high) == (8, 8, 4)
+
+
+def test_no_record_without_goal_seek(tmp_path):
+    index = ResultsIndex(tmp_path / "results_index.json")
+    rd = recorded_rd()
+    rd.in_goal_seek = False
+    index.record(device(), rd)
+    assert index.records == {}
+
+
+def test_warm_start_converges_with_fewer_seeks(tmp_path):
+    index = ResultsIndex(tmp_path / "results_index.json")
+    cold = simulate_run(dict(simulated_test), DutModel(seed=1), results_index=index)
+    warm = simulate_run(
+        dict(simulated_test, warm_start="Y"), DutModel(seed=1), results_index=index
+    )
+    assert warm.completed
+    assert warm.goal_seek_count < cold.goal_seek_count / 2
+    assert warm.seconds < cold.seconds
+    assert abs(warm.steady_tps - cold.steady_tps) < 0.05 * cold.steady_tps
+
+
+def test_no_record_of_goal_seek_timeout(tmp_path):
+    index = ResultsIndex(tmp_path / "results_index.json")
+    # goal seek is still increasing the load when time remaining drops below 30s
+    run = simulate_run(dict(simulated_test, duration="120"), DutModel(seed=1), results_index=index)
+    assert run.completed
+    assert not run.max_load_reached
+    assert index.records == {}
@@ -0,0 +1,49 @@
+import pytest
+
+from cf_common.CfRunStats import *
+from cf_common.CfRunTest import RunData
+
+run_stats = {
+    "client": [
+        {"type": "driver", "subType": "rxBandwidth", "value": 568106},
+        {"type": "driver", "subType": "rxBandwidth@10.109.61.182/1/1", "value": 1},
+        {"type": "loadspec", "subType": "cpuUtilized", "value": 69.93333333333334},
+        {"type": "sum", "id": "http", "subType": "successfulTxns", "value": 233527},
+        {"type": "tcp", "subType": "averageTimeToFirstByte", "value": 0.1296666666666667},
+        {"type": "perAssociationStats", "id": "HTTP 1.1", "subType": "Attempt", "value": 9},
+        {"type": "timeElapsed", "value": 12},
+    ],
+    "server": [
+        {"type": "driver", "subType": "rxPacketCount", "value": 701296},
+        {"type": "http", "subType": "txnsPerSec", "value": 52686},
+        {"type": "memory", "subType": "cpuUtilized", "value": 56.43333333333334},
+    ],
+}
+
+
+def test_stats_extractor_sets_run_data():
+    rd = RunData()
+    rd.c_tx_bandwidth = 100
+    StatsExtractor().extract(rd, run_stats)
+    assert rd.c_rx_bandwidth == 568106
+    assert rd.c_loadspec_avg_cpu == 69.9
+    assert rd.c_http_successful_txns == 233527
+    assert rd.c_tcp_avg_ttfb == 0.1
+    assert rd.time_elapsed == 12
+    assert rd.s_rx_packet_count == 701296
+    assert rd.s_memory_avg_cpu == 56.4
+    # missing counters are reset
+    assert rd.c_tx_bandwidth == 0
+
+
+def test_stats_extractor_extra_counters():
+    extractor = StatsExtractor(
+        run_stats_schema + (("server", "http", "txnsPerSec", "s_http_txns_sec", "int"),)
+    )
+    rd = RunData()
+    values = extractor.extract(rd, run_stats)
+    assert rd.s_http_txns_sec == values["s_http_txns_sec"] == 52686
+    with pytest.raises(ValueError):
+        StatsExtractor((("client", "sum", "x", "c_x", "unknown"),))
+    with pytest.raises(ValueError):
+        StatsExtractor((("dut", "sum", "x", "c_x", None),))
@@ -6,6 +6,7 @@ from cf_runtests.input.cf_config import *
 from cf_runtests.input.credentials import *
 from cf_common.cf_functions import *
 from cf_common.CfClient import *
+from cf_common.CfResponseLog import ResponseLogWriter
 from cf_common.CfRunTest import *
 
 def test_rundata_defaults():
@@ -14,12 +15,12 @@ def test_rundata_defaults():
     assert(rd.client_core_count == 3)
     assert(rd.in_ramp_seek == False)
 
-def test_load_functions(test_set_a):
+def test_load_functions(test_set_a, tmp_path):
     run_info, queue_info, config, started = test_set_a
     rd = RunData()
     detailed_report = ""
     output_dir = Path.cwd()
-    cf = CfClient(cf_controller_address, username, password, verify_ssl)
+    cf = CfClient(cf_controller_address, username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         # rt.init_sequence(cf, rd, run_info)
@@ -50,12 +51,12 @@ def test_load_functions(test_set_a):
         rt.check_if_load_type_simusers(rd)
         rt.check_if_load_type_default(rd)
 
-def test_CfRunTest(test_set_a):
+def test_CfRunTest(test_set_a, tmp_path):
     run_info, queue_info, config, started = test_set_a
     rd = RunData()
     detailed_report = ""
     output_dir = Path.cwd()
-    cf = CfClient(cf_controller_address, username, password, verify_ssl)
+    cf = CfClient(cf_controller_address, username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         rt.init_input_csv(rd, run_info)
@@ -75,7 +76,7 @@ def test_CfRunTest(test_set_a):
         # rt.sustain_test(cf, rd)
 
 @responses.activate
-def test_get_queue_info(test_set_c):
+def test_get_queue_info(test_set_c, tmp_path):
     run_info, queue_info, config, started, status, stats = test_set_c
     url1 = 'https://10.8.100.16/api/v2/queues/id'
     responses.add(responses.GET, url1,
@@ -84,7 +85,7 @@ def test_get_queue_info(test_set_c):
     rd = RunData()
     detailed_report = ""
     output_dir = Path.cwd()
-    cf = CfClient('10.8.100.16', username, password, verify_ssl)
+    cf = CfClient('10.8.100.16', username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         rt.init_input_csv(rd, run_info)
@@ -92,12 +93,12 @@ def test_get_queue_info(test_set_c):
 
     assert rd.queue_info == queue_info
 
-def test_capacity_adj_cg(test_set_a):
+def test_capacity_adj_cg(test_set_a, tmp_path):
     run_info, queue_info, config, started = test_set_a
     rd = RunData()
     detailed_report = ""
     output_dir = ""
-    cf = CfClient(cf_controller_address, username, password, verify_ssl)
+    cf = CfClient(cf_controller_address, username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         rt.init_input_csv(rd, run_info)
@@ -112,12 +113,12 @@ def test_capacity_adj_cg(test_set_a):
     assert(rd.client_core_count == 3)
     assert(rd.in_capacity_adjust == 3)
 
-def test_capacity_adj_spr(test_set_b):
+def test_capacity_adj_spr(test_set_b, tmp_path):
     run_info, queue_info, config, started = test_set_b
     rd = RunData()
     detailed_report = ""
     output_dir = ""
-    cf = CfClient(cf_controller_address, username, password, verify_ssl)
+    cf = CfClient(cf_controller_address, username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         rt.init_input_csv(rd, run_info)
@@ -133,7 +134,7 @@ def test_capacity_adj_spr(test_set_b):
     assert(rd.in_capacity_adjust == 2)
 
 @responses.activate
-def test_update_test_run(test_set_c):
+def test_update_test_run(test_set_c, tmp_path):
     run_info, queue_info, config, started, status, stats = test_set_c
     url1 = 'https://10.8.100.16/api/v2/test_runs/14a6ce4514a420a92d9beb36c7bb0a03'
     responses.add(responses.GET, url1,
@@ -142,7 +143,7 @@ def test_update_test_run(test_set_c):
     rd = RunData()
     detailed_report = ""
     output_dir = Path.cwd()
-    cf = CfClient('10.8.100.16', username, password, verify_ssl)
+    cf = CfClient('10.8.100.16', username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         rt.init_input_csv(rd, run_info)
@@ -161,7 +162,7 @@ def test_update_test_run(test_set_c):
     assert rd.status == 'running'
 
 @responses.activate
-def test_update_run_stats(test_set_c):
+def test_update_run_stats(test_set_c, tmp_path):
     run_info, queue_info, config, started, status, stats = test_set_c
     url1 = 'https://10.8.100.16/api/v2/test_runs/14a6ce4514a420a92d9beb36c7bb0a03/statistics'
     responses.add(responses.GET, url1,
@@ -170,7 +171,7 @@ def test_update_run_stats(test_set_c):
     rd = RunData()
     detailed_report = ""
     output_dir = Path.cwd()
-    cf = CfClient('10.8.100.16', username, password, verify_ssl)
+    cf = CfClient('10.8.100.16', username, password, verify_ssl, ResponseLogWriter(tmp_path / "response.log"))
     rt = CfRunTest(cf, run_info, rd, detailed_report, output_dir)
     if rt is not False:
         rt.init_input_csv(rd, run_info)
@@ -0,0 +1,183 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cf_common.CfRunTest import *
+from cf_common.cf_functions import csv_report, html_report_table
+
+
+def make_rows(count):
+    rows = []
+    for i in range(count):
+        row = []
+        for column in DetailedCsvReport(".").columns:
+            if column in DetailedColumnarReport.string_columns:
+                row.append(None if column == "report" else f"{column}_{i % 3}")
+            elif column in DetailedColumnarReport.bool_columns:
+                row.append(bool(i % 2))
+            elif column == "version":
+                row.append(script_version)
+            elif column == "txn_error_rate":
+                row.append(i / 7)
+            elif column == "tcp_avg_ttfb":
+                row.append(None if i == 0 else i * 1.5)
+            else:
+                row.append(i)
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_report_matches_csv(tmp_path, file_format):
+    pytest.importorskip("pyarrow")
+    rows = make_rows(25)
+    csv_report = DetailedCsvReport(tmp_path)
+    csv_report.make_report_dir("csv")
+    csv_report.make_report_csv_file("test")
+    columnar = DetailedColumnarReport(tmp_path, file_format, flush_rows=10)
+    columnar.make_report_dir(file_format)
+    columnar.make_report_csv_file("test")
+    for row in rows:
+        csv_report.append_file(row)
+        columnar.append_file(row)
+    csv_report.flush()
+    columnar.flush()
+
+    assert columnar.report_csv_file.is_dir()
+    assert len(list(columnar.report_csv_file.iterdir())) == 3
+    assert columnar.report_csv_file.stem.endswith("_Detailed")
+    df_csv = load_detailed_report(csv_report.report_csv_file)
+    df_columnar = load_detailed_report(columnar.report_csv_file)
+    pd.testing.assert_frame_equal(df_csv, df_columnar)
+
+
+def test_report_aggregates_per_test(tmp_path):
+    csv_report = DetailedCsvReport(tmp_path)
+    csv_report.make_report_dir("csv")
+    csv_report.make_report_csv_file("test")
+    columns = csv_report.columns
+    ticks = [
+        # test_name, seconds, state, current_load, tps, version, report
+        ("a", 4, "rampup", 10, 500, 1.7, "link_a0"),
+        ("a", 8, "steady", 20, 900, 1.7, "link_a1"),
+        ("a", 12, "steady", 20, 1000, 1.7, "link_a2"),
+        ("b", 4, "rampup", 30, 1000, 1.8, "link_b0"),
+        ("b", 8, "steady", 40, 2000, 1.8, "link_b1"),
+        ("b", 12, "rampdown", 0, 0, 1.8, "link_b2"),
+    ]
+    for name, seconds, state, load, tps, version, report in ticks:
+        row = dict.fromkeys(columns, 1)
+        row.update(test_name=name, seconds=seconds, state=state, current_load=load,
+                   tps=tps, version=version, report=report)
+        csv_report.append_file([row[c] for c in columns])
+
+    table = Report(csv_report.report_csv_file, ["test_name"])
+    a, b = table.results
+
+    assert (a["test_name"], b["test_name"]) == ("a", "b")
+    # max_tps_load is taken within the test even if another test reached the same tps
+    assert a["max_tps_load"] == "20" and a["max_tps_seconds"] == 12
+    assert b["max_tps_load"] == "40" and b["max_tps_seconds"] == 8
+    assert a["seconds"] == 12 and b["seconds"] == 8
+    assert a["tps_stdy_delta"] == "11.11"
+    assert (a["version"], b["report"]) == (1.7, '<a href="link_b2">link</a>')
+
+
+def append_test(report, name, ticks, tps):
+    for i in range(ticks):
+        row = dict.fromkeys(report.columns, 2)
+        row.update(test_name=name, seconds=i * 4, tps=tps + i,
+                   state="steady" if i else "rampup", report=f"link_{name}")
+        report.append_file([row[c] for c in report.columns])
+
+
+def test_incremental_report_matches_full_rebuild(tmp_path):
+    col_order = ["test_name", "tps", "tps_max", "seconds", "max_tps_load", "report"]
+    detailed = DetailedCsvReport(tmp_path)
+    detailed.make_report_dir("inc")
+    detailed.make_report_csv_file("suite")
+    incremental = IncrementalReport(
+        col_order, ["HTTP", "TLS", None], {"summary": None}, script_version, "header"
+    )
+    rendered = []
+    for name, ticks, tps in [("HTTP-CPS", 5, 100), ("TLS-CPS", 4, 50),
+                             ("HTTP-CPS", 3, 300), ("TLS-TPUT", 2, 10)]:
+        append_test(detailed, name, ticks, tps)
+        incremental.update(detailed)
+        tables = incremental.html_tables[detailed.report_csv_file]
+        rendered.append({sub: tables[("summary", sub)] for sub in ["HTTP", "TLS", None]})
+
+    all_file = tmp_path / "inc" / f"suite_{detailed.time_stamp}_all.csv"
+    full_file = tmp_path / "full.csv"
+    csv_report(Report(detailed.report_csv_file, col_order), full_file)
+    assert all_file.read_text() == full_file.read_text()
+    assert pd.read_csv(all_file)["test_name"].tolist() == ["HTTP-CPS", "TLS-CPS", "TLS-TPUT"]
+    assert (tmp_path / "inc" / f"suite_{detailed.time_stamp}_summary.html").is_file()
+    # the HTTP table is kept when only TLS tests finish
+    assert rendered[1]["HTTP"] is rendered[0]["HTTP"]
+    assert rendered[3]["HTTP"] is rendered[2]["HTTP"]
+    assert rendered[2]["HTTP"] is not rendered[1]["HTTP"]
+
+
+def summary_table():
+    return pd.DataFrame({
+        "test_name": ["HTTP-CPS", "TLS-CPS", "HTTP-TPUT"],
+        "tps": ["1,000", "2,000", "3,000"],
+        "version": [1.8, 1.8, np.nan],
+        "seconds": [120, 240, 360],
+    })
+
+
+def strip_ids(html):
+    return re.sub(r"T_[0-9a-f]{5}", "T_id", html)
+
+
+def test_html_renderer_shares_filters_and_matches_html_report():
+    pytest.importorskip("jinja2")
+    df = summary_table()
+    html_reports = {"all": None, "short": ["test_name", "tps"], "short2": ["test_name", "tps"]}
+    serial = HtmlReportRenderer(["HTTP", "UDP", None], html_reports)
+    executor = start_render_processes(2)
+    forked = HtmlReportRenderer(["HTTP", "UDP", None], html_reports, executor=executor)
+    tables = serial.render(df)
+    forked_tables = forked.render(df)
+    if executor is not None:
+        executor.shutdown()
+
+    assert tables[("short", "UDP")] == ""
+    assert tables[("short", "HTTP")] is tables[("short2", "HTTP")]
+    assert "TLS-CPS" not in tables[("all", "HTTP")]
+    assert "TLS-CPS" in tables[("all", None)]
+    for key, html in tables.items():
+        assert strip_ids(html) == strip_ids(forked_tables[key])
+        # same as the Report.html_table path used by html_report
+        report = Report.from_summary(df)
+        expected = html_report_table(report, key[1], html_reports[key[0]])
+        assert strip_ids(html) == strip_ids(expected)
+
+
+def test_template_renderer():
+    df = summary_table()
+    html = render_html_table(df, Report.style_a(), "template")
+
+    assert html.count("<tr>") == 4
+    assert '<td class="data row0 col1" >1,000</td>' in html
+    assert '<td class="data row0 col2" >1.800000</td>' in html
+    assert '<td class="data row2 col2" >nan</td>' in html
+    assert "td.col0 {\n  width: 20em;" in html
+
+
+def test_template_renderer_without_styler_precision_option(monkeypatch):
+    get_option = pd.get_option
+
+    def old_pandas_get_option(key):
+        if key.startswith("styler."):
+            raise KeyError(key)
+        return get_option(key)
+
+    monkeypatch.setattr(pd, "get_option", old_pandas_get_option)
+    with pd.option_context("display.precision", 2):
+        html = render_html_table(summary_table(), Report.style_a(), "template")
+    assert '<td class="data row0 col2" >1.80</td>' in html
@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cf_common.CfRunTest import *
+
+
+def recorder_with_rows(rows=100):
+    recorder = IterationRecorder(
+        (("load", "c_current_load"), ("kpi", "kpi_1.avg_val"), ("stable", "kpi_1.stable")),
+        capacity=4,
+    )
+    for i in range(rows):
+        rd = SimpleNamespace(
+            c_current_load=10 * i,
+            kpi_1=SimpleNamespace(avg_val=None if i == 0 else 1.5 * i, stable=i % 2 == 0),
+        )
+        recorder.record(1000.0 + i, rd)
+    return recorder
+
+
+def test_iteration_recorder_grows_and_reads_columns():
+    recorder = recorder_with_rows()
+    assert len(recorder) == 100
+    assert recorder.data.shape[1] == 128
+    assert recorder.column("load").tolist() == [10 * i for i in range(100)]
+    assert np.isnan(recorder.column("kpi")[0])
+    assert recorder.last() == {"time": 1099.0, "load": 990.0, "kpi": 148.5, "stable": 0.0}
+    assert IterationRecorder((("load", "c_current_load"),)).last() is None
+
+
+def test_iteration_recorder_export(tmp_path):
+    recorder = recorder_with_rows(3)
+    recorder.to_csv(tmp_path / "iterations.csv", start_time=1000.0)
+    df = pd.read_csv(tmp_path / "iterations.csv")
+    assert list(df.columns) == ["time", "load", "kpi", "stable"]
+    assert df["time"].tolist() == [0.0, 1.0, 2.0]
+    assert df["load"].tolist() == [0, 10, 20]
+    if pa is not None:
+        recorder.to_parquet(tmp_path / "iterations.parquet", start_time=1000.0)
+        assert pd.read_parquet(tmp_path / "iterations.parquet").equals(
+            recorder.to_frame(1000.0)
+        )
+
+
+def test_iteration_recorder_state_round_trip():
+    recorder = recorder_with_rows(10)
+    restored = IterationRecorder(recorder.fields)
+    restored.load_state(json.loads(json.dumps(recorder.state())))
+    assert len(restored) == 10
+    assert restored.column("load").tolist() == recorder.column("load").tolist()
+    with pytest.raises(ValueError):
+        IterationRecorder((("load", "c_current_load"),)).load_state(recorder.state())
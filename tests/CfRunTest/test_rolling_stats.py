@@ -0,0 +1,103 @@
+import random
+
+from cf_common.CfRunTest import *
+
+
+def reference_update(window, sample_size, round_digits, new_value):
+    """RollingStats.update semantics as a plain list window"""
+    if len(window) == sample_size:
+        window.pop(0)
+    window.append(new_value)
+    avg_val = round(sum(window) / len(window), round_digits)
+    if round_digits == 0:
+        avg_val = int(avg_val)
+    max_var = max(window) - min(window)
+    variance = round((max_var / avg_val) if avg_val != 0 else 0, 3)
+    return avg_val, variance
+
+
+def test_rolling_stats_defaults():
+    rs = RollingStats(3, 0)
+    assert(rs.list == [0, 0, 0])
+    assert(rs.avg_val == 0)
+    assert(rs.stable == False)
+
+
+def test_rolling_stats_matches_list_window():
+    random.seed(7)
+    for sample_size in (1, 3, 10, 57):
+        rs = RollingStats(sample_size, 0)
+        window = [0] * sample_size
+        for i in range(500):
+            value = random.randint(0, 2000)
+            if i == 250:
+                rs.reset()
+                window = [0] * sample_size
+            variance = rs.update(value)
+            avg_val, ref_variance = reference_update(window, sample_size, 0, value)
+            assert(rs.list == window)
+            assert(rs.avg_val == avg_val)
+            assert(variance == ref_variance)
+
+
+def test_rolling_stats_stable_and_increase():
+    rs = RollingStats(3, 0)
+    for value in (100, 100, 100):
+        rs.update(value)
+    assert(rs.check_if_stable(0.03))
+    rs.load_increase_complete()
+    for value in (110, 110, 110):
+        rs.update(value)
+    assert(rs.check_if_stable(0.03))
+    assert(rs.increase_avg == 10.0)
+    assert(rs.new_high == True)
+    assert(rs.avg_max_load_variance == 1.0)
+    rs.update(50)
+    assert(rs.check_if_stable(0.03) == False)
+    assert(rs.stable_count == 0)
+
+
+def test_rolling_stats_bank_matches_rolling_stats():
+    random.seed(11)
+    bank = RollingStatsBank(4)
+    views = [bank.add("tps", 0), bank.add("ttfb", 1), bank.add("cps", 0)]
+    singles = [RollingStats(4, 0), RollingStats(4, 1), RollingStats(4, 0)]
+    for i in range(200):
+        values = [random.randint(950, 1050), random.randint(10, 30) / 10, i * 10]
+        if i % 50 == 49:
+            bank.load_increase_complete()
+            for single in singles:
+                single.load_increase_complete()
+        if i == 120:
+            views[2].reset()
+            singles[2].reset()
+        bank.update(values)
+        bank.check_if_stable(0.05)
+        for single, value in zip(singles, values):
+            single.update(value)
+            single.check_if_stable(0.05)
+        for view, single in zip(views, singles):
+            assert(view.list == single.list)
+            assert(view.avg_val == single.avg_val)
+            assert(view.variance == single.variance)
+            assert(view.stable == single.stable)
+            assert(view.stable_count == single.stable_count)
+            assert(view.increase_avg == single.increase_avg)
+            assert(view.new_high == single.new_high)
+            assert(view.avg_max_load_variance == single.avg_max_load_variance)
+
+
+def test_rolling_stats_bank_per_kpi_reference():
+    bank = RollingStatsBank(3)
+    tps = bank.add("tps", 0)
+    count = bank.add("count_since_goal_seek", 1)
+    for value in (100, 101, 102):
+        bank.update([value, 1])
+        bank.check_if_stable(np.array([0.03, 0]))
+    assert(tps.stable)
+    assert(count.stable)
+    count.reset()
+    bank.update([102, 1])
+    bank.check_if_stable(np.array([0.03, 0]))
+    assert(count.list == [0.0, 0.0, 1.0])
+    assert(count.stable == False)
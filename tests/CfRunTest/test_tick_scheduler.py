@@ -0,0 +1,51 @@
+from cf_common.CfRunTest import *
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_tick_scheduler_deadlines_do_not_drift():
+    clock = FakeClock()
+    ticker = TickScheduler({"default": 4, "control": 2}, "skip", clock.time, clock.sleep)
+    ticker.start("control")
+    for _ in range(5):
+        clock.now += 0.7  # request latency inside the tick
+        assert(ticker.wait() == 0)
+    assert(clock.now == 110.0)
+    assert(ticker.overruns == 0)
+    ticker.start("sustain")
+    assert(ticker.period == 4)
+
+
+def test_tick_scheduler_skip_overrun():
+    clock = FakeClock()
+    ticker = TickScheduler({"default": 4}, "skip", clock.time, clock.sleep)
+    ticker.start("control")
+    clock.now += 9  # slow tick misses the 104 and 108 deadlines
+    ticker.wait()
+    assert(clock.now == 112.0)
+    assert(ticker.overruns == 1)
+    clock.now += 1
+    ticker.wait()
+    assert(clock.now == 116.0)
+
+
+def test_tick_scheduler_catch_up_overrun():
+    clock = FakeClock()
+    ticker = TickScheduler({"default": 4}, "catch_up", clock.time, clock.sleep)
+    ticker.start("control")
+    clock.now += 9
+    assert(ticker.wait() == 5.0)
+    assert(ticker.wait() == 1.0)
+    assert(clock.now == 109.0)
+    ticker.wait()
+    assert(clock.now == 112.0)
+    assert(ticker.overruns == 2)
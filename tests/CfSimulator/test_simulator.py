@@ -0,0 +1,75 @@
+from cf_common.CfSimulator import *
+
+
+def test_dut_model_knee():
+    dut = DutModel(capacity=10000, gain=100, noise=0)
+    assert abs(dut.throughput(10) - 1000) < 1
+    assert dut.throughput(100) < 10000
+    assert dut.throughput(1000) > 0.99 * 10000
+    loads = [dut.throughput(load) for load in range(0, 500, 10)]
+    assert loads == sorted(loads)
+    dut.start("http_connections_per_second", "Connections/Second")
+    assert abs(dut.throughput(500) - 500) < 1
+
+
+def test_dut_model_open_conns_memory_limit():
+    dut = DutModel(memory_size=300_000, memory_base=100_000, memory_per_conn=2, noise=0)
+    dut.start("open_connections", "Connections")
+    sample = dut.step(200_000, 10)
+    assert sample["current_load"] == dut.max_conns() == 100_000
+    assert sample["memory_used"] == 300_000
+    # no new connections when the open connections are stable
+    assert dut.step(200_000, 4)["cps"] == 0
+
+
+def test_simulated_client_run_life_cycle(tmp_path):
+    clock = VirtualClock()
+    cf = SimulatedCfClient(DutModel(noise=0), clock, wait_time=5, init_time=5, stop_time=5)
+    cf.tests["t1"] = simulated_test_config("http_throughput", "t1")
+    cf.tests["t1"]["config"]["loadSpecification"].update(
+        {"duration": 100, "startup": 0, "rampup": 0, "rampdown": 0, "shutdown": 0,
+         "simUsers": 50}
+    )
+    run = cf.start_test("t1")
+    assert run["status"] == "waiting"
+    clock.sleep(6)
+    assert cf.get_test_run(run["id"])["subStatus"] == "initializing"
+    clock.sleep(10)
+    snapshot = cf.fetch_test_run_snapshot(run["id"])
+    assert (snapshot.test_run["status"], snapshot.test_run["subStatus"]) == ("running", None)
+    assert snapshot.test_run["timeElapsed"] == 6
+    stats = {
+        (s["type"], s.get("subType")): s["value"] for s in snapshot.statistics["client"]
+    }
+    assert stats[("sum", "desiredLoadSpecCount")] == 50
+    assert 4900 < stats[("sum", "successfulTxnsPerSec")] <= 5000
+    cf.change_load(run["id"], 60)
+    clock.sleep(2)
+    stats = cf.fetch_test_run_statistics(run["id"])["client"]
+    assert {"type": "sum", "subType": "currentLoadSpecCount", "value": 60} in stats
+    cf.stop_test(run["id"])
+    assert cf.get_test_run(run["id"])["subStatus"] == "stopping"
+    clock.sleep(5)
+    assert cf.get_test_run(run["id"])["status"] == "stopped"
+    assert cf.metrics()["GET /test_runs/{id}"]["count"] == 4
+
+
+def test_simulate_run_goal_seeks_to_knee():
+    dut = DutModel(capacity=20000, gain=100, seed=1)
+    result = simulate_run(dut=dut)
+    assert result.completed
+    assert result.goal_seek_count > 3
+    # 30 minute test run in virtual time
+    assert 100 < result.seconds < 1900
+    assert 0.8 * 20000 < result.steady_tps <= 1.05 * 20000
+    assert set(result.rows["state"].dropna()) >= {"rampup", "goalseek", "steady"}
+
+
+def test_sweep_grid_of_test_and_dut_arguments():
+    df = sweep(grid={"incr_low": [7], "capacity": [10000, 40000]}, repeats=2)
+    assert list(df[["incr_low", "capacity", "seed"]].itertuples(index=False, name=None)) == [
+        (7, 10000, 0), (7, 10000, 1), (7, 40000, 0), (7, 40000, 1)
+    ]
+    assert df["completed"].all()
+    by_capacity = df.groupby("capacity")["steady_tps"].mean()
+    assert by_capacity[40000] > 2 * by_capacity[10000]
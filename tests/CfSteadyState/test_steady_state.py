@@ -0,0 +1,190 @@
+import math
+
+import numpy as np
+
+from cf_common.CfCheckpoint import Checkpoint
+from cf_common.CfRunTest import CfRunTest, RollingStatsBank, RunData
+from cf_common.CfSimulator import DutModel, simulate_run, simulated_test
+from cf_common.CfSteadyState import *
+
+noise = [3, -5, 2, 6, -1, -4, 5, -2, 0, -3]
+windows = {
+    "flat": [1000 + n for n in noise],
+    "outlier": [1000 + n + (300 if i == 5 else 0) for i, n in enumerate(noise)],
+    "drift": [1000 + 5 * i + n for i, n in enumerate(noise)],
+    "step": [1000 + n + (100 if i >= 6 else 0) for i, n in enumerate(noise)],
+}
+
+
+def window_bank():
+    bank = RollingStatsBank(10)
+    for name in windows:
+        bank.add(name, 0)
+    for values in zip(*windows.values()):
+        bank.update(values)
+    return bank
+
+
+def stable(method):
+    bank = window_bank()
+    flags = get_steady_state_method(method).stable(bank, np.full(len(windows), 0.03))
+    return {name: bool(flag) for name, flag in zip(windows, flags)}
+
+
+def test_get_steady_state_method():
+    assert get_steady_state_method(None).name == "variance"
+    assert get_steady_state_method(" CUSUM ").name == "cusum"
+    assert get_steady_state_method("unknown").name == "variance"
+
+
+def test_variance_outlier_is_unstable():
+    assert stable("variance") == {
+        "flat": True, "outlier": False, "drift": False, "step": False
+    }
+
+
+def test_trend_tests_ignore_outlier_and_detect_drift():
+    for method in ("mann_kendall", "slope"):
+        flags = stable(method)
+        assert flags["flat"] and flags["outlier"], method
+        assert not flags["drift"], method
+
+
+def test_cv_and_cusum():
+    assert stable("cv") == {"flat": True, "outlier": False, "drift": True, "step": False}
+    flags = stable("cusum")
+    assert flags["flat"] and flags["outlier"] and not flags["step"]
+
+
+def test_mann_kendall_ties_are_stable():
+    bank = RollingStatsBank(5)
+    bank.add("tps", 0)
+    for value in [100, 100, 100, 100, 100]:
+        bank.update([value])
+    assert MannKendallSteadyState().stable(bank, 0.03).tolist() == [True]
+
+
+
+def test_trend_is_unstable_at_min_window():
+    for method in ("mann_kendall", "cusum"):
+        steady_state = steady_state_methods[method]
+        bank = RollingStatsBank(steady_state.min_window)
+        bank.add("tps", 0)
+        for value in range(steady_state.min_window):
+            bank.update([1000 + 1000 * value])
+        assert steady_state.stable(bank, 0.03).tolist() == [False], method
+
+
+def test_stability_window_raised_to_method_minimum(tmp_path):
+    for method, window, expected in (
+        ("mann_kendall", "3", 5),
+        ("mann_kendall", "8", 8),
+        ("cusum", "", 12),
+        ("cv", "3", 3),
+    ):
+        rd = RunData()
+        rt = CfRunTest(None, rd, {}, None, tmp_path)
+        test_details = dict(simulated_test, stability_method=method, stability_window=window)
+        rt.init_input_csv(rd, test_details)
+        assert rd.in_stability_window == expected, method
+
+def test_mann_kendall_variance_tie_correction_per_row():
+    windows = np.array([[1, 2, 3, 4, 5], [1, 1, 2, 2, 2], [7, 7, 7, 7, 7], [3, 1, 3, 1, 2]])
+    # n = 5: 5 * 4 * 15 / 18, minus 2 * 1 * 9 + 3 * 2 * 11 for the ties 2 and 3
+    expected = np.array([300, 300 - 18 - 66, 0, 300 - 18 - 18]) / 18
+    assert np.allclose(MannKendallSteadyState.variance(windows), expected)
+
+
+def test_stability_method_feeds_stable_flags(tmp_path):
+    rd = RunData()
+    rd.in_stability_method = "mann_kendall"
+    rd.in_stability_window = 6
+    rt = CfRunTest(None, rd, {"id": "1", "name": "a"}, None, tmp_path)
+    rt.init_rolling_stats(rd)
+    rt.check_kpi(rd)
+    for value in [1000, 1003, 1001, 999, 1002, 1200, 1000, 998]:
+        rd.c_http_successful_txns_sec = value
+        rt.update_rolling_averages(rd)
+    # the outlier is still in the variance window
+    assert rd.rolling_tps.variance > rd.in_max_variance
+    assert rd.rolling_tps.stable
+    assert rd.rolling_count_since_goal_seek.stable
+
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    checkpoint.test_running({"id": "1", "name": "a"}, rt, force=True)
+    rd_new = RunData()
+    rt_new = CfRunTest(None, rd_new, {}, None, tmp_path)
+    Checkpoint.restore(rt_new, rd_new, checkpoint.state["running"])
+    assert np.array_equal(
+        rd_new.rolling_steady_bank.ordered_windows(), rd.rolling_steady_bank.ordered_windows()
+    )
+
+
+def test_simulated_runs_with_each_method():
+    for method in steady_state_methods:
+        result = simulate_run(dict(simulated_test, stability_method=method), DutModel(seed=1))
+        assert result.completed, method
+        assert result.steady_tps > 0.8 * 20000, method
+
+
+def test_effective_sample_size_of_correlated_samples():
+    rng = np.random.default_rng(1)
+    independent = rng.normal(1000, 10, 400)
+    correlated = np.zeros(400)
+    for i in range(1, 400):
+        correlated[i] = 0.8 * correlated[i - 1] + rng.normal(0, 10)
+    assert effective_sample_size(independent) > 300
+    # n * (1 - 0.8) / (1 + 0.8) for an AR(1) series
+    assert 30 < effective_sample_size(correlated + 1000) < 70
+    assert effective_sample_size([5, 5, 5]) == 3
+
+
+def test_precision_reached():
+    values = [1000 + n for n in noise * 4]
+    reached, reason = precision_reached(values, 0.01)
+    assert reached
+    assert "effective sample size" in reason
+    assert not precision_reached(values, 0.001)[0]
+    assert not precision_reached(values[:20], 0.01)[0]
+    assert not precision_reached([0] * 40, 0.01)[0]
+    # strongly correlated samples need an effective sample size of 10
+    drift = [1000 + (i // 20) for i in range(40)]
+    assert not precision_reached(drift, 0.01)[0]
+
+
+def test_t_critical_small_df():
+    assert t_critical(1) == 12.706
+    assert t_critical(2.7) == 4.303
+    assert t_critical(1, 0.99) == 63.657
+    assert abs(t_critical(40) - 2.021) < 0.002
+    assert abs(t_critical(40, 0.99) - 2.704) < 0.002
+    assert t_critical(0.5) == math.inf
+
+
+def test_precision_reached_coverage_of_correlated_samples():
+    """Mean when a check every tick first passes is within precision ~95% of runs"""
+    phi, sigma, precision = 0.8, 1.0, 0.01
+    misses = stops = 0
+    for seed in range(200):
+        rng = np.random.default_rng(seed)
+        e = rng.normal(0, sigma, 300)
+        x = np.empty(300)
+        x[0] = 100 + e[0] / math.sqrt(1 - phi * phi)
+        for i in range(1, 300):
+            x[i] = 100 + phi * (x[i - 1] - 100) + e[i]
+        for n in range(30, 301):
+            if precision_reached(x[:n], precision)[0]:
+                stops += 1
+                misses += abs(x[:n].mean() - 100) > precision * 100
+                break
+    assert stops > 150
+    assert misses / stops <= 0.08
+
+
+def test_early_stop_shortens_sustain_period():
+    test = dict(simulated_test, sustain_period="600")
+    full = simulate_run(test, DutModel(seed=1))
+    early = simulate_run(dict(test, precision="0.01"), DutModel(seed=1))
+    assert early.completed
+    assert early.seconds < full.seconds - 300
+    assert abs(early.steady_tps - full.steady_tps) < 0.01 * full.steady_tps
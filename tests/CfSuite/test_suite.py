@@ -0,0 +1,242 @@
+import pathlib
+import threading
+
+import pandas as pd
+import pytest
+
+import cf_common.CfSuite as cf_suite
+from cf_common.CfCheckpoint import Checkpoint
+
+
+class FakeRunTest:
+    """Records prepare/start/control calls and winds down during control_test"""
+
+    calls = []
+
+    def __init__(self, cf, rd, test, result_file, temp_dir, tick_periods, tick_policy,
+                 results_index=None):
+        self.test = test
+        self.temp_dir = temp_dir
+        self.on_wind_down = None
+        self.on_checkpoint = None
+
+    def prepare(self, cf, rd, test):
+        FakeRunTest.calls.append(
+            ("prepare", test["name"], self.temp_dir.name, threading.current_thread().name)
+        )
+        return test["name"] != "bad"
+
+    def start(self, cf, rd):
+        FakeRunTest.calls.append(("start", self.test["name"]))
+
+    def resume(self, cf, rd):
+        rd.status = "running"
+        return True
+
+    def control_test(self, cf, rd, resume=False):
+        if self.on_checkpoint is not None:
+            self.on_checkpoint()
+        if self.on_wind_down is not None:
+            self.on_wind_down()
+        FakeRunTest.calls.append(("resume" if resume else "control", self.test["name"]))
+        return True
+
+
+class FakeReport:
+    def __init__(self):
+        self.updates = 0
+
+    def update(self, result_file):
+        self.updates += 1
+
+
+def test_suite_stages_next_test(tmp_path, monkeypatch):
+    monkeypatch.setattr(cf_suite, "CfRunTest", FakeRunTest)
+    FakeRunTest.calls = []
+    tests = [
+        {"id": "1", "name": "a", "run": "y"},
+        {"id": "2", "name": "skip", "run": "n"},
+        {"id": "3", "name": "b", "run": "yes"},
+        {"id": "3", "name": "b_again", "run": "true"},
+        {"id": "4", "name": "bad", "run": "y"},
+        {"id": "5", "name": "c", "run": "y"},
+    ]
+    report = FakeReport()
+    cf_suite.SuiteRunner(None, tests, None, tmp_path, report).run()
+
+    staged = [call for call in FakeRunTest.calls if call[-1] == "cf_stager"]
+    main = [call for call in FakeRunTest.calls if call[-1] != "cf_stager"]
+    assert staged == [
+        ("prepare", "b", "staged", "cf_stager"),
+        ("prepare", "bad", "staged", "cf_stager"),
+    ]
+    assert main == [
+        ("prepare", "a", tmp_path.name, "MainThread"),
+        ("start", "a"),
+        ("control", "a"),
+        ("start", "b"),
+        ("control", "b"),
+        # same test id as the running test, prepared after it finished
+        ("prepare", "b_again", tmp_path.name, "MainThread"),
+        ("start", "b_again"),
+        ("control", "b_again"),
+        # staged prepare failed, bad is not started
+        ("prepare", "c", tmp_path.name, "MainThread"),
+        ("start", "c"),
+        ("control", "c"),
+    ]
+    assert report.updates == 4
+
+
+class FakeResumeReport:
+    def __init__(self):
+        self.calls = []
+
+    def update(self, result_file):
+        self.calls.append(("update", result_file.report_csv_file))
+
+    def load_summary(self, report_file):
+        self.calls.append(("load_summary", report_file.name))
+
+    def rebuild(self, result_file):
+        self.calls.append(("rebuild", result_file.report_csv_file.name))
+
+
+class FakeReopenFile:
+    def __init__(self):
+        self.time_stamp = "new"
+        self.report_csv_file = None
+
+    def reopen(self, report_csv_file):
+        self.report_csv_file = report_csv_file
+
+
+def test_suite_checkpoint_resume(tmp_path, monkeypatch):
+    monkeypatch.setattr(cf_suite, "CfRunTest", FakeRunTest)
+    restored = []
+    monkeypatch.setattr(
+        cf_suite.Checkpoint,
+        "restore",
+        staticmethod(lambda rt, rd, running: restored.append(running["key"])),
+    )
+    saves = []
+    monkeypatch.setattr(
+        cf_suite.Checkpoint,
+        "test_running",
+        lambda self, test, rt, force=False: saves.append((test["name"], force)),
+    )
+    FakeRunTest.calls = []
+    tests = [
+        {"run_order": str(i), "id": str(i), "name": name, "run": "y"}
+        for i, name in enumerate(["a", "b", "c"], start=1)
+    ]
+    done_file = tmp_path / "done_Detailed.csv"
+    running_file = tmp_path / "running_Detailed.csv"
+    done_file.touch()
+    running_file.touch()
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    checkpoint.state = {
+        "completed": ["1|1|a"],
+        "running": {"key": "2|2|b", "report_csv_file": str(running_file)},
+        "time_stamp": "old",
+        "report_files": [str(done_file), str(running_file)],
+    }
+    checkpoint.write()
+
+    report = FakeResumeReport()
+    result_file = FakeReopenFile()
+    suite = cf_suite.SuiteRunner(
+        None, tests, result_file, tmp_path, report, stage_next=False,
+        checkpoint=Checkpoint(tmp_path / "checkpoint.json", interval=0),
+    )
+    suite.run(resume=True)
+
+    assert restored == ["2|2|b"]
+    assert saves == [("b", False), ("c", True), ("c", False)]
+    assert result_file.time_stamp == "old"
+    assert FakeRunTest.calls[0] == ("resume", "b")
+    assert FakeRunTest.calls[-2:] == [("start", "c"), ("control", "c")]
+    assert report.calls[:2] == [
+        ("load_summary", "done_Detailed.csv"),
+        ("rebuild", "running_Detailed.csv"),
+    ]
+    saved = Checkpoint(tmp_path / "checkpoint.json")
+    saved.load()
+    assert saved.state["completed"] == ["1|1|a", "2|2|b", "3|3|c"]
+    assert saved.state["running"] is None
+
+
+class FakeCf:
+    queues = {"1": "qa", "2": "qb", "3": "qa", "4": "qb"}
+
+    def get_test(self, test_type, test_id, outfile):
+        return {"config": {"queue": {"id": self.queues[test_id]}}}
+
+
+class FakeResultFile:
+    def __init__(self):
+        self.time_stamp = str(len(FakeRunTest.calls))
+        self.name_suffix = ""
+
+
+class FakeQueueReport:
+    merged = {}
+
+    def __init__(self):
+        self.summaries = {}
+
+    def update(self, result_file):
+        name = f"suite_{result_file.time_stamp}{result_file.name_suffix}_Detailed.csv"
+        summary = pd.DataFrame({"test_name": [threading.current_thread().name]})
+        self.summaries[pathlib.Path(name)] = summary
+
+    def write(self, report_file, summary, names=None):
+        FakeQueueReport.merged[report_file] = summary
+
+
+def test_parallel_suite_runs_queues_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(cf_suite, "CfRunTest", FakeRunTest)
+    FakeRunTest.calls = []
+    FakeQueueReport.merged = {}
+    tests = [{"id": i, "name": f"t{i}", "run": "y", "type": "http_throughput"}
+             for i in ["1", "2", "3", "4"]]
+    suite = cf_suite.ParallelSuiteRunner(
+        FakeCf(), tests, FakeResultFile, tmp_path, FakeQueueReport, stage_next=False
+    )
+    suite.run()
+
+    starts = [call[1] for call in FakeRunTest.calls if call[0] == "start"]
+    assert starts.index("t1") < starts.index("t3")
+    assert starts.index("t2") < starts.index("t4")
+    queue_dirs = {call[1]: call[2] for call in FakeRunTest.calls if call[0] == "prepare"}
+    assert queue_dirs == {"t1": "queue_1", "t3": "queue_1", "t2": "queue_2", "t4": "queue_2"}
+    assert [runner.result_file.name_suffix for runner in suite.runners] == ["_q1", "_q2"]
+    assert suite.runners[0].result_file.time_stamp == suite.runners[1].result_file.time_stamp
+    (merged_file, merged), = FakeQueueReport.merged.items()
+    assert merged_file.name == f"suite_{suite.runners[0].result_file.time_stamp}_Detailed.csv"
+    assert sorted(merged["test_name"]) == ["cf_queue_1", "cf_queue_2"]
+
+
+def test_parallel_suite_reports_failed_queue(tmp_path, monkeypatch):
+    class ExitingRunTest(FakeRunTest):
+        def control_test(self, cf, rd, resume=False):
+            if self.test["name"] == "t2":
+                raise SystemExit(1)
+            return super().control_test(cf, rd, resume)
+
+    monkeypatch.setattr(cf_suite, "CfRunTest", ExitingRunTest)
+    FakeRunTest.calls = []
+    FakeQueueReport.merged = {}
+    tests = [{"id": i, "name": f"t{i}", "run": "y", "type": "http_throughput"}
+             for i in ["1", "2", "3", "4"]]
+    suite = cf_suite.ParallelSuiteRunner(
+        FakeCf(), tests, FakeResultFile, tmp_path, FakeQueueReport, stage_next=False
+    )
+    with pytest.raises(SystemExit):
+        suite.run()
+    assert list(suite.failures) == ["qb"]
+    controlled = [call[1] for call in FakeRunTest.calls if call[0] == "control"]
+    # queue qa finishes, qb stops at t2 and its reports are still merged
+    assert controlled == ["t1", "t3"]
+    (merged_file, merged), = FakeQueueReport.merged.items()
+    assert sorted(merged["test_name"]) == ["cf_queue_1"]